@@ -0,0 +1,407 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, time, json, shutil, tempfile, argparse
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None  # python 2 uses the resident memory of the process instead
+
+import PandoraMailbox
+import PandoraMetrics
+
+
+# Runs coordinator cycles against a synthetic farm in a temporary folder, so that
+# changes of the coordinator can be compared without a real farm. The farm consists of
+# slaves, a workstation, jobs with a part of them already finished, dependency chains
+# between the unfinished jobs and pending taskUpdate commands of the slaves. Between the
+# cycles the slaves answer their renderTask commands with a finished taskUpdate.
+#
+#   python PandoraBenchmark.py small medium --cycles 10
+#   python PandoraBenchmark.py --slaves 50 --jobs 300 --tasks 1000 --json result.json
+
+scenarios = {
+    "small": {"slaves": 5, "jobs": 20, "tasks": 50, "chains": 2, "commands": 20},
+    "medium": {"slaves": 20, "jobs": 100, "tasks": 200, "chains": 10, "commands": 100},
+    "large": {"slaves": 50, "jobs": 300, "tasks": 1000, "chains": 30, "commands": 500},
+}
+chainLength = 3  # jobs per dependency chain
+finishedRatio = 0.5  # part of the jobs, which are finished already
+counterNames = PandoraMetrics.counterNames
+
+
+def writeJson(path, data):
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+# creates the folders and configs of a farm and returns the paths of the slaves
+def createFarm(root, slaves, jobs, tasks, chains=0, commands=0):
+    coordPath = os.path.join(root, "Scripts", "PandoraCoordinator")
+    writeJson(
+        os.path.join(coordPath, "Coordinator_Settings.json"),
+        {
+            "settings": {
+                "coordUpdateTime": 0,
+                "eventDriven": False,
+                "debugMode": False,
+                "localMode": True,
+                "cycleMetrics": True,
+            }
+        },
+    )
+
+    slaveNames = ["bench%03d" % x for x in range(slaves)]
+    for slaveName in slaveNames:
+        slavePath = os.path.join(root, "Slaves", "S_%s" % slaveName)
+        os.makedirs(os.path.join(slavePath, "Communication"))
+        writeJson(
+            os.path.join(slavePath, "slaveSettings_%s.json" % slaveName),
+            {
+                "settings": {"slaveGroup": [], "maxConcurrentTasks": 1},
+                "slaveinfo": {
+                    "status": "idle",
+                    "curtasks": [],
+                    "cpucount": 8,
+                    "ram": 32,
+                },
+            },
+        )
+        open(os.path.join(slavePath, "slaveActive_%s" % slaveName), "w").close()
+
+    wsPath = os.path.join(root, "Workstations", "WS_bench")
+    os.makedirs(os.path.join(wsPath, "Commands"))
+    os.makedirs(os.path.join(wsPath, "JobSubmissions"))
+
+    repPath = os.path.join(root, "JobRepository")
+    jobCodes = ["job%05d" % x for x in range(jobs)]
+    finishedJobs = int(jobs * finishedRatio)
+    openJobs = jobCodes[finishedJobs:]
+
+    dependencies = {}
+    for chainNum in range(chains):
+        chain = openJobs[chainNum * chainLength : (chainNum + 1) * chainLength]
+        for idx in range(1, len(chain)):
+            dependencies[chain[idx]] = [[chain[idx - 1], 0]]
+
+    # the first unfinished tasks are rendering and get a pending taskUpdate command
+    pendingTasks = []
+    for jobNum, jobCode in enumerate(jobCodes):
+        jobTasks = {}
+        for taskNum in range(tasks):
+            taskName = "task%04d" % taskNum
+            frame = taskNum * 10 + 1
+            if jobNum < finishedJobs:
+                slaveName = slaveNames[taskNum % slaves]
+                taskData = [frame, frame + 9, "finished", slaveName, "0:01:00", 0, 60]
+            elif len(pendingTasks) < commands and jobCode not in dependencies:
+                slaveName = slaveNames[len(pendingTasks) % slaves]
+                startTime = time.time()
+                taskData = [frame, frame + 9, "rendering", slaveName, "", startTime, ""]
+                pendingTasks.append([slaveName, jobCode, taskName])
+            else:
+                taskData = [frame, frame + 9, "ready", "unassigned", "", "", ""]
+
+            jobTasks[taskName] = taskData
+
+        jobPath = os.path.join(repPath, "Jobs", jobCode)
+        os.makedirs(os.path.join(jobPath, "JobFiles"))
+        writeJson(
+            os.path.join(jobPath, "PandoraJob.json"),
+            {
+                "information": {
+                    "jobName": "bench_%s" % jobCode,
+                    "jobcode": jobCode,
+                    "sceneName": "bench.hip",
+                    "projectName": "Benchmark",
+                    "program": "Houdini",
+                    "fileCount": 0,
+                    "userName": "bench",
+                    "submitWorkstation": "bench",
+                },
+                "jobglobals": {
+                    "priority": 50,
+                    "concurrentTasks": 1,
+                    "taskTimeout": 180,
+                    "listSlaves": "All",
+                    "jobDependecies": dependencies.get(jobCode, []),
+                },
+                "jobtasks": jobTasks,
+            },
+        )
+
+    writeJson(
+        os.path.join(repPath, "PriorityList.json"),
+        dict([[x, {"priority": 50}] for x in jobCodes]),
+    )
+
+    # every command is sent in its own envelope, so each one is a separate file
+    for slaveName, jobCode, taskName in pendingTasks:
+        getSlaveMailbox(root, slaveName).send([getFinishedCmd(jobCode, taskName)])
+
+    return slaveNames
+
+
+def getFinishedCmd(jobCode, taskName):
+    return ["taskUpdate", jobCode, taskName, "finished", "0:01:00", 0, 60, 0]
+
+
+def getSlaveMailbox(root, slaveName):
+    slavePath = os.path.join(root, "Slaves", "S_%s" % slaveName)
+    return PandoraMailbox.Mailbox(
+        os.path.join(slavePath, "Communication"),
+        "slaveOut",
+        slaveName,
+        PandoraMailbox.MailboxCounter(os.path.join(slavePath, "MailboxCounters.json")),
+    )
+
+
+# answers the renderTask commands of the coordinator with a finished task and returns
+# the number of answered commands
+def simulateSlaves(root, slaveNames):
+    answered = 0
+    for slaveName in slaveNames:
+        slavePath = os.path.join(root, "Slaves", "S_%s" % slaveName)
+        comPath = os.path.join(slavePath, "Communication")
+        updates = []
+        for fileName in PandoraMailbox.sortCommandFiles(os.listdir(comPath), "slaveIn"):
+            cmdPath = os.path.join(comPath, fileName)
+            for command in PandoraMailbox.readCommands(cmdPath):
+                if command[0] == "renderTask":
+                    updates.append(getFinishedCmd(command[1], command[3]))
+
+            os.remove(cmdPath)
+
+        if updates:
+            getSlaveMailbox(root, slaveName).send(updates)
+            answered += len(updates)
+
+        os.utime(os.path.join(slavePath, "slaveActive_%s" % slaveName), None)
+
+    return answered
+
+
+def getMemory():
+    if tracemalloc is not None:
+        return tracemalloc.get_traced_memory()[1]
+
+    import psutil
+
+    return psutil.Process(os.getpid()).memory_info().rss
+
+
+def getPercentile(values, quantile):
+    return PandoraMetrics.getPercentile(values, quantile)
+
+
+# runs the cycles and returns the measured numbers
+def runBenchmark(root, slaveNames, cycles):
+    import PandoraCoordinator
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+
+    coordinator = PandoraCoordinator.PandoraCoordinator(rootPath=root, runLoop=False)
+
+    assignTimes = []
+    assignJobs = coordinator.assignJobs
+
+    # the time from the start of the cycle until the slaves got their tasks
+    def measureAssignJobs():
+        result = assignJobs()
+        assignTimes.append(time.time())
+        return result
+
+    coordinator.assignJobs = measureAssignJobs
+
+    cycleResults = []
+    try:
+        for cycleNum in range(cycles):
+            cycleStart = time.time()
+            coordinator.startCoordination()
+            duration = time.time() - cycleStart
+
+            fileOps = dict([[x, 0] for x in counterNames])
+            lastCycle = coordinator.metrics.lastCycle if coordinator.metrics else None
+            if lastCycle is not None:
+                for phase in lastCycle["phases"].values():
+                    for counter in counterNames:
+                        fileOps[counter] += phase[counter]
+
+            assignLatency = None
+            if assignTimes:
+                assignLatency = assignTimes[-1] - cycleStart
+
+            cycleResults.append(
+                {
+                    "duration": duration,
+                    "assignLatency": assignLatency,
+                    "fileOps": fileOps,
+                    "phases": lastCycle["phases"] if lastCycle else {},
+                    "answered": simulateSlaves(root, slaveNames),
+                }
+            )
+            del assignTimes[:]
+    finally:
+        peakMemory = getMemory()
+        if tracemalloc is not None:
+            tracemalloc.stop()
+
+        coordinator.stopTransport()
+        coordinator.closeJobStore()
+        if coordinator.metrics is not None:
+            coordinator.metrics.uninstall()
+
+        if coordinator.logWriter is not None:
+            coordinator.logWriter.stop()
+
+    return {"cycles": cycleResults, "peakMemory": peakMemory}
+
+
+def runScenario(name, options, cycles, keep=False):
+    root = tempfile.mkdtemp(prefix="PandoraBenchmark_")
+    try:
+        setupStart = time.time()
+        slaveNames = createFarm(root, **options)
+        setupTime = time.time() - setupStart
+        result = runBenchmark(root, slaveNames, cycles)
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    durations = [x["duration"] for x in result["cycles"]]
+    latencies = [x["assignLatency"] for x in result["cycles"] if x["assignLatency"]]
+    steadyCycles = result["cycles"][1:] or result["cycles"]
+    fileOps = {}
+    for counter in counterNames:
+        fileOps[counter] = sum([x["fileOps"][counter] for x in steadyCycles]) / float(
+            len(steadyCycles)
+        )
+
+    return {
+        "scenario": name,
+        "options": options,
+        "root": root if keep else None,
+        "setupTime": setupTime,
+        "firstCycle": durations[0],
+        "cycleP50": getPercentile(durations[1:] or durations, 0.5),
+        "cycleMax": max(durations),
+        "assignLatencyP50": getPercentile(latencies, 0.5),
+        "assignedTasks": sum([x["answered"] for x in result["cycles"]]),
+        "fileOpsPerCycle": fileOps,
+        "peakMemoryMB": result["peakMemory"] / (1024.0 * 1024.0),
+        "cycles": result["cycles"],
+    }
+
+
+def printResult(result):
+    print("Scenario %s: %s" % (result["scenario"], result["options"]))
+    print("  first cycle:          %.3f s" % result["firstCycle"])
+    print(
+        "  cycle time p50 / max: %.3f s / %.3f s"
+        % (result["cycleP50"], result["cycleMax"])
+    )
+    print("  assignment latency:   %.3f s" % result["assignLatencyP50"])
+    print("  assigned tasks:       %s" % result["assignedTasks"])
+    print(
+        "  file ops per cycle:   %s"
+        % ", ".join(["%s %d" % (x, result["fileOpsPerCycle"][x]) for x in counterNames])
+    )
+    print("  peak memory:          %.1f MB" % result["peakMemoryMB"])
+    if result["root"]:
+        print("  farm folder:          %s" % result["root"])
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description="Runs coordinator cycles against a synthetic farm."
+    )
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help="fixed scenarios: %s" % ", ".join(sorted(scenarios)),
+    )
+    parser.add_argument("--slaves", type=int)
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--tasks", type=int, help="tasks per job")
+    parser.add_argument("--chains", type=int, default=0, help="dependency chains")
+    parser.add_argument("--commands", type=int, default=0, help="pending command files")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--json", help="writes the results to this file")
+    parser.add_argument("--keep", action="store_true", help="keeps the farm folders")
+    args = parser.parse_args(args)
+
+    runs = []
+    for name in args.scenarios:
+        if name not in scenarios:
+            parser.error("unknown scenario: %s" % name)
+
+        runs.append([name, scenarios[name]])
+
+    if args.slaves or args.jobs or args.tasks:
+        runs.append(
+            [
+                "custom",
+                {
+                    "slaves": args.slaves or 10,
+                    "jobs": args.jobs or 50,
+                    "tasks": args.tasks or 100,
+                    "chains": args.chains,
+                    "commands": args.commands,
+                },
+            ]
+        )
+
+    if not runs:
+        runs.append(["small", scenarios["small"]])
+
+    results = []
+    for name, options in runs:
+        result = runScenario(name, options, args.cycles, keep=args.keep)
+        printResult(result)
+        results.append(result)
+
+    if args.json:
+        with io.open(args.json, "w", encoding="utf-8") as f:
+            f.write(u"%s" % json.dumps(results, indent=4))
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
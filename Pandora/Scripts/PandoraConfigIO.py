@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, time, json, errno, shutil, threading
+
+import PandoraManifest
+
+
+# Reads and writes the json configs of the coordinator, the slaves and the workstations.
+# A config is written to a temporary file in the same folder, which replaces the config
+# once it is complete, so that a reader never sees a half written file and no
+# verification or backup file is needed.
+# Sync clients lock files for a short time while they upload them. A write, which fails
+# because of such a lock, is kept in memory and retried with a growing delay on the next
+# read or write. Until then readConfig returns the pending data. A retry, which fails for
+# another reason, keeps the write pending and is reported through getWriteErrors, because
+# the callers already work with the new data.
+
+backupTag = ".bak"  # backups written by older versions
+retryDelays = [1, 2, 5, 10, 30]  # seconds between retries of a locked write
+lockErrors = [errno.EACCES, errno.EBUSY, errno.EAGAIN]
+lockWinErrors = [5, 32, 33]  # access denied, sharing violation, lock violation
+
+pendingWrites = {}  # path: {"data", "attempts", "nextTry"}
+pendingLock = threading.Lock()
+checkedPaths = set()  # configs, which were checked for old backups
+writeErrors = []  # [path, message] of failed retries, which weren't fetched yet
+
+
+def getKey(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+def isLockError(error):
+    if not isinstance(error, (IOError, OSError)):
+        return False
+
+    return (
+        getattr(error, "winerror", None) in lockWinErrors or error.errno in lockErrors
+    )
+
+
+# returns the content of a config or None if it doesn't exist. Raises ValueError if the
+# config is corrupt
+def readConfig(path):
+    retryPendingWrites()
+
+    with pendingLock:
+        pending = pendingWrites.get(getKey(path))
+
+    if pending is not None:
+        return pending["data"]
+
+    restoreBackup(path)
+
+    if not os.path.exists(path):
+        return None
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# returns True if the config was written and False if the write will be retried later
+def writeConfig(path, data, indent=4):
+    retryPendingWrites()
+
+    key = getKey(path)
+    restoreBackup(path)
+    try:
+        writeFile(path, data, indent)
+    except Exception as e:
+        if not isLockError(e):
+            raise
+
+        with pendingLock:
+            pendingWrites[key] = {
+                "data": data,
+                "path": path,
+                "indent": indent,
+                "attempts": 1,
+                "nextTry": time.time() + retryDelays[0],
+            }
+
+        return False
+
+    with pendingLock:
+        pendingWrites.pop(key, None)
+
+    return True
+
+
+def writeFile(path, data, indent=4):
+    tmpPath = os.path.join(
+        os.path.dirname(path), "~%s.%s.tmp" % (os.path.basename(path), os.getpid())
+    )
+    try:
+        with open(tmpPath, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+
+        PandoraManifest.replaceFile(tmpPath, path)
+    except Exception:
+        if os.path.exists(tmpPath):
+            try:
+                os.remove(tmpPath)
+            except Exception:
+                pass
+
+        raise
+
+
+# writes the pending configs, which are due. Returns the number of configs, which are
+# still pending
+def retryPendingWrites(force=False):
+    if not pendingWrites:
+        return 0
+
+    with pendingLock:
+        due = [
+            [x, pendingWrites[x]]
+            for x in pendingWrites
+            if force or pendingWrites[x]["nextTry"] <= time.time()
+        ]
+
+    for key, pending in due:
+        try:
+            if os.path.exists(os.path.dirname(pending["path"])):
+                writeFile(pending["path"], pending["data"], pending["indent"])
+        except Exception as e:
+            # the same error is only reported once per write
+            if not isLockError(e) and pending.get("error") != str(e):
+                pending["error"] = str(e)
+                with pendingLock:
+                    writeErrors.append([pending["path"], str(e)])
+
+            delay = retryDelays[min(pending["attempts"], len(retryDelays) - 1)]
+            pending["attempts"] += 1
+            pending["nextTry"] = time.time() + delay
+            continue
+
+        with pendingLock:
+            if pendingWrites.get(key) is pending:
+                del pendingWrites[key]
+
+    return len(pendingWrites)
+
+
+# returns and clears the errors of the retried writes. This module doesn't log, so the
+# callers write them to their logs
+def getWriteErrors():
+    with pendingLock:
+        errors = list(writeErrors)
+        del writeErrors[:]
+
+    return errors
+
+
+def hasPendingWrite(path):
+    return getKey(path) in pendingWrites
+
+
+# restores a backup, which was written by an older version, when the config is used for
+# the first time. The oldest backup is used as the older versions did
+def restoreBackup(path):
+    key = getKey(path)
+    if key in checkedPaths:
+        return False
+
+    checkedPaths.add(key)
+    folder = os.path.dirname(path)
+    if not os.path.isdir(folder):
+        checkedPaths.discard(key)
+        return False
+
+    backups = []
+    for fileName in os.listdir(folder):
+        if not fileName.startswith(os.path.basename(path) + backupTag):
+            continue
+
+        try:
+            fileStat = os.stat(os.path.join(folder, fileName))
+        except OSError:
+            continue
+
+        backups.append([fileStat.st_mtime, fileStat.st_size, fileName])
+
+    if not backups:
+        return False
+
+    validBackup = sorted(backups)[0]
+    shutil.copy2(os.path.join(folder, validBackup[2]), path)
+
+    for backup in backups:
+        try:
+            os.remove(os.path.join(folder, backup[2]))
+        except OSError:
+            pass
+
+    return True
@@ -36,6 +36,7 @@ import os
 import sys, os, io, time, shutil, socket, traceback, subprocess, json
 import random
 import string
+import threading
 from functools import wraps
 
 if sys.version[0] == "3":
@@ -53,13 +54,160 @@ pndPath = os.path.join(
 sys.path.append(pndPath)
 import psutil
 
+import PandoraWarnings
+import PandoraScheduling
+import PandoraWatcher
+import PandoraSnapshot
+import PandoraManifest
+import PandoraTransfer
+import PandoraRegistry
+import PandoraMailbox
+import PandoraFarmState
+import PandoraJobStore
+import PandoraConfigIO
+import PandoraMetrics
+
+try:
+    import PandoraTransport
+except (ImportError, SyntaxError):
+    PandoraTransport = None  # the direct connection to the slaves requires python 3
+
+if pVersion == 3:
+    import queue
+else:
+    import Queue as queue
+
+
+# copies the json data of a config, so that cached configs can't be modified by the caller
+def copyConfigData(data):
+    if isinstance(data, dict):
+        return dict((k, copyConfigData(v)) for k, v in data.items())
+    elif isinstance(data, list):
+        return [copyConfigData(x) for x in data]
+    else:
+        return data
+
+
+# writes queued log lines in batches from a background thread
+class LogWriter(threading.Thread):
+    def __init__(self, logPath, batchInterval=0.5):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.logPath = logPath
+        self.batchInterval = batchInterval  # seconds to wait for more lines before writing
+        self.records = queue.Queue()
+        self.stopped = False
+
+    def write(self, line):
+        self.records.put(line)
+
+    # blocks until all lines, which were queued before, are written to disk
+    def flush(self, timeout=10):
+        if not self.is_alive():
+            return False
+
+        written = threading.Event()
+        self.records.put(written)
+        return written.wait(timeout)
+
+    def stop(self, timeout=10):
+        self.stopped = True
+        return self.flush(timeout)
+
+    def run(self):
+        while not (self.stopped and self.records.empty()):
+            try:
+                records = [self.records.get(timeout=1)]
+            except queue.Empty:
+                continue
+
+            deadline = time.time() + self.batchInterval
+            while not isinstance(records[-1], threading.Event):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+
+                try:
+                    records.append(self.records.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            lines = [x for x in records if not isinstance(x, threading.Event)]
+            if lines:
+                self.writeLines(lines)
+
+            for record in records:
+                if isinstance(record, threading.Event):
+                    record.set()
+
+    def writeLines(self, lines):
+        try:
+            if not os.path.exists(os.path.dirname(self.logPath)):
+                os.makedirs(os.path.dirname(self.logPath))
+
+            with io.open(self.logPath, "a", encoding="utf-16") as log:
+                log.write("".join(lines))
+        except Exception as e:
+            print("could not write to log %s: %s" % (self.logPath, e))
+
 
 class PandoraCoordinator:
-    def __init__(self):
+    # rootPath overrides the sync folder from the Pandora config and with runLoop=False
+    # the cycles are not started, so that they can be run by a benchmark
+    def __init__(self, rootPath=None, runLoop=True):
         try:
             self.version = "v1.1.0.6"
 
+            self.configCache = {}  # parsed configs by path, validated by mtime and size
+            self.cacheStats = {"hits": 0, "misses": 0, "deferred": 0, "flushed": 0}
+            self.configVersion = 0  # increased, whenever a cached config is replaced
+            self.jobSummaries = {}  # farm state summaries with the config version they are from
+            self.rechunkJobCodes = set()  # jobs with finished tasks since the last cycle
+            self.taskProgress = {}  # reported frames of the rendering tasks per job
+            self.deferConfigWrites = False  # job configs are written once at the end of a cycle
+            self.handledCmdFiles = []
+            self.outboxes = {}  # mailboxes of the slaves, flushed at the end of a cycle
+            self.mailboxCounter = None
+            self.debugMode = True  # read from the coordinator settings once per cycle
+            self.logWriter = None
+            self.warningsJournal = None
+            self.warningsLimit = 500  # maximum number of coordinator warnings
+            self.schedulingIndex = None  # jobs with ready tasks, built on the first cycle
+            self.dependencyIndex = None  # completion state of the jobs and their dependencies
+            self.deadlineIndex = None  # timeouts of the busy tasks and busy tasks per slave
+
             self.coordUpdateTime = 5  # seconds
+            self.eventDriven = False  # start a cycle as soon as new commands or jobs arrive
+            self.maxIdleTime = 60  # seconds between two cycles in event-driven mode without events
+            self.debounceTime = 1  # seconds without new files before a cycle starts
+            self.watcher = None
+            self.snapshot = PandoraSnapshot.DirectorySnapshot()
+            self.snapshotRefreshTime = 600  # seconds after which all cached listings are read again
+            self.lastSnapshotRefresh = time.time()
+            self.releaseManifest = None  # manifest of the files in Scripts/PandoraSlaves
+            self.slaveReleases = {}  # release version, which was distributed to each slave
+            self.linkJobFiles = True  # link job files into the slave folders instead of copying
+            self.jobReferences = None
+            self.assetStores = {}  # asset stores of the repository and the slaves by folder
+            self.transferThreads = 4  # number of files, which are copied at the same time
+            self.verifyTransfers = False  # compare checksums after copying render output
+            self.contactTimesChanged = True
+            self.slaveRegistry = None  # published information about all slaves
+            self.transportEnabled = False  # direct connection to the slaves
+            self.transportPort = 6270
+            self.transportHost = ""  # address, which is published to the slaves
+            self.transport = None
+            self.transportAddress = None
+            self.farmState = None  # published summary of all jobs and slaves
+            self.publishedLogs = None  # content of LogCache.json
+            self.logRequests = {}  # requested job configs and slave logs: {(type, name): time}
+            self.warningCounts = {}  # number of slave warnings: {path: [mtime, size, count]}
+            self.useJobStore = False  # keep the jobs in a SQLite database in the repository
+            self.jobStore = None
+            self.cycleMetrics = False  # measure the phases of each cycle
+            self.profileCycles = 0  # number of slowest cycles, which are kept as cProfile
+            self.taskDuration = 0  # seconds a task should render after re-splitting, 0 disables it
+            self.metrics = None
             self.activeThres = 10  # time in min after a slave becomes inactive
             self.notifySlaveInterval = (
                 10
@@ -70,16 +218,18 @@ class PandoraCoordinator:
             self.lastConnectionCheckTime = time.time()
             self.lastNotifyTime = time.time()
 
-            pandoraConfig = os.path.join(
-                os.environ["userprofile"], "Documents", "Pandora", "Pandora.json"
-            )
             self.repPath = ""
             self.localMode = True
             self.restartGDriveEnabled = False
             self.coordConf = ""
 
             curPath = os.path.dirname(os.path.abspath(__file__))
-            if not curPath.replace("\\", "/").endswith("/Scripts/PandoraCoordinator"):
+            if rootPath is not None:
+                self.coordBasePath = os.path.join(rootPath, "Scripts", "PandoraCoordinator")
+            elif not curPath.replace("\\", "/").endswith("/Scripts/PandoraCoordinator"):
+                pandoraConfig = os.path.join(
+                    os.environ["userprofile"], "Documents", "Pandora", "Pandora.json"
+                )
                 cData = {}
                 cData["coordEnabled"] = ["coordinator", "enabled"]
                 cData["localMode"] = ["globals", "localMode"]
@@ -170,15 +320,35 @@ class PandoraCoordinator:
             self.coordConf = os.path.join(self.coordBasePath, "Coordinator_Settings.json")
             self.actSlvPath = os.path.join(self.coordBasePath, "ActiveSlaves.json")
             self.coordWarningsConf = os.path.join(
-                self.coordBasePath, "Coordinator_Warnings_%s.json" % socket.gethostname()
+                self.coordBasePath, "Coordinator_Warnings_%s.jsonl" % socket.gethostname()
             )
             self.logCache = os.path.join(self.slPath, "Workstations", "Logs", "Coordinator", "LogCache.json")
+            self.farmState = PandoraFarmState.FarmStatePublisher(
+                os.path.join(os.path.dirname(self.logCache), PandoraFarmState.farmStateName)
+            )
+
+            self.warningsJournal = PandoraWarnings.WarningsJournal(
+                self.coordWarningsConf,
+                limit=self.warningsLimit,
+                legacyPath=self.coordWarningsConf[:-1],
+            )
+            self.jobReferences = PandoraTransfer.JobReferences(
+                os.path.join(self.coordBasePath, "JobReferences.json"), self.slPath
+            )
+            self.slaveRegistry = PandoraRegistry.SlaveRegistry(
+                os.path.join(self.coordBasePath, PandoraRegistry.registryName)
+            )
+
+            self.refreshLogSettings()
+            self.logWriter = LogWriter(self.coordLog)
+            self.logWriter.start()
 
             self.close = False
             self.tvRequests = []
             self.slaveContactTimes = {}
             self.renderingTasks = []
             self.collectTasks = {}
+            self.collectManifests = {}  # output manifests of finished tasks per slave and job
             self.jobDirs = []
 
             self.writeLog(
@@ -212,6 +382,9 @@ class PandoraCoordinator:
 
             self.getGDrivePath()
 
+            if not runLoop:
+                return
+
             cmdPath = os.path.join(self.coordBasePath, "command.txt")
 
             while not self.close:
@@ -230,9 +403,14 @@ class PandoraCoordinator:
                             break
 
                 self.startCoordination()
-                time.sleep(self.coordUpdateTime)
+                self.waitForNextCycle()
 
+            self.stopTransport()
+            self.closeJobStore()
+            PandoraConfigIO.retryPendingWrites(force=True)
+            self.logWriteErrors()
             self.writeLog("Coordinator closed", 1)
+            self.flushLog()
             self.notifyWorkstations()
 
         except Exception as e:
@@ -241,6 +419,9 @@ class PandoraCoordinator:
                 "ERROR - init - %s - %s - %s" % (str(e), exc_type, exc_tb.tb_lineno), 3
             )
 
+        if self.logWriter is not None:
+            self.logWriter.stop()
+
         sys.exit()
 
     def err_decorator(func):
@@ -261,6 +442,20 @@ class PandoraCoordinator:
 
     def writeLog(self, text, level=0, writeWarning=True):
         # print text
+        if level == 0 and not self.debugMode:
+            return
+        elif level > 1 and writeWarning:
+            self.writeWarning(text, level)
+
+        line = "[%s] %s - %s : %s\n" % (level, os.getpid(), time.strftime("%d/%m/%y %X"), text)
+
+        if self.logWriter is not None and self.logWriter.is_alive():
+            self.logWriter.write(line)
+            if level == 3:
+                self.logWriter.flush()
+
+            return
+
         if not hasattr(self, "coordLog") or not os.path.exists(self.coordLog):
             try:
                 logPath = self.coordLog
@@ -274,58 +469,43 @@ class PandoraCoordinator:
         else:
             logPath = self.coordLog
 
-        if hasattr(self, "coordConf"):
-            debug = self.getConfig("settings", "debugMode", suppressError=True)
-            if debug is None and self.coordConf != "":
-                self.setConfig("settings", "debugMode", False, suppressError=True)
-                debug = False
-        else:
-            debug = True
-
-        if level == 0 and not debug:
-            return
-        elif level > 1 and writeWarning:
-            self.writeWarning(text, level)
-
         with io.open(logPath, "a", encoding="utf-16") as log:
-            log.write(
-                    "[%s] %s - %s : %s\n"
-                    % (level, os.getpid(), time.strftime("%d/%m/%y %X"), text)
-            )
+            log.write(line)
 
         # print "[%s] %s : %s\n" % (level, time.strftime("%d/%m/%y %X"), text)
 
-    def writeWarning(self, text, level=2):
-        if not os.path.exists(self.coordWarningsConf):
-            try:
-                open(self.coordWarningsConf, "a").close()
-            except:
-                self.writeLog("Cannot create warning config", 2, writeWarning=False)
-                return None
-
-        warningConfig = self.getConfig(
-            configPath=self.coordWarningsConf, getConf=True, suppressError=True
-        )
-        if warningConfig is None:
-            return
+    def flushLog(self):
+        if self.logWriter is not None:
+            self.logWriter.flush()
 
-        warnings = []
-        if "warnings" in warningConfig:
-            for i in warningConfig["warnings"]:
-                warnings.append(warningConfig["warnings"][i])
+    # the log settings are read once per cycle instead of for every log line
+    @err_decorator
+    def refreshLogSettings(self):
+        debug = self.getConfig("settings", "debugMode", suppressError=True)
+        if debug is None and self.coordConf != "":
+            self.setConfig("settings", "debugMode", False, suppressError=True)
+            debug = False
 
-            warnings = [x for x in warnings if x[0] != text]
+        self.debugMode = bool(debug)
 
-        warnings.insert(0, [text, time.time(), level])
+        warnLimit = self.getConfig("settings", "warningsLimit", suppressError=True)
+        if warnLimit is None and self.coordConf != "":
+            self.setConfig("settings", "warningsLimit", self.warningsLimit, suppressError=True)
+        elif warnLimit is not None:
+            self.warningsLimit = warnLimit
 
-        warningConfig = {"warnings": {}}
+        if self.warningsJournal is not None:
+            self.warningsJournal.limit = self.warningsLimit
 
-        for idx, val in enumerate(warnings):
-            warningConfig["warnings"]["warning%s" % idx] = val
+    # warnings are appended to a journal, which gets compacted when it exceeds the warnings limit
+    def writeWarning(self, text, level=2):
+        if self.warningsJournal is None:
+            return
 
-        self.setConfig(
-            configPath=self.coordWarningsConf, confData=warningConfig, suppressError=True
-        )
+        try:
+            self.warningsJournal.add(text, level)
+        except Exception as e:
+            self.writeLog("Cannot write warning: %s" % e, 2, writeWarning=False)
 
     @err_decorator
     def checkCommands(self):
@@ -366,54 +546,52 @@ class PandoraCoordinator:
 
             isCoordConf = configPath == self.coordConf
 
-            if isCoordConf and not os.path.exists(configPath):
-                self.createUserPrefs()
+            userConfig = self.getCachedConfig(configPath)
 
-            if not os.path.exists(os.path.dirname(configPath)):
-                return
+            if userConfig is None:
+                if isCoordConf and not os.path.exists(configPath):
+                    self.createUserPrefs()
 
-            if len(
-                [
-                    x
-                    for x in os.listdir(os.path.dirname(configPath))
-                    if x.startswith(os.path.basename(configPath) + ".bak")
-                ]
-            ):
-                self.restoreConfig(configPath)
+                if not os.path.exists(os.path.dirname(configPath)):
+                    return
 
-            userConfig = {}
+                userConfig = {}
 
-            try:
-                if os.path.exists(configPath):
-                    with open(configPath, "r") as f:
-                        userConfig = json.load(f)
-            except:
-                if isCoordConf:
-                    warnStr = "The coordinator preferences file seems to be corrupt.\n\nIt will be reset, which means all coordinator settings will fall back to their defaults."
-                else:
-                    warnStr = "Cannot read the following file:\n\n%s" % configPath
+                try:
+                    storedConfig = self.readStoredConfig(configPath)
+                    if storedConfig is not None:
+                        userConfig = storedConfig
+                    elif os.path.exists(configPath):
+                        fileStat = os.stat(configPath)
+                        userConfig = PandoraConfigIO.readConfig(configPath) or {}
+                        self.updateConfigCache(configPath, userConfig, fileStat=fileStat)
+                except:
+                    if isCoordConf:
+                        warnStr = "The coordinator preferences file seems to be corrupt.\n\nIt will be reset, which means all coordinator settings will fall back to their defaults."
+                    else:
+                        warnStr = "Cannot read the following file:\n\n%s" % configPath
 
-                    if not suppressError:
-                        self.writeWarning(warnStr, 2)
-                    # print warnStr
+                        if not suppressError:
+                            self.writeWarning(warnStr, 2)
+                        # print warnStr
 
-                if isCoordConf:
-                    self.createUserPrefs()
-                    with open(configPath, "r") as f:
-                        userConfig = json.load(f)
+                    if isCoordConf:
+                        self.createUserPrefs()
+                        userConfig = PandoraConfigIO.readConfig(configPath) or {}
 
+            # the cached data is shared between all phases, so callers only get copies
             if getConf:
-                return userConfig
+                return copyConfigData(userConfig)
 
             if getOptions:
                 if cat in userConfig:
-                    return userConfig[cat].values()
+                    return copyConfigData(list(userConfig[cat].values()))
                 else:
                     return []
 
             if getItems:
                 if cat in userConfig:
-                    return userConfig[cat]
+                    return copyConfigData(userConfig[cat])
                 else:
                     return {}
 
@@ -428,7 +606,7 @@ class PandoraCoordinator:
                 param = rData[i][1]
 
                 if cat in userConfig and param in userConfig[cat]:
-                    returnData[i] = userConfig[cat][param]
+                    returnData[i] = copyConfigData(userConfig[cat][param])
                 else:
                     returnData[i] = None
 
@@ -469,18 +647,14 @@ class PandoraCoordinator:
             if isCoordConf and not os.path.exists(configPath):
                 self.createUserPrefs()
 
-            fcontent = os.listdir(os.path.dirname(configPath))
-            if len(
-                [x for x in fcontent if x.startswith(os.path.basename(configPath) + ".bak")]
-            ):
-                self.restoreConfig(configPath)
+            userConfig = self.getCachedConfig(configPath)
 
             if confData is None:
-                userConfig = {}
                 try:
-                    if os.path.exists(configPath):
-                        with open(configPath, "r") as f:
-                            userConfig = json.load(f)
+                    if userConfig is None:
+                        userConfig = PandoraConfigIO.readConfig(configPath) or {}
+                    else:
+                        userConfig = copyConfigData(userConfig)
                 except:
                     if isCoordConf:
                         warnStr = "The coordinator preferences file seems to be corrupt.\n\nIt will be reset, which means all coordinator settings will fall back to their defaults."
@@ -496,8 +670,7 @@ class PandoraCoordinator:
 
                     if isCoordConf:
                         self.createUserPrefs()
-                        with open(configPath, "r") as f:
-                            userConfig = json.load(f)
+                        userConfig = PandoraConfigIO.readConfig(configPath) or {}
 
                 if data is None:
                     data = [[cat, param, val]]
@@ -521,23 +694,16 @@ class PandoraCoordinator:
 
                     userConfig[cat][param] = val
             else:
-                userConfig = confData
+                userConfig = copyConfigData(confData)
 
-            with open(configPath, "w") as inifile:
-                json.dump(userConfig, inifile, indent=4)
+            if self.isDeferredConfig(configPath):
+                self.updateConfigCache(configPath, userConfig, pending=True)
+                self.cacheStats["deferred"] += 1
+                return
 
-            try:
-                with open(configPath, "r") as f:
-                    testConfig = json.load(f)
-                if confData is None:
-                    for i in userConfig:
-                        for k in userConfig[i]:
-                            if k not in testConfig[i]:
-                                raise RuntimeError
-            except:
-                backupPath = configPath + ".bak" + str(random.randint(1000000, 9999999))
-                with open(backupPath, "w") as inifile:
-                    json.dump(userConfig, inifile, indent=4)
+            PandoraConfigIO.writeConfig(configPath, userConfig)
+            self.updateConfigCache(configPath, userConfig)
+            self.storeConfig(configPath, userConfig)
         except Exception as e:
             exc_type, exc_obj, exc_tb = sys.exc_info()
             errStr = "%s ERROR - getconfig %s:\n%s\n\n%s" % (
@@ -551,77 +717,287 @@ class PandoraCoordinator:
                 raise e
 
     @err_decorator
-    def restoreConfig(self, configPath):
-        path = os.path.dirname(configPath)
-        backups = []
-        for i in os.listdir(path):
-            if not i.startswith(os.path.basename(configPath) + "."):
-                continue
+    def getCachedConfig(self, configPath):
+        cacheKey = os.path.normcase(os.path.abspath(configPath))
+        entry = self.configCache.get(cacheKey)
+        if entry is None:
+            self.cacheStats["misses"] += 1
+            return
+
+        # pending writes are newer than the file on disk
+        if entry["pending"]:
+            self.cacheStats["hits"] += 1
+            return entry["data"]
+
+        try:
+            fileStat = os.stat(configPath)
+        except OSError:
+            del self.configCache[cacheKey]
+            self.cacheStats["misses"] += 1
+            return
+
+        if (fileStat.st_mtime, fileStat.st_size) != entry["stat"]:
+            del self.configCache[cacheKey]
+            self.cacheStats["misses"] += 1
+            return
 
+        self.cacheStats["hits"] += 1
+        return entry["data"]
+
+    @err_decorator
+    def updateConfigCache(self, configPath, data, fileStat=None, pending=False):
+        cacheKey = os.path.normcase(os.path.abspath(configPath))
+        if pending:
+            entry = self.configCache.get(cacheKey)
+            self.configVersion += 1
+            self.configCache[cacheKey] = {
+                "stat": entry["stat"] if entry else None,
+                "data": data,
+                "pending": True,
+                "path": configPath,
+                "version": self.configVersion,
+            }
+            return
+
+        if fileStat is None:
             try:
-                backups.append(
-                    {
-                        "name": i,
-                        "time": os.path.getmtime(os.path.join(path, i)),
-                        "size": os.stat(os.path.join(path, i)).st_size,
-                    }
-                )
-            except Exception:
-                return False
+                fileStat = os.stat(configPath)
+            except OSError:
+                self.configCache.pop(cacheKey, None)
+                return
+
+        # flushing a pending write doesn't change the data
+        entry = self.configCache.get(cacheKey)
+        if entry is not None and entry["data"] is data:
+            version = entry["version"]
+        else:
+            self.configVersion += 1
+            version = self.configVersion
+
+        self.configCache[cacheKey] = {
+            "stat": (fileStat.st_mtime, fileStat.st_size),
+            "data": data,
+            "pending": False,
+            "path": configPath,
+            "version": version,
+        }
+
+    # returns the valid cache entry of a config and reads the config, if it isn't cached
+    @err_decorator
+    def getConfigEntry(self, configPath):
+        if self.getCachedConfig(configPath) is None:
+            self.getConfig(configPath=configPath, suppressError=True)
 
-        times = [x["time"] for x in backups]
+        return self.configCache.get(os.path.normcase(os.path.abspath(configPath)))
 
-        if len(times) == 0:
+    @err_decorator
+    def isDeferredConfig(self, configPath):
+        if not self.deferConfigWrites:
             return False
 
-        minTime = min(times)
+        return self.getJobCodeFromConfig(configPath) is not None
 
-        validBackup = None
-        for i in backups:
-            if i["time"] == minTime and (
-                validBackup is None or validBackup["size"] > i["size"]
-            ):
-                validBackup = i
+    # returns the job code if the path is a job config in the repository
+    def getJobCodeFromConfig(self, configPath):
+        if os.path.basename(configPath) != "PandoraJob.json":
+            return None
 
-        if validBackup is None:
-            return False
+        jobDir = os.path.dirname(os.path.abspath(configPath))
+        if os.path.normcase(os.path.dirname(jobDir)) != os.path.normcase(
+            os.path.abspath(self.jobPath)
+        ):
+            return None
 
-        try:
-            if os.path.exists(configPath):
-                os.remove(configPath)
-        except Exception:
-            warnStr = (
-                "Could not remove corrupt config in order to restore a backup config:\n\n%s"
-                % configPath
-            )
-            self.writeWarning(warnStr, 2)
+        return os.path.basename(jobDir)
 
-        validBuPath = os.path.join(path, validBackup["name"])
+    # configs, which couldn't be written, stay pending and are retried by PandoraConfigIO
+    @err_decorator
+    def logWriteErrors(self):
+        for path, message in PandoraConfigIO.getWriteErrors():
+            self.writeLog("ERROR - could not write config %s - %s" % (path, message), 3)
 
-        try:
-            shutil.copy2(validBuPath, configPath)
-        except:
-            warnStr = "Could not restore backup config:\n\n%s" % validBuPath
-            self.writeWarning(warnStr, 2)
-            return False
+    # writes all pending job configs (or only the given one) to disk
+    @err_decorator
+    def flushConfigWrites(self, configPath=None):
+        if configPath is None:
+            cacheKeys = list(self.configCache)
+        else:
+            cacheKeys = [os.path.normcase(os.path.abspath(configPath))]
 
-        for i in backups:
-            buPath = os.path.join(path, i["name"])
+        pending = []
+        for cacheKey in cacheKeys:
+            entry = self.configCache.get(cacheKey)
+            if entry is None or not entry["pending"]:
+                continue
+
+            if not os.path.exists(os.path.dirname(entry["path"])):
+                del self.configCache[cacheKey]
+                continue
+
+            pending.append(entry)
+
+        # with the job store all changes are committed in one transaction and the
+        # PandoraJob.json files are only exported copies
+        if self.jobStore is not None:
             try:
-                os.remove(buPath)
-            except:
-                pass
+                for entry in pending:
+                    self.jobStore.putJob(
+                        self.getJobCodeFromConfig(entry["path"]), entry["data"]
+                    )
+                self.jobStore.commit()
+            except Exception as e:
+                self.jobStore.rollback()
+                self.writeLog("ERROR - could not update the job store - %s" % e, 3)
 
-        return True
+        flushed = 0
+        for entry in pending:
+            try:
+                written = PandoraConfigIO.writeConfig(entry["path"], entry["data"])
+            except Exception as e:
+                self.writeLog(
+                    "ERROR - could not write config %s - %s" % (entry["path"], e), 3
+                )
+                continue
+
+            # the file is locked and the write is retried. The entry stays pending, so
+            # that it isn't validated against the old file
+            if not written:
+                self.writeLog("Config is locked, retrying later: %s" % entry["path"], 1)
+                continue
+
+            self.updateConfigCache(entry["path"], entry["data"])
+            flushed += 1
+
+            if self.jobStore is not None:
+                fileStat = os.stat(entry["path"])
+                self.jobStore.setFileStat(
+                    self.getJobCodeFromConfig(entry["path"]),
+                    (fileStat.st_mtime, fileStat.st_size),
+                )
+
+        if self.jobStore is not None:
+            self.jobStore.commit()
+
+        self.cacheStats["flushed"] += flushed
+        return flushed
 
     @err_decorator
-    def createUserPrefs(self):
-        if os.path.exists(self.coordConf):
+    def dropCachedConfig(self, configPath=None):
+        if configPath is None:
+            self.configCache = {}
+            return
+
+        cacheKey = os.path.normcase(os.path.abspath(configPath))
+        self.configCache.pop(cacheKey, None)
+
+    # opens or closes the job store database in the repository
+    @err_decorator
+    def updateJobStore(self):
+        if not self.useJobStore:
+            self.closeJobStore()
+            return
+
+        if self.jobStore is not None:
+            return
+
+        storePath = os.path.join(self.repPath, PandoraJobStore.storeName)
+        self.jobStore = PandoraJobStore.JobStore(storePath)
+        self.syncJobStore()
+        self.writeLog("Opened job store %s" % storePath, 1)
+
+    @err_decorator
+    def closeJobStore(self):
+        if self.jobStore is None:
+            return
+
+        self.jobStore.close()
+        self.jobStore = None
+
+    # imports all job configs, which were changed while the job store was closed
+    @err_decorator
+    def syncJobStore(self):
+        storedJobs = set(self.jobStore.getJobCodes())
+        imported = 0
+        for jobCode in os.listdir(self.jobPath):
+            confPath = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+            if not os.path.exists(confPath):
+                continue
+
+            storedJobs.discard(jobCode)
+            fileStat = os.stat(confPath)
+            if self.jobStore.getFileStat(jobCode) == (fileStat.st_mtime, fileStat.st_size):
+                continue
+
             try:
-                os.remove(self.coordConf)
+                jobConfig = PandoraConfigIO.readConfig(confPath)
             except:
-                pass
+                self.writeWarning("Cannot read the following file:\n\n%s" % confPath, 2)
+                continue
+
+            self.jobStore.putJob(jobCode, jobConfig, (fileStat.st_mtime, fileStat.st_size))
+            imported += 1
+
+        for jobCode in storedJobs:
+            self.jobStore.removeJob(jobCode)
+
+        self.jobStore.setPriorities(
+            self.getConfig(configPath=self.prioList, getConf=True) or {}
+        )
+        self.jobStore.commit()
+        self.writeLog(
+            "Synchronized job store: %s imported, %s removed jobs"
+            % (imported, len(storedJobs)),
+            1,
+        )
+
+    # returns a job config from the job store, unless the exported file was changed by
+    # someone else. In that case the file gets imported again
+    def readStoredConfig(self, configPath):
+        if self.jobStore is None:
+            return None
+
+        jobCode = self.getJobCodeFromConfig(configPath)
+        if jobCode is None or not os.path.exists(configPath):
+            return None
+
+        fileStat = os.stat(configPath)
+        if self.jobStore.getFileStat(jobCode) == (fileStat.st_mtime, fileStat.st_size):
+            jobConfig = self.jobStore.getJob(jobCode)
+        else:
+            jobConfig = PandoraConfigIO.readConfig(configPath)
+            self.jobStore.putJob(jobCode, jobConfig, (fileStat.st_mtime, fileStat.st_size))
+            self.commitJobStore()
+
+        self.updateConfigCache(configPath, jobConfig, fileStat=fileStat)
+        return jobConfig
+
+    # mirrors configs, which were written directly, into the job store
+    @err_decorator
+    def storeConfig(self, configPath, data):
+        if self.jobStore is None:
+            return
+
+        if os.path.normcase(os.path.abspath(configPath)) == os.path.normcase(
+            os.path.abspath(self.prioList)
+        ):
+            self.jobStore.setPriorities(data)
+        else:
+            jobCode = self.getJobCodeFromConfig(configPath)
+            if jobCode is None:
+                return
+
+            fileStat = os.stat(configPath)
+            self.jobStore.putJob(jobCode, data, (fileStat.st_mtime, fileStat.st_size))
+
+        self.commitJobStore()
 
+    # changes during a cycle are committed together with the job configs
+    def commitJobStore(self):
+        if self.jobStore is not None and not self.deferConfigWrites:
+            self.jobStore.commit()
+
+    @err_decorator
+    def createUserPrefs(self):
         if not os.path.exists(os.path.dirname(self.coordConf)):
             os.makedirs(os.path.dirname(self.coordConf))
 
@@ -636,12 +1012,19 @@ class PandoraCoordinator:
             }
         }
 
-        with open(self.coordConf, "w") as inifile:
-            json.dump(uconfig, inifile, indent=4)
+        # replaces a corrupt config in one step
+        PandoraConfigIO.writeConfig(self.coordConf, uconfig)
 
     @err_decorator
     def startCoordination(self):
+        self.refreshLogSettings()
         self.writeLog("Cycle start")
+        if self.metrics is not None:
+            self.metrics.startCycle()
+
+        cacheHits = self.cacheStats["hits"]
+        cacheMisses = self.cacheStats["misses"]
+        deferredWrites = self.cacheStats["deferred"]
         # checking slaves
         if os.path.exists(os.path.join(self.coordBasePath, "EXIT.txt")):
             return True
@@ -679,509 +1062,838 @@ class PandoraCoordinator:
             )
             self.restartGDriveEnabled = rgdrive
 
+        eDriven = self.getConfig("settings", "eventDriven")
+        if eDriven is None:
+            self.setConfig("settings", "eventDriven", self.eventDriven)
+        elif eDriven != self.eventDriven:
+            self.writeLog(
+                "Updating eventDriven from %s to %s" % (self.eventDriven, eDriven), 1
+            )
+            self.eventDriven = eDriven
+
+        newIdleTime = self.getConfig("settings", "maxIdleTime")
+        if newIdleTime is None:
+            self.setConfig("settings", "maxIdleTime", self.maxIdleTime)
+        elif newIdleTime != self.maxIdleTime:
+            self.writeLog(
+                "Updating maxIdleTime from %s to %s" % (self.maxIdleTime, newIdleTime), 1
+            )
+            self.maxIdleTime = newIdleTime
+
+        newDebounce = self.getConfig("settings", "debounceTime")
+        if newDebounce is None:
+            self.setConfig("settings", "debounceTime", self.debounceTime)
+        elif newDebounce != self.debounceTime:
+            self.writeLog(
+                "Updating debounceTime from %s to %s" % (self.debounceTime, newDebounce),
+                1,
+            )
+            self.debounceTime = newDebounce
+
+        linkFiles = self.getConfig("settings", "linkJobFiles")
+        if linkFiles is None:
+            self.setConfig("settings", "linkJobFiles", self.linkJobFiles)
+        elif linkFiles != self.linkJobFiles:
+            self.writeLog(
+                "Updating linkJobFiles from %s to %s" % (self.linkJobFiles, linkFiles), 1
+            )
+            self.linkJobFiles = linkFiles
+
+        threads = self.getConfig("settings", "transferThreads")
+        if threads is None:
+            self.setConfig("settings", "transferThreads", self.transferThreads)
+        elif threads != self.transferThreads:
+            self.writeLog(
+                "Updating transferThreads from %s to %s" % (self.transferThreads, threads), 1
+            )
+            self.transferThreads = threads
+
+        verify = self.getConfig("settings", "verifyTransfers")
+        if verify is None:
+            self.setConfig("settings", "verifyTransfers", self.verifyTransfers)
+        elif verify != self.verifyTransfers:
+            self.writeLog(
+                "Updating verifyTransfers from %s to %s" % (self.verifyTransfers, verify), 1
+            )
+            self.verifyTransfers = verify
+
+        transport = self.getConfig("settings", "transportEnabled")
+        if transport is None:
+            self.setConfig("settings", "transportEnabled", self.transportEnabled)
+        elif transport != self.transportEnabled:
+            self.writeLog(
+                "Updating transportEnabled from %s to %s"
+                % (self.transportEnabled, transport),
+                1,
+            )
+            self.transportEnabled = transport
+
+        port = self.getConfig("settings", "transportPort")
+        if port is None:
+            self.setConfig("settings", "transportPort", self.transportPort)
+        elif port != self.transportPort:
+            self.writeLog(
+                "Updating transportPort from %s to %s" % (self.transportPort, port), 1
+            )
+            self.transportPort = port
+
+        host = self.getConfig("settings", "transportHost")
+        if host is None:
+            self.setConfig("settings", "transportHost", self.transportHost)
+        elif host != self.transportHost:
+            self.writeLog(
+                "Updating transportHost from %s to %s" % (self.transportHost, host), 1
+            )
+            self.transportHost = host
+
+        self.updateTransport()
+
+        useStore = self.getConfig("settings", "jobStore")
+        if useStore is None:
+            self.setConfig("settings", "jobStore", self.useJobStore)
+        elif useStore != self.useJobStore:
+            self.writeLog(
+                "Updating jobStore from %s to %s" % (self.useJobStore, useStore), 1
+            )
+            self.useJobStore = useStore
+
+        metrics = self.getConfig("settings", "cycleMetrics")
+        if metrics is None:
+            self.setConfig("settings", "cycleMetrics", self.cycleMetrics)
+        elif metrics != self.cycleMetrics:
+            self.writeLog(
+                "Updating cycleMetrics from %s to %s" % (self.cycleMetrics, metrics), 1
+            )
+            self.cycleMetrics = metrics
+
+        profiles = self.getConfig("settings", "profileCycles")
+        if profiles is None:
+            self.setConfig("settings", "profileCycles", self.profileCycles)
+        elif profiles != self.profileCycles:
+            self.writeLog(
+                "Updating profileCycles from %s to %s" % (self.profileCycles, profiles), 1
+            )
+            self.profileCycles = profiles
+
+        self.updateMetrics()
+
+        taskDuration = self.getConfig("settings", "taskDuration")
+        if taskDuration is None:
+            self.setConfig("settings", "taskDuration", self.taskDuration)
+        elif taskDuration != self.taskDuration:
+            self.writeLog(
+                "Updating taskDuration from %s to %s" % (self.taskDuration, taskDuration),
+                1,
+            )
+            self.taskDuration = taskDuration
+
         self.activeSlaves = {}
         self.availableSlaves = []
 
         if not os.path.exists(self.jobPath):
             os.makedirs(self.jobPath)
 
-        self.getJobAssignments()
+        self.updateJobStore()
 
-        if not os.path.exists(os.path.join(self.slPath, "Slaves")):
-            os.makedirs(os.path.join(self.slPath, "Slaves"))
+        if self.schedulingIndex is None:
+            self.buildSchedulingIndex()
 
-        self.checkSlaves()
-        self.setConfig(configPath=self.actSlvPath, confData=self.slaveContactTimes)
+        if time.time() - self.lastSnapshotRefresh > self.snapshotRefreshTime:
+            self.snapshot.invalidate()
+            self.slaveReleases = {}
+            self.assetStores = {}
+            self.lastSnapshotRefresh = time.time()
 
-        if not self.localMode:
-            self.checkConnection()
-        self.checkRenderingTasks()
-        self.getAvailableSlaves()
-        self.assignJobs()
-        self.checkTvRequests()
-        if not self.localMode:
-            self.checkCollectTasks()
-        self.notifyWorkstations()
-        self.notifySlaves()
+        # all job config changes of this cycle are kept in memory and written once per job
+        self.deferConfigWrites = True
+        try:
+            self.measure("getJobAssignments", self.getJobAssignments)
+
+            if not os.path.exists(os.path.join(self.slPath, "Slaves")):
+                os.makedirs(os.path.join(self.slPath, "Slaves"))
+
+            self.measure("checkTransport", self.checkTransport)
+            self.measure("checkSlaves", self.checkSlaves)
+            if self.contactTimesChanged:
+                self.setConfig(configPath=self.actSlvPath, confData=self.slaveContactTimes)
+
+            if not self.localMode:
+                self.measure("checkConnection", self.checkConnection)
+            self.measure("checkRenderingTasks", self.checkRenderingTasks)
+            self.measure("rechunkJobs", self.rechunkJobs)
+            self.measure("getAvailableSlaves", self.getAvailableSlaves)
+            self.measure("assignJobs", self.assignJobs)
+            self.measure("checkTvRequests", self.checkTvRequests)
+            if not self.localMode:
+                self.measure("checkCollectTasks", self.checkCollectTasks)
+        finally:
+            self.deferConfigWrites = False
+            flushed = self.measure("flushConfigWrites", self.flushConfigWrites)
+            self.removeHandledCmdFiles()
+            self.measure("sendQueuedCommands", self.sendQueuedCommands)
+
+        self.logWriteErrors()
+        self.writeLog(
+            "Flushed %s job configs (%s deferred writes)"
+            % (flushed, self.cacheStats["deferred"] - deferredWrites)
+        )
+        self.flushLog()
+        self.measure("notifyWorkstations", self.notifyWorkstations)
+        self.measure("notifySlaves", self.notifySlaves)
+
+        snapshotCounters = self.snapshot.getCounters(reset=True)
+        self.writeLog(
+            "Sync folder snapshot: %s stats, %s directory scans in this cycle"
+            % (snapshotCounters["stats"], snapshotCounters["scans"])
+        )
+        self.writeLog(
+            "Config cache: %s hits, %s misses in this cycle (%s hits, %s misses total, %s cached files)"
+            % (
+                self.cacheStats["hits"] - cacheHits,
+                self.cacheStats["misses"] - cacheMisses,
+                self.cacheStats["hits"],
+                self.cacheStats["misses"],
+                len(self.configCache),
+            )
+        )
+
+        if self.metrics is not None:
+            cycleInfo = self.metrics.endCycle()
+            if cycleInfo is not None:
+                self.writeLog(
+                    "Cycle took %.3f s, slowest phase: %s (%.3f s)" % tuple(cycleInfo)
+                )
 
         self.writeLog("Cycle finished")
 
+    # runs a phase of the cycle and records its duration and file system access
+    def measure(self, phase, func, *args):
+        if self.metrics is None:
+            return func(*args)
+
+        return self.metrics.measure(phase, func, *args)
+
     @err_decorator
-    def handleCmd(self, cmFile, origin=""):
-        self.writeLog("Handle cmd file: %s" % cmFile)
+    def updateMetrics(self):
+        if not self.cycleMetrics:
+            if self.metrics is not None:
+                self.metrics.uninstall()
+                self.metrics = None
 
-        with open(cmFile, "r") as comFile:
-            cmdText = comFile.read()
-            command = None
-            try:
-                command = eval(cmdText)
-            except Exception as e:
-                exc_type, exc_obj, exc_tb = sys.exc_info()
-                self.writeLog(
-                    "ERROR -- handleCmd evalCmd -- %s\n%s\n%s\n%s\n%s"
-                    % (str(e), exc_type, exc_tb.tb_lineno, origin, cmdText),
-                    3,
-                )
+            return
 
-        if command is not None and type(command) == list:
-            for i in range(1):
-                if command[0] == "taskUpdate":
-                    if len(command) < 7:
-                        self.writeLog(
-                            "ERROR - taskupdate has not enough information: %s" % (command),
-                            1,
-                        )
-                        continue
+        if self.metrics is None:
+            self.metrics = PandoraMetrics.CycleMetrics(self.coordBasePath)
+            self.metrics.install()
 
-                    jobCode = command[1]
-                    taskName = command[2]
-                    taskStatus = command[3]
-                    taskTime = command[4]
-                    taskStart = command[5]
-                    taskEnd = command[6]
-                    if taskStatus == "finished":
-                        outputFileNum = int(command[7])
+        self.metrics.profileCycles = self.profileCycles
 
-                    jobSettings = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+    # waits coordUpdateTime seconds or, in event-driven mode, until new slave commands,
+    # workstation commands or job submissions arrive. Commands, which are received through
+    # the direct connection, end the waiting in both modes.
+    def waitForNextCycle(self):
+        if not self.eventDriven:
+            if self.watcher is not None:
+                self.watcher.close()
+                self.watcher = None
 
-                    if not os.path.exists(jobSettings):
-                        self.writeLog(
-                            "ERROR - jobSettings don't exist %s (%s)" % (jobCode, origin), 3
-                        )
-                        continue
+            if self.transport is not None:
+                self.transport.waitIncoming(self.coordUpdateTime)
+            else:
+                time.sleep(self.coordUpdateTime)
+            return
 
-                    jName = self.getConfig("information", "jobName", configPath=jobSettings)
-                    if jName is not None:
-                        jobName = jName
-                    else:
-                        jobName = jobCode
+        try:
+            if self.watcher is None:
+                self.watcher = PandoraWatcher.CoordinatorWatcher(
+                    self.slPath, self.coordBasePath
+                )
+                self.writeLog(
+                    "Started event-driven mode (%s)" % self.watcher.getBackendName(), 1
+                )
 
-                    taskData = self.getConfig("jobtasks", taskName, configPath=jobSettings)
-                    if taskData is None:
-                        self.writeLog(
-                            "ERROR - task is not listed %s - %s (%s)"
-                            % (jobName, taskName, origin),
-                            3,
-                        )
-                        continue
+            wake = None
+            if self.transport is not None:
+                wake = self.transport.incomingEvent
 
-                    if (
-                        type(taskData) != list
-                        or len(taskData) != 7
-                        or (taskData[2] == "rendering" and taskData[3] != origin)
-                        or taskData[2] in ["finished", "disabled"]
-                    ):
-                        self.writeLog(
-                            "Could not set taskdata on job %s for task %s - %s (%s)"
-                            % (jobName, taskName, command, origin),
-                            1,
-                        )
-                        continue
+            result = self.watcher.wait(
+                self.maxIdleTime, debounce=self.debounceTime, wake=wake
+            )
+            self.writeLog("Next cycle triggered by: %s" % result)
+        except Exception as e:
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            self.writeLog(
+                "ERROR - waitForNextCycle - %s - %s - %s"
+                % (str(e), exc_type, exc_tb.tb_lineno),
+                3,
+            )
+            self.watcher = None
+            time.sleep(self.coordUpdateTime)
 
-                    if (
-                        taskData[2] == "rendering"
-                        and [jobCode, taskName] in self.renderingTasks
-                    ):
-                        self.renderingTasks.remove([jobCode, taskName])
+    @err_decorator
+    def handleCmd(self, cmFile, origin=""):
+        # the file was already handled, but its changes are not written yet
+        if [cmFile, origin] in self.handledCmdFiles:
+            return
 
-                    taskData[2] = taskStatus
-                    if taskStatus == "ready":
-                        taskData[3] = "unassigned"
-                    else:
-                        taskData[3] = origin
-                    taskData[4] = taskTime
-                    taskData[5] = taskStart
-                    taskData[6] = taskEnd
-                    self.setConfig("jobtasks", taskName, taskData, configPath=jobSettings)
+        self.writeLog("Handle cmd file: %s" % cmFile)
 
-                    if (
-                        taskStatus == "rendering"
-                        and [jobCode, taskName] not in self.renderingTasks
-                    ):
-                        self.renderingTasks.append([jobCode, taskName])
+        try:
+            commands = PandoraMailbox.readEnvelope(cmFile)
+        except Exception as e:
+            commands = []
+            exc_type, exc_obj, exc_tb = sys.exc_info()
+            self.writeLog(
+                "ERROR -- handleCmd readCommands -- %s\n%s\n%s\n%s\n%s"
+                % (str(e), exc_type, exc_tb.tb_lineno, origin, cmFile),
+                3,
+            )
 
-                    if (
-                        taskStatus == "finished"
-                        and outputFileNum > 0
-                        and not self.localMode
-                    ):
-                        if origin in self.collectTasks:
-                            self.collectTasks[origin][jobCode] = outputFileNum
-                        else:
-                            self.collectTasks[origin] = {jobCode: outputFileNum}
+        # all commands of an envelope are handled before the file is removed
+        for cmdId, command in commands:
+            if self.transport is not None and self.transport.wasDelivered(cmdId):
+                self.writeLog("Skipping command, which was already received: %s" % cmdId)
+                continue
 
+            self.executeCmd(command, origin)
+
+        # while job configs are not written yet, the command files are kept, so that they
+        # get handled again if the coordinator stops before the end of the cycle
+        if self.deferConfigWrites:
+            self.handledCmdFiles.append([cmFile, origin])
+        else:
+            self.removeCmdFile(cmFile, origin)
+
+    @err_decorator
+    def executeCmd(self, command, origin=""):
+        for i in range(1):
+            if command[0] == "taskUpdate":
+                if len(command) < 7:
                     self.writeLog(
-                        "Updated Task %s in %s to %s (%s)"
-                        % (taskName, jobName, str(taskData), origin),
+                        "ERROR - taskupdate has not enough information: %s" % (command),
                         1,
                     )
+                    continue
 
-                elif command[0] == "setSetting":
-                    settingType = command[1]
-                    parentName = command[2]
-                    settingName = command[3]
-                    settingVal = command[4]
+                jobCode = command[1]
+                taskName = command[2]
+                taskStatus = command[3]
+                taskTime = command[4]
+                taskStart = command[5]
+                taskEnd = command[6]
+                if taskStatus == "finished":
+                    outputFileNum = int(command[7])
 
-                    if settingType == "Job":
-                        settingsPath = os.path.join(
-                            self.jobPath, parentName, "PandoraJob.json"
-                        )
-                        section = "jobglobals"
-                    elif settingType == "Slave":
-                        self.sendCommand(
-                            parentName, ["setSetting", settingName, settingVal]
-                        )
-                        self.writeLog(
-                            "Set config setting %s - %s: %s (%s)"
-                            % (parentName, settingName, settingVal, origin),
-                            1,
-                        )
+                jobSettings = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
 
-                        if (
-                            settingType == "Slave"
-                            and settingName in ["command", "corecommand"]
-                            and settingVal == "self.startTeamviewer()"
-                        ):
-                            if (
-                                len(
-                                    [
-                                        x
-                                        for x in self.tvRequests
-                                        if x["slave"] == parentName
-                                        and x["workstation"] == origin
-                                    ]
-                                )
-                                == 0
-                            ):
-                                self.tvRequests.append(
-                                    {
-                                        "slave": parentName,
-                                        "workstation": origin,
-                                        "requestTime": time.time(),
-                                    }
-                                )
-
-                        continue
-                    elif settingType == "Coordinator":
-                        settingsPath = self.coordConf
-                        section = "settings"
+                if not os.path.exists(jobSettings):
+                    self.writeLog(
+                        "ERROR - jobSettings don't exist %s (%s)" % (jobCode, origin), 3
+                    )
+                    continue
 
-                    if not os.path.exists(settingsPath):
-                        self.writeLog(
-                            "ERROR - settingsPath doesn't exist %s (%s)"
-                            % (parentName, origin),
-                            2,
-                        )
-                        continue
+                jName = self.getConfig("information", "jobName", configPath=jobSettings)
+                if jName is not None:
+                    jobName = jName
+                else:
+                    jobName = jobCode
 
-                    self.setConfig(
-                        section, settingName, settingVal, configPath=settingsPath
+                taskData = self.getConfig("jobtasks", taskName, configPath=jobSettings)
+                if taskData is None:
+                    self.writeLog(
+                        "ERROR - task is not listed %s - %s (%s)"
+                        % (jobName, taskName, origin),
+                        3,
                     )
+                    continue
 
-                    if settingType == "Job" and settingName == "priority":
-                        self.setConfig(
-                            parentName, "priority", settingVal, configPath=self.prioList
-                        )
-
+                # only the slave, which got the task, can update it. Ready tasks can be
+                # split again, so their names don't refer to the same frames anymore.
+                if (
+                    type(taskData) != list
+                    or len(taskData) != 7
+                    or taskData[2] not in ["assigned", "rendering"]
+                    or taskData[3] != origin
+                ):
                     self.writeLog(
-                        "Set config setting %s - %s: %s (%s)"
-                        % (parentName, settingName, settingVal, origin),
+                        "Could not set taskdata on job %s for task %s - %s (%s)"
+                        % (jobName, taskName, command, origin),
                         1,
                     )
+                    continue
 
-                elif command[0] == "deleteJob":
-                    if os.path.exists(self.prioList):
-                        self.setConfig(command[1], delete=True, configPath=self.prioList)
-                    else:
-                        self.writeLog(
-                            "WARNING - priolist does not exist (%s)" % (origin), 2
-                        )
+                if (
+                    taskData[2] == "rendering"
+                    and [jobCode, taskName] in self.renderingTasks
+                ):
+                    self.renderingTasks.remove([jobCode, taskName])
 
-                    jobPath = os.path.join(self.repPath, "Jobs", command[1])
-                    jobConf = os.path.join(jobPath, "PandoraJob.json")
+                taskData[2] = taskStatus
+                if taskStatus == "ready":
+                    taskData[3] = "unassigned"
+                else:
+                    taskData[3] = origin
+                taskData[4] = taskTime
+                taskData[5] = taskStart
+                taskData[6] = taskEnd
+                self.setTaskData(jobCode, taskName, taskData, configPath=jobSettings)
 
-                    projectName = ""
-                    jobCode = command[1]
-                    jobName = command[1]
+                if (
+                    taskStatus == "rendering"
+                    and [jobCode, taskName] not in self.renderingTasks
+                ):
+                    self.renderingTasks.append([jobCode, taskName])
 
-                    if os.path.exists(jobConf):
-                        cData = {}
-                        cData["jobName"] = ["information", "jobName"]
-                        cData["projectName"] = ["information", "projectName"]
-                        cData = self.getConfig(data=cData, configPath=jobConf)
+                if (
+                    taskStatus == "finished"
+                    and outputFileNum > 0
+                    and not self.localMode
+                ):
+                    if origin in self.collectTasks:
+                        self.collectTasks[origin][jobCode] = outputFileNum
+                    else:
+                        self.collectTasks[origin] = {jobCode: outputFileNum}
 
-                        if cData["jobName"] is not None:
-                            jobName = cData["jobName"]
+                    if len(command) > 8 and command[8]:
+                        slaveManifests = self.collectManifests.setdefault(origin, {})
+                        slaveManifests.setdefault(jobCode, []).append(command[8])
 
-                        if cData["projectName"] is not None:
-                            projectName = cData["projectName"]
+                self.writeLog(
+                    "Updated Task %s in %s to %s (%s)"
+                    % (taskName, jobName, str(taskData), origin),
+                    1,
+                )
 
-                    if os.path.exists(jobPath):
-                        shutil.rmtree(jobPath)
-                    else:
-                        self.writeLog(
-                            "WARNING - job %s did not exist before deletion (%s)"
-                            % (jobName, origin),
-                            2,
-                        )
+                # the split is checked once per cycle, not for each finished task
+                if taskStatus == "finished":
+                    self.rechunkJobCodes.add(jobCode)
 
-                    for m in os.listdir(os.path.join(self.slPath, "Slaves")):
-                        if not m.startswith("S_"):
-                            continue
+            elif command[0] == "taskProgress":
+                if len(command) < 5:
+                    self.writeLog(
+                        "ERROR - taskProgress has not enough information: %s" % (command),
+                        1,
+                    )
+                    continue
 
-                        slaveName = m[2:]
+                jobCode = command[1]
+                taskName = command[2]
+                jobSettings = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
 
-                        jobFiles = os.path.join(
-                            self.slPath, "Slaves", m, "AssignedJobs", command[1]
-                        )
-                        jobOutput = os.path.join(
-                            self.slPath, "Slaves", m, "Output", command[1]
-                        )
+                if not os.path.exists(jobSettings):
+                    continue
 
-                        for k in [jobFiles, jobOutput]:
-                            if os.path.exists(k):
-                                try:
-                                    shutil.rmtree(k)
-                                except:
-                                    self.writeLog(
-                                        "ERROR - cannot remove folder: %s (%s)"
-                                        % (k, origin),
-                                        3,
-                                    )
+                # progress updates can arrive after the task was finished or reassigned
+                taskData = self.getConfig("jobtasks", taskName, configPath=jobSettings)
+                if (
+                    type(taskData) != list
+                    or len(taskData) != 7
+                    or taskData[2] != "rendering"
+                    or taskData[3] != origin
+                ):
+                    self.writeLog(
+                        "Ignored progress of task %s in %s (%s)"
+                        % (taskName, jobCode, origin),
+                        0,
+                    )
+                    continue
 
-                        self.sendCommand(slaveName, ["deleteJob", str(jobCode)])
+                # the progress is only published in the farm state and isn't written
+                # to the job config
+                self.taskProgress.setdefault(jobCode, {})[taskName] = [
+                    command[3],
+                    command[4],
+                    time.time(),
+                ]
+                self.writeLog(
+                    "Task %s in %s rendered %s frames (%s)"
+                    % (taskName, jobCode, command[3], origin),
+                    0,
+                )
 
-                    for m in os.listdir(os.path.join(self.slPath, "Workstations")):
-                        if not m.startswith("WS_"):
-                            continue
+            elif command[0] == "setSetting":
+                settingType = command[1]
+                parentName = command[2]
+                settingName = command[3]
+                settingVal = command[4]
 
-                        logFile = os.path.join(
-                            self.slPath,
-                            "Workstations",
-                            m,
-                            "Logs",
-                            "Jobs",
-                            "PandoraJob.json",
-                        )
-                        jobOutput = os.path.join(
-                            self.slPath,
-                            "Workstations",
-                            m,
-                            "RenderOutput",
-                            projectName,
-                            command[1],
-                        )
-                        for k in [logFile, jobOutput]:
-                            if os.path.exists(k):
-                                try:
-                                    if os.path.isfile(k):
-                                        os.remove(k)
-                                    else:
-                                        shutil.rmtree(k)
-                                except:
-                                    self.writeLog(
-                                        "ERROR - cannot remove file(s): %s (%s)"
-                                        % (k, origin),
-                                        3,
-                                    )
-
-                    self.writeLog("Deleted Job %s (%s)" % (jobName, origin), 1)
-
-                elif command[0] == "restartTask":
-                    jobCode = command[1]
-                    taskNum = command[2]
-
-                    jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
-                    jName = self.getConfig("information", "jobName", configPath=jobConf)
-                    if jName is not None:
-                        jobName = jName
-                    else:
-                        jobName = jobCode
+                if settingType == "Job":
+                    settingsPath = os.path.join(
+                        self.jobPath, parentName, "PandoraJob.json"
+                    )
+                    section = "jobglobals"
+                elif settingType == "Slave":
+                    self.sendCommand(
+                        parentName, ["setSetting", settingName, settingVal]
+                    )
+                    self.writeLog(
+                        "Set config setting %s - %s: %s (%s)"
+                        % (parentName, settingName, settingVal, origin),
+                        1,
+                    )
+
+                    if (
+                        settingType == "Slave"
+                        and settingName in ["command", "corecommand"]
+                        and settingVal == "self.startTeamviewer()"
+                    ):
+                        if (
+                            len(
+                                [
+                                    x
+                                    for x in self.tvRequests
+                                    if x["slave"] == parentName
+                                    and x["workstation"] == origin
+                                ]
+                            )
+                            == 0
+                        ):
+                            self.tvRequests.append(
+                                {
+                                    "slave": parentName,
+                                    "workstation": origin,
+                                    "requestTime": time.time(),
+                                }
+                            )
 
-                    taskData = self.getConfig(
-                        "jobtasks", "task%04d" % taskNum, configPath=jobConf
+                    continue
+                elif settingType == "Coordinator":
+                    settingsPath = self.coordConf
+                    section = "settings"
+
+                if not os.path.exists(settingsPath):
+                    self.writeLog(
+                        "ERROR - settingsPath doesn't exist %s (%s)"
+                        % (parentName, origin),
+                        2,
                     )
-                    if taskData is None:
-                        self.writeLog(
-                            "Job %s has no task %s (%s)" % (jobName, taskNum, origin), 2
-                        )
-                        continue
+                    continue
 
-                    if taskData[2] in ["rendering", "assigned"]:
-                        self.sendCommand(
-                            taskData[3], ["cancelTask", jobCode, "task%04d" % taskNum]
-                        )
+                self.setConfig(
+                    section, settingName, settingVal, configPath=settingsPath
+                )
 
-                    taskData[2] = "ready"
-                    taskData[3] = "unassigned"
-                    taskData[4] = ""
-                    taskData[5] = ""
-                    taskData[6] = ""
+                if settingType == "Job" and settingName == "priority":
                     self.setConfig(
-                        "jobtasks", "task%04d" % taskNum, taskData, configPath=jobConf
+                        parentName, "priority", settingVal, configPath=self.prioList
                     )
+                    self.schedulingIndex.setPriority(parentName, settingVal)
+
+                if settingType == "Job" and settingName == "jobDependecies":
+                    self.dependencyIndex.setDependencies(
+                        parentName, self.getDependencyCodes(settingVal)
+                    )
+
+                if settingType == "Job" and settingName == "taskTimeout":
+                    self.deadlineIndex.setJobSettings(parentName, timeout=settingVal)
 
+                if settingType == "Job" and settingName == "concurrentTasks":
+                    self.deadlineIndex.setJobSettings(parentName, concurrent=settingVal)
+
+                self.writeLog(
+                    "Set config setting %s - %s: %s (%s)"
+                    % (parentName, settingName, settingVal, origin),
+                    1,
+                )
+
+            elif command[0] == "deleteJob":
+                if os.path.exists(self.prioList):
+                    self.setConfig(command[1], delete=True, configPath=self.prioList)
+                else:
                     self.writeLog(
-                        "Restarted Task %s from Job %s (%s)" % (taskNum, jobName, origin), 1
+                        "WARNING - priolist does not exist (%s)" % (origin), 2
                     )
 
-                elif command[0] == "disableTask":
-                    jobCode = command[1]
-                    taskNum = command[2]
-                    enable = command[3]
+                jobPath = os.path.join(self.repPath, "Jobs", command[1])
+                jobConf = os.path.join(jobPath, "PandoraJob.json")
 
-                    if enable:
-                        action = "enable"
-                    else:
-                        action = "disable"
+                projectName = ""
+                jobCode = command[1]
+                jobName = command[1]
 
-                    jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
-                    jName = self.getConfig("information", "jobName", configPath=jobConf)
-                    if jName is not None:
-                        jobName = jName
-                    else:
-                        jobName = jobCode
+                if os.path.exists(jobConf):
+                    cData = {}
+                    cData["jobName"] = ["information", "jobName"]
+                    cData["projectName"] = ["information", "projectName"]
+                    cData = self.getConfig(data=cData, configPath=jobConf)
+
+                    if cData["jobName"] is not None:
+                        jobName = cData["jobName"]
+
+                    if cData["projectName"] is not None:
+                        projectName = cData["projectName"]
+
+                self.dropCachedConfig(jobConf)
+                if self.jobStore is not None:
+                    self.jobStore.removeJob(jobCode)
+                    self.commitJobStore()
+
+                self.schedulingIndex.removeJob(jobCode)
+                self.dependencyIndex.removeJob(jobCode)
+                self.deadlineIndex.removeJob(jobCode)
 
-                    taskData = self.getConfig(
-                        "jobtasks", "task%04d" % taskNum, configPath=jobConf
+                if os.path.exists(jobPath):
+                    shutil.rmtree(jobPath)
+                else:
+                    self.writeLog(
+                        "WARNING - job %s did not exist before deletion (%s)"
+                        % (jobName, origin),
+                        2,
                     )
-                    if taskData is None:
-                        self.writeLog(
-                            "Job %s has no task %s (%s)" % (jobName, taskNum, origin), 2
-                        )
-                        continue
 
-                    if (
-                        (taskData[2] != "disabled" and enable)
-                        or (taskData[2] == "disabled" and not enable)
-                        or taskData[2] in ["finished", "error"]
-                    ):
+                self.releaseJobFiles(jobCode, origin)
+
+                for m in os.listdir(os.path.join(self.slPath, "Slaves")):
+                    if not m.startswith("S_"):
                         continue
 
-                    if enable:
-                        taskData[2] = "ready"
-                        taskData[3] = "unassigned"
-                    else:
-                        if taskData[2] in ["rendering", "assigned"]:
-                            self.sendCommand(
-                                taskData[3], ["cancelTask", jobCode, "task%04d" % taskNum]
-                            )
+                    slaveName = m[2:]
+
+                    jobFiles = os.path.join(
+                        self.slPath, "Slaves", m, "AssignedJobs", command[1]
+                    )
+                    jobOutput = os.path.join(
+                        self.slPath, "Slaves", m, "Output", command[1]
+                    )
+                    outputManifests = os.path.join(
+                        self.slPath,
+                        "Slaves",
+                        m,
+                        PandoraManifest.outputManifestFolder,
+                        command[1],
+                    )
+
+                    for k in [jobFiles, jobOutput, outputManifests]:
+                        if os.path.exists(k):
+                            try:
+                                shutil.rmtree(k)
+                            except:
+                                self.writeLog(
+                                    "ERROR - cannot remove folder: %s (%s)"
+                                    % (k, origin),
+                                    3,
+                                )
 
-                        taskData[2] = "disabled"
-                        taskData[3] = "unassigned"
-                        taskData[5] = ""
+                    self.sendCommand(slaveName, ["deleteJob", str(jobCode)])
 
-                    self.setConfig(
-                        "jobtasks", "task%04d" % taskNum, taskData, configPath=jobConf
+                for m in os.listdir(os.path.join(self.slPath, "Workstations")):
+                    if not m.startswith("WS_"):
+                        continue
+
+                    logFile = os.path.join(
+                        self.slPath,
+                        "Workstations",
+                        m,
+                        "Logs",
+                        "Jobs",
+                        "PandoraJob.json",
                     )
-                    self.writeLog(
-                        "%sd task %s from Job %s (%s)" % (action, taskNum, jobName, origin),
-                        1,
+                    jobOutput = os.path.join(
+                        self.slPath,
+                        "Workstations",
+                        m,
+                        "RenderOutput",
+                        projectName,
+                        command[1],
                     )
+                    for k in [logFile, jobOutput]:
+                        if os.path.exists(k):
+                            try:
+                                if os.path.isfile(k):
+                                    os.remove(k)
+                                else:
+                                    shutil.rmtree(k)
+                            except:
+                                self.writeLog(
+                                    "ERROR - cannot remove file(s): %s (%s)"
+                                    % (k, origin),
+                                    3,
+                                )
 
-                elif command[0] == "deleteWarning":
-                    warnType = command[1]
-                    slaveName = command[2]
-                    warnText = command[3]
-                    warnTime = command[4]
+                self.writeLog("Deleted Job %s (%s)" % (jobName, origin), 1)
 
-                    if warnType == "Coordinator":
-                        warningConfig = self.getConfig(
-                            configPath=self.coordWarningsConf, getConf=True
-                        )
+            elif command[0] == "restartTask":
+                jobCode = command[1]
 
-                        warnings = []
-                        if "warnings" in warningConfig:
-                            for i in warningConfig["warnings"]:
-                                warnings.append(warningConfig["warnings"][i])
+                jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
+                jName = self.getConfig("information", "jobName", configPath=jobConf)
+                if jName is not None:
+                    jobName = jName
+                else:
+                    jobName = jobCode
 
-                            warnings = [
-                                x
-                                for x in warnings
-                                if not (x[0] == warnText and x[1] == warnTime)
-                            ]
+                frames = command[3] if len(command) > 3 else None
+                taskName, taskData = self.getCommandTask(
+                    jobName, command[2], frames, origin, jobConf
+                )
+                if taskData is None:
+                    continue
 
-                        warningConfig = {"warnings": {}}
+                if taskData[2] in ["rendering", "assigned"]:
+                    self.sendCommand(taskData[3], ["cancelTask", jobCode, taskName])
 
-                        for idx, val in enumerate(warnings):
-                            warningConfig["warnings"]["warning%s" % idx] = val
+                taskData[2] = "ready"
+                taskData[3] = "unassigned"
+                taskData[4] = ""
+                taskData[5] = ""
+                taskData[6] = ""
+                self.setTaskData(jobCode, taskName, taskData, configPath=jobConf)
 
-                        self.setConfig(
-                            configPath=self.coordWarningsConf, confData=warningConfig
-                        )
+                self.writeLog(
+                    "Restarted Task %s from Job %s (%s)" % (taskName, jobName, origin), 1
+                )
 
-                    elif warnType == "Slave":
-                        self.sendCommand(slaveName, ["deleteWarning", warnText, warnTime])
+            elif command[0] == "disableTask":
+                jobCode = command[1]
+                enable = command[3]
 
-                    if warnType == "Slave":
-                        self.writeLog("Warning deleted: %s (%s)" % (slaveName, origin), 1)
-                    elif warnType == "Coordinator":
-                        self.writeLog("Coordinator warning deleted (%s)" % origin, 1)
+                if enable:
+                    action = "enable"
+                else:
+                    action = "disable"
 
-                elif command[0] == "clearWarnings":
-                    warnType = command[1]
-                    slaveName = command[2]
+                jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
+                jName = self.getConfig("information", "jobName", configPath=jobConf)
+                if jName is not None:
+                    jobName = jName
+                else:
+                    jobName = jobCode
 
-                    if warnType == "Coordinator":
-                        warnConfig = {"warnings": {}}
-                        self.setConfig(
-                            confData=warnConfig, configPath=self.coordWarningsConf
-                        )
+                frames = command[4] if len(command) > 4 else None
+                taskName, taskData = self.getCommandTask(
+                    jobName, command[2], frames, origin, jobConf
+                )
+                if taskData is None:
+                    continue
 
-                    elif warnType == "Slave":
-                        self.sendCommand(slaveName, ["clearWarnings"])
+                if (
+                    (taskData[2] != "disabled" and enable)
+                    or (taskData[2] == "disabled" and not enable)
+                    or taskData[2] in ["finished", "error"]
+                ):
+                    continue
 
-                    if warnType == "Slave":
-                        self.writeLog("Warnings cleared: %s (%s)" % (slaveName, origin), 1)
-                    elif warnType == "Coordinator":
-                        self.writeLog("Coordinator warnings cleared (%s)" % origin, 1)
+                if enable:
+                    taskData[2] = "ready"
+                    taskData[3] = "unassigned"
+                else:
+                    if taskData[2] in ["rendering", "assigned"]:
+                        self.sendCommand(taskData[3], ["cancelTask", jobCode, taskName])
 
-                elif command[0] == "clearLog":
-                    logType = command[1]
-                    logName = command[2]
+                    taskData[2] = "disabled"
+                    taskData[3] = "unassigned"
+                    taskData[5] = ""
 
-                    if logType == "Coordinator":
-                        logPath = self.coordLog
-                        open(logPath, "w").close()
+                self.setTaskData(jobCode, taskName, taskData, configPath=jobConf)
+                self.writeLog(
+                    "%sd task %s from Job %s (%s)" % (action, taskName, jobName, origin),
+                    1,
+                )
 
-                    elif logType == "Slave":
-                        self.sendCommand(logName, ["clearLog"])
+            elif command[0] == "deleteWarning":
+                warnType = command[1]
+                slaveName = command[2]
+                warnText = command[3]
+                warnTime = command[4]
 
-                    self.writeLog(
-                        "Cleared log for %s %s (%s)" % (logType, logName, origin), 1
-                    )
+                if warnType == "Coordinator":
+                    self.warningsJournal.delete(warnText, warnTime)
 
-                elif command[0] == "collectJob":
-                    jobCode = command[1]
+                elif warnType == "Slave":
+                    self.sendCommand(slaveName, ["deleteWarning", warnText, warnTime])
 
-                    jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
+                if warnType == "Slave":
+                    self.writeLog("Warning deleted: %s (%s)" % (slaveName, origin), 1)
+                elif warnType == "Coordinator":
+                    self.writeLog("Coordinator warning deleted (%s)" % origin, 1)
 
-                    jName = self.getConfig("information", "jobName", configPath=jobConf)
-                    if jName is not None:
-                        jobName = jName
-                    else:
-                        jobName = jobCode
+            elif command[0] == "clearWarnings":
+                warnType = command[1]
+                slaveName = command[2]
 
-                    copiedNum, errors, targetPath = self.collectOutput(jobCode=jobCode)
+                if warnType == "Coordinator":
+                    self.warningsJournal.clear()
 
-                    collectStr = "Job %s output collected. %s files copied to %s" % (
-                        jobName,
-                        copiedNum,
-                        targetPath,
-                    )
-                    if errors > 0:
-                        collectStr += " %s errors occured" % errors
-                        errorLvl = 3
-                    else:
-                        errorLvl = 1
+                elif warnType == "Slave":
+                    self.sendCommand(slaveName, ["clearWarnings"])
+
+                if warnType == "Slave":
+                    self.writeLog("Warnings cleared: %s (%s)" % (slaveName, origin), 1)
+                elif warnType == "Coordinator":
+                    self.writeLog("Coordinator warnings cleared (%s)" % origin, 1)
+
+            elif command[0] == "clearLog":
+                logType = command[1]
+                logName = command[2]
 
-                    self.writeLog(collectStr + " (%s)" % (origin), errorLvl)
+                if logType == "Coordinator":
+                    logPath = self.coordLog
+                    self.flushLog()
+                    open(logPath, "w").close()
+
+                elif logType == "Slave":
+                    self.sendCommand(logName, ["clearLog"])
+
+                self.writeLog(
+                    "Cleared log for %s %s (%s)" % (logType, logName, origin), 1
+                )
+
+            elif command[0] == "fetchLogs":
+                # the job config or the logs of a slave are mirrored to the workstations
+                # for the next minutes
+                if len(command) < 3 or command[1] not in ["job", "slave"]:
+                    self.writeLog("ERROR - invalid fetchLogs command: %s" % command, 1)
+                    continue
 
+                self.logRequests[(command[1], command[2])] = time.time()
+                self.writeLog(
+                    "Mirroring %s %s (%s)" % (command[1], command[2], origin)
+                )
+
+            elif command[0] == "collectJob":
+                jobCode = command[1]
+
+                jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
+
+                jName = self.getConfig("information", "jobName", configPath=jobConf)
+                if jName is not None:
+                    jobName = jName
+                else:
+                    jobName = jobCode
+
+                copiedNum, errors, targetPath = self.collectOutput(jobCode=jobCode)
+
+                collectStr = "Job %s output collected. %s files copied to %s" % (
+                    jobName,
+                    copiedNum,
+                    targetPath,
+                )
+                if errors > 0:
+                    collectStr += " %s errors occured" % errors
+                    errorLvl = 3
+                else:
+                    errorLvl = 1
+
+                self.writeLog(collectStr + " (%s)" % (origin), errorLvl)
+
+    @err_decorator
+    def removeCmdFile(self, cmFile, origin=""):
         try:
             os.remove(cmFile)
         except:
             self.writeLog("ERROR - cannot remove file: %s (%s)" % (cmFile, origin), 3)
 
+    @err_decorator
+    # the command files are kept, until all job configs were written
+    def removeHandledCmdFiles(self):
+        if any(x["pending"] for x in self.configCache.values()):
+            return
+
+        for cmFile, origin in self.handledCmdFiles:
+            self.removeCmdFile(cmFile, origin)
+
+        self.handledCmdFiles = []
+
     @err_decorator
     def searchUncollectedRnd(self):
         uncollRnds = {}
@@ -1194,20 +1906,14 @@ class PandoraCoordinator:
                     if n not in uncollRnds:
                         uncollRnds[n] = 0
 
-                    jobPath = os.path.join(slOutput, n)
-                    for k in os.walk(jobPath):
-                        for m in k[2]:
-                            filePath = os.path.join(k[0], m)
-                            relFilePath = filePath.replace(jobPath, "")
-                            while relFilePath.startswith("\\") or relFilePath.startswith(
-                                "/"
-                            ):
-                                relFilePath = relFilePath[1:]
-                            targetPath = os.path.join(
-                                os.path.dirname(self.slPath), "Projects", relFilePath
-                            )
-                            if not os.path.exists(targetPath):
-                                uncollRnds[n] += 1
+                    for relFilePath in self.getSlaveOutputFiles(
+                        os.path.join(slaveSyncPath, i), n
+                    ):
+                        targetPath = os.path.join(
+                            os.path.dirname(self.slPath), "Projects", relFilePath
+                        )
+                        if not os.path.exists(targetPath):
+                            uncollRnds[n] += 1
 
         collectStr = "Uncollected renderings searched:\n"
         if len([x for x in uncollRnds.values() if x > 0]) == 0:
@@ -1221,11 +1927,35 @@ class PandoraCoordinator:
 
         self.writeLog(collectStr, errorLvl)
 
+    # returns the relative paths of the output files of a job in a slave folder. The output
+    # manifests are used, if the slave wrote them
+    def getSlaveOutputFiles(self, slavePath, jobCode):
+        manifestDir = os.path.join(slavePath, PandoraManifest.outputManifestFolder, jobCode)
+        if os.path.isdir(manifestDir):
+            files = {}
+            for manifestName in os.listdir(manifestDir):
+                manifest = PandoraManifest.readManifest(
+                    os.path.join(manifestDir, manifestName)
+                )
+                if manifest is not None:
+                    files.update(PandoraManifest.getOutputFiles(manifest))
+
+            return sorted(files)
+
+        jobPath = os.path.join(slavePath, "Output", jobCode)
+        files = []
+        for k in os.walk(jobPath):
+            for m in k[2]:
+                files.append(os.path.relpath(os.path.join(k[0], m), jobPath))
+
+        return files
+
     @err_decorator
     def getJobAssignments(self):
         self.writeLog("Check job submissions")
 
-        if not os.path.exists(os.path.join(self.slPath, "Workstations")):
+        wsScan = self.snapshot.scanDir(os.path.join(self.slPath, "Workstations"))
+        if wsScan is None:
             self.writeWarning(
                 "Workstations folder doesn't exist (%s)"
                 % (os.path.join(self.slPath, "Workstations")),
@@ -1233,44 +1963,41 @@ class PandoraCoordinator:
             )
             return
 
-        for i in os.listdir(os.path.join(self.slPath, "Workstations")):
+        for i in sorted(wsScan["entries"]):
             try:
-                if not os.path.isdir(
-                    os.path.join(self.slPath, "Workstations", i)
-                ) or not i.startswith("WS_"):
+                if not wsScan["entries"][i] or not i.startswith("WS_"):
                     continue
 
                 cmdDir = os.path.join(self.slPath, "Workstations", i, "Commands")
                 wsName = i[len("WS_") :]
 
-                if os.path.exists(cmdDir):
-                    for k in sorted(os.listdir(cmdDir)):
-                        cmFile = os.path.join(cmdDir, k)
-
-                        if k == "Pandora_update.zip":
-                            shutil.move(
-                                cmFile,
-                                os.path.join(
-                                    self.slPath,
-                                    "Scripts",
-                                    "PandoraSlaves",
-                                    "Pandora-development.zip",
-                                ),
-                            )
-                            continue
-
-                        if not k.startswith("handlerOut_"):
-                            continue
+                cmdScan = self.snapshot.scanDir(cmdDir)
+                if cmdScan is not None:
+                    if "Pandora_update.zip" in cmdScan["entries"]:
+                        shutil.move(
+                            os.path.join(cmdDir, "Pandora_update.zip"),
+                            os.path.join(
+                                self.slPath,
+                                "Scripts",
+                                "PandoraSlaves",
+                                "Pandora-development.zip",
+                            ),
+                        )
 
+                    for k in PandoraMailbox.sortCommandFiles(
+                        cmdScan["entries"], "handlerOut"
+                    ):
+                        cmFile = os.path.join(cmdDir, k)
                         self.handleCmd(cmFile, origin=wsName)
 
                 jobDir = os.path.join(self.slPath, "Workstations", i, "JobSubmissions")
 
-                if not os.path.exists(jobDir):
+                jobScan = self.snapshot.scanDir(jobDir)
+                if jobScan is None:
                     # self.writeWarning("Job JobSubmission folder does not exist (%s)" % wsName, 2)
                     continue
 
-                for k in os.listdir(jobDir):
+                for k in sorted(jobScan["entries"]):
                     if k == "ProjectAssets":
                         continue
 
@@ -1311,45 +2038,64 @@ class PandoraCoordinator:
                         continue
 
                     existingFiles = 0
+                    assetEntries = None
 
                     if cData["projectAssets"] is not None:
                         wspaFolder = os.path.join(
                             jobDir, "ProjectAssets", cData["projectName"]
                         )
                         paFolder = os.path.join(self.pAssetPath, cData["projectName"])
-                        if not os.path.exists(paFolder):
-                            os.makedirs(os.path.join(self.pAssetPath, cData["projectName"]))
-
-                        for m in cData["projectAssets"]:
-                            aPath = os.path.join(wspaFolder, m[0])
-                            if not os.path.exists(aPath):
+                        assetStore = self.getAssetStore(paFolder)
+
+                        # the first entry is the scenefile, which is part of the jobfiles
+                        assetEntries = cData["projectAssets"][:1]
+                        assetHashes = {}
+                        for m in cData["projectAssets"][1:]:
+                            # assets of older submissions might exist only by their name
+                            # in the repository
+                            aPath = None
+                            for k in [
+                                os.path.join(wspaFolder, m[0]),
+                                os.path.join(paFolder, m[0]),
+                            ]:
+                                if os.path.exists(k) and int(os.path.getmtime(k)) == int(
+                                    m[1]
+                                ):
+                                    aPath = k
+                                    break
+
+                            if aPath is None:
+                                self.writeLog(
+                                    "Project asset is missing or outdated: %s for job %s"
+                                    % (m[0], jobName)
+                                )
                                 continue
 
-                            taPath = os.path.join(paFolder, m[0])
-                            if os.path.exists(taPath) and int(
-                                os.path.getmtime(taPath)
-                            ) == int(m[1]):
-                                existingFiles += 1
+                            try:
+                                fileHash = assetStore.addFile(aPath, m[0])
+                            except:
+                                self.writeWarning(
+                                    "Could not copy file to ProjectAssets: %s %s %s %s"
+                                    % (wsName, cData["projectName"], jobName, m),
+                                    2,
+                                )
                                 continue
 
-                            if os.path.exists(aPath) and int(
-                                os.path.getmtime(aPath)
-                            ) == int(m[1]):
-                                try:
-                                    shutil.copy2(aPath, taPath)
-                                    existingFiles += 1
-                                except:
-                                    self.writeWarning(
-                                        "Could not copy file to ProjectAssets: %s %s %s %s"
-                                        % (wsName, cData["projectName"], jobName, m),
-                                        2,
-                                    )
-                            else:
-                                self.writeLog(
-                                    "Project asset is missing or outdated: %s for job %s"
-                                    % (m[0], jobName)
+                            if assetHashes.get(m[0], fileHash) != fileHash:
+                                self.writeWarning(
+                                    "Job %s uses different project assets with the same name: %s"
+                                    % (jobName, m[0]),
+                                    2,
                                 )
 
+                            assetHashes[m[0]] = fileHash
+                            assetEntries.append(
+                                [m[0], m[1], fileHash, assetStore.getSize(fileHash)]
+                            )
+                            existingFiles += 1
+
+                        assetStore.save()
+
                     jobFilesDir = os.path.join(jobDir, jobCode, "JobFiles")
                     if not os.path.isdir(jobFilesDir):
                         self.writeLog(
@@ -1379,6 +2125,8 @@ class PandoraCoordinator:
                     cData = []
                     cData.append(["information", "jobcode", jobCode])
                     cData.append(["information", "submitWorkstation", wsName])
+                    if assetEntries is not None:
+                        cData.append(["information", "projectAssets", assetEntries])
                     cData = self.setConfig(configPath=jobConf, data=cData)
 
                     self.writeLog(
@@ -1396,6 +2144,7 @@ class PandoraCoordinator:
                         continue
 
                     self.setConfig(jobCode, "priority", jobPrio, configPath=self.prioList)
+                    self.indexJob(jobCode, jobPrio)
                     self.writeLog(
                         "Job %s was added to the JobRepository from %s" % (jobName, wsName),
                         1,
@@ -1414,10 +2163,20 @@ class PandoraCoordinator:
         # checks for updated slave script and handles slaveout commands
         self.writeLog("Checking slave commands.")
 
-        for i in os.listdir(os.path.join(self.slPath, "Slaves")):
+        slaveScan = self.snapshot.scanDir(os.path.join(self.slPath, "Slaves"))
+        if slaveScan is None:
+            return
+
+        releaseManifest = self.getReleaseManifest()
+        self.contactTimesChanged = len(slaveScan["added"]) > 0 or len(slaveScan["removed"]) > 0
+
+        for i in sorted(slaveScan["entries"]):
             try:
+                if PandoraTransport is not None and i == PandoraTransport.transportName:
+                    continue
+
                 slavePath = os.path.join(self.slPath, "Slaves", i)
-                if not (i.startswith("S_") and os.path.isdir(slavePath)):
+                if not (i.startswith("S_") and slaveScan["entries"][i]):
                     self.writeWarning("WARNING -- Slaves folder is invalid %s" % i, 2)
                     continue
 
@@ -1427,142 +2186,264 @@ class PandoraCoordinator:
 
                 file_mod_time = 0
 
-                if os.path.exists(slaveActivePath):
-                    file_mod_time = os.stat(slaveActivePath).st_mtime
+                # the slaveActive file is modified in place, so it has to be checked every cycle
+                activeStat = self.snapshot.statFile(slaveActivePath)[0]
+                if activeStat is not None:
+                    file_mod_time = activeStat.st_mtime
 
-                webapiPath = os.path.join(
-                    os.path.dirname(slavePath), "webapi", "slaveActive_%s" % slaveName
-                )
-                if (
-                    os.path.exists(webapiPath)
-                    and os.stat(webapiPath).st_mtime > file_mod_time
-                ):
-                    file_mod_time = os.stat(webapiPath).st_mtime
+                if slaveScan["entries"].get("webapi"):
+                    webapiPath = os.path.join(
+                        os.path.dirname(slavePath), "webapi", "slaveActive_%s" % slaveName
+                    )
+                    webapiStat = self.snapshot.statFile(webapiPath)[0]
+                    if webapiStat is not None and webapiStat.st_mtime > file_mod_time:
+                        file_mod_time = webapiStat.st_mtime
+
+                # heartbeats of the direct connection count as contact too
+                if self.transport is not None:
+                    heartbeat = self.transport.getLastContact(slaveName)
+                    if heartbeat is not None and heartbeat > file_mod_time:
+                        file_mod_time = heartbeat
 
                 last_time = int((time.time() - file_mod_time) / 60)
 
-                self.slaveContactTimes[slaveName] = file_mod_time
+                # the saved contact times are only updated, when they changed by more than
+                # the registry resolution, so that ActiveSlaves.json isn't written every cycle
+                savedTime = self.slaveContactTimes.get(slaveName)
+                if (
+                    savedTime is None
+                    or abs(file_mod_time - savedTime) >= PandoraRegistry.contactResolution
+                ):
+                    self.slaveContactTimes[slaveName] = file_mod_time
+                    self.contactTimesChanged = True
                 if last_time < self.activeThres:
                     self.activeSlaves[slaveName] = file_mod_time
 
-                slaveScriptPath = os.path.join(slavePath, "Scripts", "PandoraSlave.py")
-                masterScriptPath = os.path.join(
-                    self.slPath, "Scripts", "PandoraSlaves", "PandoraSlave.py"
-                )
-                if os.path.exists(masterScriptPath):
+                self.updateSlaveRegistry(slaveName, slavePath, file_mod_time)
+
+                # the files of a slave are only compared, when a new release was published
+                if (
+                    releaseManifest is not None
+                    and self.slaveReleases.get(slaveName) != releaseManifest["version"]
+                ):
+                    if self.distributeRelease(slaveName, slavePath, releaseManifest):
+                        self.slaveReleases[slaveName] = releaseManifest["version"]
+
+                comScan = self.snapshot.scanDir(slaveComPath)
+                if comScan is None:
                     try:
-                        if not os.path.exists(os.path.dirname(slaveScriptPath)):
-                            os.makedirs(os.path.dirname(slaveScriptPath))
+                        os.makedirs(slaveComPath)
+                    except:
+                        self.writeLog(
+                            "Could not create Communication folder for %s" % slaveName, 3
+                        )
+                    continue
 
-                        if os.path.exists(slaveScriptPath):
-                            sFileDate = int(os.path.getmtime(slaveScriptPath))
-                        else:
-                            sFileDate = 0
+                for k in PandoraMailbox.sortCommandFiles(comScan["entries"], "slaveOut"):
+                    cmFile = os.path.join(slaveComPath, k)
+                    self.handleCmd(cmFile, origin=slaveName)
 
-                        mFileDate = int(os.path.getmtime(masterScriptPath))
+            except Exception as e:
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                self.writeLog(
+                    "ERROR -- checkSlaves -- %s\n%s\n%s"
+                    % (str(e), exc_type, exc_tb.tb_lineno),
+                    3,
+                )
 
-                        if mFileDate > sFileDate:
-                            shutil.copy2(masterScriptPath, slaveScriptPath)
-                            self.writeLog("Updated Slave for %s" % slaveName, 1)
+        for slaveName in list(self.slaveRegistry.getSlaves()):
+            if not slaveScan["entries"].get("S_" + slaveName):
+                self.slaveRegistry.removeSlave(slaveName)
 
-                    except Exception as e:
-                        exc_type, exc_obj, exc_tb = sys.exc_info()
-                        self.writeLog(
-                            "ERROR -- checkSlaves mlp -- %s %s\n%s\n%s"
-                            % (slaveName, str(e), exc_type, exc_tb.tb_lineno),
-                            3,
-                        )
+        if self.slaveRegistry.save():
+            self.writeLog("Updated slave registry")
 
-                else:
-                    self.writeLog("master Slave script does not exist")
+    # reads the settings of a slave again, if they changed since the last cycle
+    @err_decorator
+    def updateSlaveRegistry(self, slaveName, slavePath, lastContact):
+        settingsPath = os.path.join(slavePath, "slaveSettings_%s.json" % slaveName)
+        settingsStat, settingsChanged = self.snapshot.statFile(settingsPath)
+        if settingsStat is None:
+            self.slaveRegistry.removeSlave(slaveName)
+            return
 
-                shouJobPath = os.path.join(slavePath, "Scripts", "PandoraStartHouJob.py")
-                mhouJobPath = os.path.join(
-                    self.slPath, "Scripts", "PandoraSlaves", "PandoraStartHouJob.py"
+        if settingsChanged or self.slaveRegistry.getSlave(slaveName) is None:
+            slaveSettings = self.getConfig(configPath=settingsPath, getConf=True)
+            if type(slaveSettings) == dict:
+                self.slaveRegistry.updateSlave(
+                    slaveName, PandoraRegistry.getSlaveEntry(slaveSettings, lastContact)
                 )
-                if os.path.exists(mhouJobPath):
-                    try:
-                        if not os.path.exists(os.path.dirname(shouJobPath)):
-                            os.makedirs(os.path.dirname(shouJobPath))
 
-                        if os.path.exists(shouJobPath):
-                            sFileDate = int(os.path.getmtime(shouJobPath))
-                        else:
-                            sFileDate = 0
+        self.slaveRegistry.updateSlave(slaveName, {"lastContact": lastContact})
+
+    # returns the release manifest of the files in Scripts/PandoraSlaves. A new version
+    # is published, when the content of a file has changed
+    @err_decorator
+    def getReleaseManifest(self):
+        masterDir = os.path.join(self.slPath, "Scripts", "PandoraSlaves")
+        manifestPath = os.path.join(masterDir, PandoraManifest.manifestName)
 
-                        mFileDate = int(os.path.getmtime(mhouJobPath))
+        masterScan = self.snapshot.scanDir(masterDir)
+        if masterScan is None:
+            self.writeLog("master Slave script folder does not exist")
+            return
 
-                        if mFileDate > sFileDate:
-                            shutil.copy2(mhouJobPath, shouJobPath)
-                            self.writeLog("Updated houJobScript for %s" % slaveName, 1)
+        if self.releaseManifest is None:
+            self.releaseManifest = PandoraManifest.readManifest(manifestPath)
 
-                    except Exception as e:
-                        exc_type, exc_obj, exc_tb = sys.exc_info()
-                        self.writeLog(
-                            "ERROR -- checkSlaves mhp -- %s\n%s\n%s"
-                            % (str(e), exc_type, exc_tb.tb_lineno),
-                            3,
-                        )
-                else:
-                    self.writeLog("master houJob script does not exist")
+        filesChanged = (
+            self.releaseManifest is None
+            or len(masterScan["added"]) > 0
+            or len(masterScan["removed"]) > 0
+        )
+        for fileName in masterScan["entries"]:
+            if masterScan["entries"][fileName] or not PandoraManifest.isReleaseFile(fileName):
+                continue
 
-                sZipPath = os.path.join(slavePath, "Scripts", "Pandora-development.zip")
-                mZipPath = os.path.join(
-                    self.slPath, "Scripts", "PandoraSlaves", "Pandora-development.zip"
+            if self.snapshot.statFile(os.path.join(masterDir, fileName))[1]:
+                filesChanged = True
+
+        if not filesChanged:
+            return self.releaseManifest
+
+        manifest, contentChanged = PandoraManifest.updateManifest(
+            masterDir, self.releaseManifest
+        )
+        if contentChanged or self.releaseManifest is None:
+            PandoraManifest.writeManifest(manifestPath, manifest)
+            self.writeLog(
+                "Published slave release %s (%s)"
+                % (manifest["version"], ", ".join(sorted(manifest["files"]))),
+                1,
+            )
+
+        self.releaseManifest = manifest
+        return self.releaseManifest
+
+    @err_decorator
+    def getAssetStore(self, folder):
+        if folder not in self.assetStores:
+            self.assetStores[folder] = PandoraManifest.AssetStore(folder)
+
+        return self.assetStores[folder]
+
+    # copies the project assets, which are missing in the asset store of a slave. The assets
+    # were verified when they were added to the repository, so only the size is compared
+    @err_decorator
+    def distributeAssets(self, assets, sourceFolder, targetFolder, slaveName):
+        sourceStore = self.getAssetStore(sourceFolder)
+        targetStore = self.getAssetStore(targetFolder)
+
+        for asset in assets:
+            if targetStore.hasAsset(asset[2], asset[3]):
+                continue
+
+            if not sourceStore.hasAsset(asset[2], asset[3]):
+                self.writeWarning(
+                    "Required ProjectAsset does not exist: %s %s"
+                    % (os.path.basename(sourceFolder), asset[0]),
+                    2,
                 )
+                continue
 
-                if os.path.exists(mZipPath):
-                    try:
-                        if not os.path.exists(os.path.dirname(sZipPath)):
-                            os.makedirs(os.path.dirname(sZipPath))
+            self.writeLog("Copying project asset %s to slave %s." % (asset[0], slaveName))
+            targetStore.addFile(
+                sourceStore.getPath(asset[2]),
+                asset[0],
+                fileHash=asset[2],
+                copyFunc=PandoraTransfer.linkFile if self.linkJobFiles else None,
+                verify=False,
+            )
 
-                        if os.path.exists(sZipPath):
-                            sFileDate = int(os.path.getmtime(sZipPath))
-                        else:
-                            sFileDate = 0
+        targetStore.save()
 
-                        mFileDate = int(os.path.getmtime(mZipPath))
+    # distributes the files of a job to a slave folder. The scene files get linked if the
+    # source and the target are on the same volume
+    @err_decorator
+    def distributeJobFiles(self, jobCode, targetPath):
+        sourcePath = os.path.join(self.jobPath, jobCode)
+        if self.linkJobFiles:
+            result = PandoraTransfer.linkTree(
+                sourcePath, targetPath, copyNames=["PandoraJob.json"]
+            )
+        else:
+            shutil.copytree(sourcePath, targetPath)
+            result = {"copy": sum([len(x[2]) for x in os.walk(targetPath)])}
 
-                        if mFileDate > sFileDate:
-                            shutil.copy2(mZipPath, sZipPath)
-                            self.writeLog("Updated Pandora for %s" % slaveName, 1)
+        if result.get("reflink") or result.get("hardlink"):
+            method = "hardlink" if result.get("hardlink") else "reflink"
+        else:
+            method = "copy"
 
-                    except Exception as e:
-                        exc_type, exc_obj, exc_tb = sys.exc_info()
-                        self.writeLog(
-                            "ERROR -- checkSlaves mzp -- %s\n%s\n%s"
-                            % (str(e), exc_type, exc_tb.tb_lineno),
-                            3,
-                        )
+        self.jobReferences.addReference(jobCode, targetPath, method)
+        self.writeLog(
+            "Distributed job files of %s to %s (%s)"
+            % (
+                jobCode,
+                targetPath,
+                ", ".join(["%s %s" % (result[x], x) for x in sorted(result) if result[x]]),
+            )
+        )
 
-                    try:
-                        os.remove(mZipPath)
-                    except:
-                        pass
+    # removes all folders, into which the files of a job were distributed
+    @err_decorator
+    def releaseJobFiles(self, jobCode, origin):
+        for target in self.jobReferences.getReferences(jobCode):
+            if os.path.exists(target):
+                try:
+                    shutil.rmtree(target)
+                except:
+                    self.writeLog(
+                        "ERROR - cannot remove folder: %s (%s)" % (target, origin), 3
+                    )
+                    continue
+
+            self.jobReferences.removeReference(jobCode, target)
+
+        remaining = self.jobReferences.getCount(jobCode)
+        if remaining > 0:
+            self.writeLog(
+                "%s distributed copies of job %s could not be removed (%s)"
+                % (remaining, jobCode, origin),
+                2,
+            )
 
-                if not os.path.exists(slaveComPath):
-                    try:
-                        os.makedirs(slaveComPath)
-                    except:
-                        self.writeLog(
-                            "Could not create Communication folder for %s" % slaveName, 3
-                        )
-                        continue
+    # copies the files of a release, which have changed since the last release of the slave.
+    # Returns False, if a copy failed
+    @err_decorator
+    def distributeRelease(self, slaveName, slavePath, manifest):
+        masterDir = os.path.join(self.slPath, "Scripts", "PandoraSlaves")
+        slaveScriptDir = os.path.join(slavePath, "Scripts")
+        slaveManifestPath = os.path.join(slaveScriptDir, PandoraManifest.manifestName)
 
-                for k in sorted(os.listdir(slaveComPath)):
-                    if not k.startswith("slaveOut_"):
-                        continue
+        slaveManifest = PandoraManifest.readManifest(slaveManifestPath)
+        if slaveManifest is not None and slaveManifest["version"] == manifest["version"]:
+            return True
 
-                    cmFile = os.path.join(slaveComPath, k)
-                    self.handleCmd(cmFile, origin=slaveName)
+        if not os.path.exists(slaveScriptDir):
+            os.makedirs(slaveScriptDir)
 
+        result = True
+        for fileName in PandoraManifest.getChangedFiles(manifest, slaveManifest):
+            try:
+                shutil.copy2(
+                    os.path.join(masterDir, fileName), os.path.join(slaveScriptDir, fileName)
+                )
+                self.writeLog("Updated %s for %s" % (fileName, slaveName), 1)
             except Exception as e:
                 exc_type, exc_obj, exc_tb = sys.exc_info()
                 self.writeLog(
-                    "ERROR -- checkSlaves -- %s\n%s\n%s"
-                    % (str(e), exc_type, exc_tb.tb_lineno),
+                    "ERROR -- distributeRelease -- %s %s %s\n%s\n%s"
+                    % (slaveName, fileName, str(e), exc_type, exc_tb.tb_lineno),
                     3,
                 )
+                result = False
+
+        if result:
+            # written last, so that a slave only sees the new version, when all files exist
+            PandoraManifest.writeManifest(slaveManifestPath, manifest)
+
+        return result
 
     @err_decorator
     def checkConnection(self):
@@ -1639,15 +2520,13 @@ class PandoraCoordinator:
                 continue
 
             rSlave = taskData[3]
-            slaveSettings = os.path.join(
-                self.slPath, "Slaves", "S_%s" % rSlave, "slaveSettings_%s.json" % rSlave
-            )
-            if not os.path.exists(slaveSettings):
+            slaveEntry = self.slaveRegistry.getSlave(rSlave)
+            if slaveEntry is None:
                 self.writeWarning("slave settings does not exist: %s" % rSlave)
                 continue
 
-            sStatus = self.getConfig("slaveinfo", "status", configPath=slaveSettings)
-            sTasks = self.getConfig("slaveinfo", "curtasks", configPath=slaveSettings)
+            sStatus = slaveEntry["status"]
+            sTasks = slaveEntry["curtasks"]
 
             if sStatus != "idle" and sTasks is not None:
                 for task in sTasks:
@@ -1659,7 +2538,7 @@ class PandoraCoordinator:
                     taskData[4] = ""
                     taskData[5] = ""
                     taskData[6] = ""
-                    self.setConfig("jobtasks", taskName, taskData, configPath=confPath)
+                    self.setTaskData(jobCode, taskName, taskData, configPath=confPath)
 
                     removed.append(i)
                     self.writeLog("Reset task %s of job %s" % (taskName, jobCode), 1)
@@ -1671,100 +2550,60 @@ class PandoraCoordinator:
     def getAvailableSlaves(self):
         self.writeLog("Getting available slaves.")
 
-        jobBase = os.path.join(self.repPath, "Jobs")
-        slaveAssignments = {}
+        # only tasks, which passed their deadline, are checked for a timeout
+        for expired in self.deadlineIndex.getExpired(time.time()):
+            jobCode, taskName, taskState, slaveName, startTime = expired
+            try:
+                confPath = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+                taskData = self.getConfig("jobtasks", taskName, configPath=confPath)
+                if (
+                    type(taskData) != list
+                    or len(taskData) != 7
+                    or taskData[2] != taskState
+                    or taskData[3] != slaveName
+                ):
+                    self.deadlineIndex.updateTask(jobCode, taskName, taskData)
+                    continue
 
-        if os.path.exists(jobBase):
-            for i in os.listdir(jobBase):
-                try:
-                    confPath = os.path.join(jobBase, i, "PandoraJob.json")
+                elapsedTime = (time.time() - float(startTime)) / 60.0
+                jName = self.getConfig("information", "jobName", configPath=confPath)
+                if jName is None:
+                    jName = ""
 
-                    if not os.path.exists(confPath):
-                        continue
+                self.sendCommand(slaveName, ["cancelTask", jName, jobCode, taskName])
 
-                    jobConfig = self.getConfig(configPath=confPath, getConf=True)
+                taskData[2] = "ready"
+                taskData[3] = "unassigned"
+                taskData[4] = ""
+                taskData[5] = ""
+                taskData[6] = ""
+                self.setTaskData(jobCode, taskName, taskData, configPath=confPath)
 
-                    if "jobtasks" not in jobConfig:
-                        self.writeWarning(
-                            "Job config does not contain jobtasks: %s" % confPath, 2
-                        )
-                        continue
+                self.writeLog(
+                    "Timeout of %s from Job %s (%s min)" % (taskName, jName, elapsedTime),
+                    1,
+                )
+            except Exception as e:
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                self.writeLog(
+                    "ERROR - getAvailableSlaves - %s - %s - %s"
+                    % (str(e), exc_type, exc_tb.tb_lineno),
+                    3,
+                )
 
-                    for k in jobConfig["jobtasks"]:
-                        taskData = jobConfig["jobtasks"][k]
-                        if taskData[2] in ["assigned", "rendering"]:
-                            try:
-                                startTime = float(taskData[5])
-                            except:
-                                pass
-                            else:
-                                elapsedTime = (time.time() - startTime) / 60.0
-
-                                taskTimedOut = False
-                                if taskData[2] == "assigned":
-                                    if elapsedTime > 15:
-                                        taskTimedOut = True
-
-                                elif taskData[2] == "rendering":
-                                    if "taskTimeout" in jobConfig["jobglobals"]:
-                                        timeout = jobConfig["jobglobals"]["taskTimeout"]
-                                        if elapsedTime > timeout:
-                                            taskTimedOut = True
-
-                                if "jobName" in jobConfig["information"]:
-                                    jName = jobConfig["information"]["jobName"]
-                                else:
-                                    jName = ""
-
-                                if taskTimedOut:
-                                    self.sendCommand(
-                                        taskData[3], ["cancelTask", jName, i, k]
-                                    )
-
-                                    taskData[2] = "ready"
-                                    taskData[3] = "unassigned"
-                                    taskData[4] = ""
-                                    taskData[5] = ""
-                                    taskData[6] = ""
-                                    self.setConfig(
-                                        "jobtasks", k, taskData, configPath=confPath
-                                    )
-
-                                    self.writeLog(
-                                        "Timeout of %s from Job %s (%s min)"
-                                        % (k, jName, elapsedTime),
-                                        1,
-                                    )
-                                    continue
-
-                            slaveName = taskData[3]
-                            if slaveName not in slaveAssignments:
-                                slaveAssignments[slaveName] = {"concurrent": []}
-
-                            jobCon = jobConfig["jobglobals"].get("concurrentTasks", 1)
-                            slaveAssignments[slaveName]["concurrent"].append(jobCon)
-                            # self.writeLog("DEBUG - unavailable slaves: %s - %s" % (taskData[3],i))
-                except Exception as e:
-                    exc_type, exc_obj, exc_tb = sys.exc_info()
-                    self.writeLog(
-                        "ERROR - getAvailableSlaves - %s - %s - %s"
-                        % (str(e), exc_type, exc_tb.tb_lineno),
-                        3,
-                    )
+        slaveAssignments = self.deadlineIndex.getSlaveAssignments()
 
         # self.writeLog("DEBUG - unavailable slaves: %s" % unavailableSlaves)
 
         for slave in self.activeSlaves:
             try:
                 slaveData = {"name": slave}
-                slaveSettings = os.path.join(
-                    self.slPath, "Slaves", "S_%s" % slave, "slaveSettings_%s.json" % slave
-                )
-                if not os.path.exists(slaveSettings):
+                slaveEntry = self.slaveRegistry.getSlave(slave)
+                if slaveEntry is None:
                     self.writeWarning("slave settings does not exist: %s" % slave)
                     continue
 
-                maxSlaveTasks = self.getConfig("settings", "maxConcurrentTasks", configPath=slaveSettings)
+                maxSlaveTasks = slaveEntry["maxConcurrentTasks"]
 
                 if slave in slaveAssignments:
                     concList = slaveAssignments[slave]["concurrent"]
@@ -1790,27 +2629,29 @@ class PandoraCoordinator:
     def assignJobs(self):
         self.writeLog("Start checking jobs")
 
-        jobPrios = self.getConfig(configPath=self.prioList, getConf=True)
-        self.jobDirs = [
-            x
-            for x in reversed(sorted(jobPrios, key=lambda x: jobPrios[x]["priority"]))
-            if os.path.exists(os.path.join(self.repPath, "Jobs", x))
-        ]
+        self.jobDirs = self.schedulingIndex.getJobs()
+
+        if len(self.availableSlaves) == 0:
+            self.writeLog("No available slaves")
+            return
+
+        # only jobs with ready tasks are checked, starting with the highest priority
+        for jobDir in self.schedulingIndex.getReadyJobs():
+            if len(self.availableSlaves) == 0:
+                break
 
-        for jobDir in self.jobDirs:
             confPath = os.path.join(self.jobPath, jobDir, "PandoraJob.json")
 
             if not os.path.exists(confPath):
                 self.writeWarning("Job config does not exist: %s" % jobDir, 2)
+                self.schedulingIndex.removeJob(jobDir)
                 continue
 
-            jobConfig = self.getConfig(configPath=confPath, getConf=True)
             cData = {}
             cData["jobName"] = ["information", "jobName"]
             cData["sceneName"] = ["information", "sceneName"]
             cData["fileCount"] = ["information", "fileCount"]
             cData["projectAssets"] = ["information", "projectAssets"]
-            cData["jobDependecies"] = ["jobglobals", "jobDependecies"]
             cData["listSlaves"] = ["jobglobals", "listSlaves"]
             cData["projectName"] = ["information", "projectName"]
             cData["concurrentTasks"] = ["jobglobals", "concurrentTasks"]
@@ -1843,71 +2684,31 @@ class PandoraCoordinator:
                 self.writeWarning("Job has no fileCount option: %s" % jobName, 2)
                 continue
 
-            if "jobtasks" not in jobConfig:
-                self.writeWarning("Job tasks are missing: %s" % jobName, 2)
-                continue
-
-            dependentSlaves = []
-
-            if cData["jobDependecies"] is not None:
-                depsFinished = [True]
-                jobDeps = cData["jobDependecies"]
-                for jDep in jobDeps:
-                    if len(jDep) == 2:
-                        depName = jDep[0]
-                        depConf = os.path.join(self.jobPath, depName, "PandoraJob.json")
-                        if not os.path.exists(depConf):
-                            self.writeWarning(
-                                "For job %s the dependent job %s is missing."
-                                % (jobName, depName),
-                                2,
-                            )
-                            depsFinished = [False, depName]
-                            break
-
-                        depConfig = self.getConfig(configPath=depConf, getConf=True)
-
-                        if (
-                            "information" in depConfig
-                            and "jobName" in depConfig["information"]
-                        ):
-                            depJobName = depConfig["information"]["jobName"]
-                        else:
-                            depJobName = depName
-
-                        if not "jobtasks" in depConfig:
-                            self.writeWarning(
-                                "For job %s the dependent job %s has no tasks."
-                                % (jobName, depJobName),
-                                2,
-                            )
-                            depsFinished = [False, depJobName]
-                            break
-
-                        for dTask in depConfig["jobtasks"]:
-                            taskData = depConfig["jobtasks"][dTask]
-
-                            if not (
-                                type(taskData) == list
-                                and len(taskData) == 7
-                                and taskData[2] == "finished"
-                            ):
-                                depsFinished = [False, depJobName]
-                                break
-                            else:
-                                if taskData[3] not in dependentSlaves:
-                                    dependentSlaves.append(taskData[3])
-
-                    if not depsFinished[0]:
-                        break
+            depCode, depState, dependentSlaves = self.dependencyIndex.getState(jobDir)
+            if depState == "missing" and self.indexDependencies(depCode):
+                # the dependency is not part of the priority list
+                depCode, depState, dependentSlaves = self.dependencyIndex.getState(jobDir)
 
-                if not depsFinished[0]:
+            if depCode is not None:
+                depJobName = self.dependencyIndex.getName(depCode)
+                if depState == "missing":
+                    self.writeWarning(
+                        "For job %s the dependent job %s is missing." % (jobName, depCode),
+                        2,
+                    )
+                elif depState == "noTasks":
+                    self.writeWarning(
+                        "For job %s the dependent job %s has no tasks."
+                        % (jobName, depJobName),
+                        2,
+                    )
+                else:
                     self.writeLog(
                         "For job %s the dependent job %s is not finished."
-                        % (jobName, depsFinished[1]),
+                        % (jobName, depJobName),
                         0,
                     )
-                    continue
+                continue
 
             jobSlaves = []
 
@@ -1931,12 +2732,8 @@ class PandoraCoordinator:
                     if listSlaves.startswith("groups: "):
                         jGroups = listSlaves[len("groups: "):].split(", ")
 
-                        slaveSettings = os.path.join(
-                            self.slPath, "Slaves", "S_%s" % slaveName, "slaveSettings_%s.json" % slaveName
-                        )
-                        slaveGroups = self.getConfig(
-                            "settings", "slaveGroup", configPath=slaveSettings
-                        )
+                        slaveEntry = self.slaveRegistry.getSlave(slaveName)
+                        slaveGroups = slaveEntry["groups"] if slaveEntry else None
 
                         if slaveGroups is None:
                             continue
@@ -1953,24 +2750,21 @@ class PandoraCoordinator:
                         ):
                             jobSlaves.append(slave)
 
-            for i in sorted(jobConfig["jobtasks"]):
-                taskData = jobConfig["jobtasks"][i]
+            for i in self.schedulingIndex.getReadyTasks(jobDir):
                 if len(jobSlaves) == 0:
                     break
 
+                taskData = self.getConfig("jobtasks", i, configPath=confPath)
                 if not (type(taskData) == list and len(taskData) == 7):
                     continue
 
                 if taskData[2] != "ready":
+                    self.schedulingIndex.updateTask(jobDir, i, taskData)
                     continue
 
                 assignedSlave = jobSlaves[0]
 
                 slavePath = os.path.join(self.slPath, "Slaves", "S_%s" % assignedSlave["name"])
-                slaveSettings = os.path.join(
-                    slavePath, "slaveSettings_%s.json" % assignedSlave["name"]
-                )
-
                 slaveJobPath = os.path.join(slavePath, "AssignedJobs", "%s" % jobDir)
 
                 self.writeLog("Assigning job %s to slave %s." % (jobName, assignedSlave["name"]))
@@ -1980,7 +2774,8 @@ class PandoraCoordinator:
                         "Copying job files for job %s to slave %s."
                         % (jobName, assignedSlave["name"])
                     )
-                    shutil.copytree(os.path.join(self.jobPath, jobDir), slaveJobPath)
+                    self.flushConfigWrites(confPath)
+                    self.distributeJobFiles(jobDir, slaveJobPath)
 
                 if cData["projectAssets"] is not None:
                     jpAssets = cData["projectAssets"][1:]
@@ -1989,7 +2784,15 @@ class PandoraCoordinator:
                     if not os.path.exists(sPAssetPath):
                         os.makedirs(sPAssetPath)
 
-                    for k in jpAssets:
+                    self.distributeAssets(
+                        [x for x in jpAssets if len(x) > 3],
+                        os.path.join(self.pAssetPath, pName),
+                        sPAssetPath,
+                        assignedSlave["name"],
+                    )
+
+                    # jobs, which were submitted before the asset store existed
+                    for k in [x for x in jpAssets if len(x) < 4]:
                         paPath = os.path.join(self.pAssetPath, pName, k[0])
                         if not os.path.exists(paPath):
                             self.writeWarning(
@@ -2009,9 +2812,14 @@ class PandoraCoordinator:
                             "Copying project asset %s to slave %s." % (k[0], assignedSlave["name"])
                         )
 
-                        shutil.copy2(paPath, sPAsset)
+                        if self.linkJobFiles:
+                            PandoraTransfer.linkFile(paPath, sPAsset)
+                        else:
+                            shutil.copy2(paPath, sPAsset)
 
-                cmd = str(["renderTask", jobDir, jobName, i])
+                # the frames are sent along, because the ready tasks can be split again
+                # after the job files were copied to the slave
+                cmd = ["renderTask", jobDir, jobName, i, taskData[0], taskData[1]]
                 self.sendCommand(assignedSlave["name"], cmd)
 
                 taskData[2] = "assigned"
@@ -2027,40 +2835,311 @@ class PandoraCoordinator:
                     jobSlaves.remove(assignedSlave)
                     self.availableSlaves = [x for x in self.availableSlaves if x["name"] != assignedSlave["name"]]
 
-                self.setConfig("jobtasks", i, taskData, configPath=confPath)
+                self.setTaskData(jobDir, i, taskData, configPath=confPath)
                 self.writeLog(
                     "Assigned %s to %s in job %s" % (assignedSlave["name"], i, jobName), 1
                 )
 
+    # reads the ready tasks of all jobs in the PriorityList once. Afterwards the index
+    # gets updated with every task change
     @err_decorator
-    def sendCommand(self, slave, cmd):
-        cmdDir = os.path.join(self.slPath, "Slaves", "S_%s" % slave, "Communication")
-        curNum = 1
+    def buildSchedulingIndex(self):
+        self.schedulingIndex = PandoraScheduling.SchedulingIndex()
+        self.dependencyIndex = PandoraScheduling.DependencyIndex()
+        self.deadlineIndex = PandoraScheduling.DeadlineIndex()
 
-        for i in os.listdir(cmdDir):
-            if not i.startswith("slaveIn_"):
-                continue
+        if self.jobStore is not None:
+            jobPrios = self.jobStore.getPriorities()
+        else:
+            jobPrios = self.getConfig(configPath=self.prioList, getConf=True) or {}
 
-            num = i.split("_")[1]
-            if sys.version[0] == "2":
-                unum = unicode(num)
-            else:
-                unum = num
+        for jobCode in jobPrios:
+            self.indexJob(jobCode, jobPrios[jobCode]["priority"])
 
-            if not unum.isnumeric():
-                continue
+        self.writeLog(
+            "Built scheduling index for %s jobs (%s with dependencies)"
+            % (len(self.schedulingIndex.jobs), len(self.dependencyIndex.dependencies)),
+            1,
+        )
+
+    @err_decorator
+    def indexJob(self, jobCode, priority):
+        confPath = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+        if not os.path.exists(confPath):
+            return
+
+        jobTasks = self.getConfig(cat="jobtasks", configPath=confPath, getItems=True)
+        if not jobTasks:
+            self.writeWarning("Job tasks are missing: %s" % jobCode, 2)
+            return
+
+        self.schedulingIndex.setJob(jobCode, priority, jobTasks)
+        self.indexDependencies(jobCode, jobTasks)
+
+        cData = {}
+        cData["taskTimeout"] = ["jobglobals", "taskTimeout"]
+        cData["concurrentTasks"] = ["jobglobals", "concurrentTasks"]
+        cData = self.getConfig(data=cData, configPath=confPath)
+        self.deadlineIndex.setJob(
+            jobCode, jobTasks, cData["taskTimeout"], cData["concurrentTasks"]
+        )
+
+    # adds the completion state and the dependencies of a job to the dependency index
+    @err_decorator
+    def indexDependencies(self, jobCode, jobTasks=None):
+        confPath = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+        if not os.path.exists(confPath):
+            return False
+
+        if jobTasks is None:
+            jobTasks = (
+                self.getConfig(cat="jobtasks", configPath=confPath, getItems=True) or {}
+            )
+
+        cData = {}
+        cData["jobName"] = ["information", "jobName"]
+        cData["jobDependecies"] = ["jobglobals", "jobDependecies"]
+        cData = self.getConfig(data=cData, configPath=confPath)
+
+        self.dependencyIndex.setJob(
+            jobCode,
+            cData["jobName"] or jobCode,
+            jobTasks,
+            self.getDependencyCodes(cData["jobDependecies"]),
+        )
+        return True
+
+    def getDependencyCodes(self, jobDeps):
+        return [x[0] for x in (jobDeps or []) if len(x) == 2]
+
+    @err_decorator
+    def rechunkJobs(self):
+        jobCodes = sorted(self.rechunkJobCodes)
+        self.rechunkJobCodes = set()
+        for jobCode in jobCodes:
+            self.rechunkJob(jobCode)
+
+    # splits the ready tasks of a job again, when the finished tasks show, that a task
+    # renders much shorter or longer than the taskDuration setting
+    @err_decorator
+    def rechunkJob(self, jobCode, configPath=None):
+        if configPath is None:
+            configPath = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+
+        # the cached data is only read here. It is copied, when the split changes.
+        entry = self.getConfigEntry(configPath)
+        if entry is None or not entry["data"] or "jobtasks" not in entry["data"]:
+            return False
+
+        # jobs can override the setting, e.g. to keep their tasks with 0
+        taskDuration = entry["data"].get("jobglobals", {}).get("taskDuration")
+        if taskDuration is None:
+            taskDuration = self.taskDuration
+
+        if taskDuration <= 0:
+            return False
+
+        result = PandoraScheduling.rechunkTasks(entry["data"]["jobtasks"], taskDuration)
+        if result is None:
+            return False
 
-            if int(num) >= curNum:
-                curNum = int(num) + 1
+        jobConfig = copyConfigData(entry["data"])
+        jobConfig["jobtasks"], framesPerTask = copyConfigData(result)
+        self.setConfig(configPath=configPath, confData=jobConfig)
 
-        cmdFile = os.path.join(
-            cmdDir, "slaveIn_%s_%s.txt" % (format(curNum, "04"), time.time())
+        if self.jobStore is not None and self.deferConfigWrites:
+            self.jobStore.putJob(jobCode, jobConfig)
+
+        if self.schedulingIndex is not None and jobCode in self.schedulingIndex.jobs:
+            self.indexJob(jobCode, self.schedulingIndex.jobs[jobCode]["priority"])
+
+        self.writeLog(
+            "Split the ready tasks of job %s into tasks of %s frames (%s tasks)"
+            % (
+                jobConfig.get("information", {}).get("jobName", jobCode),
+                framesPerTask,
+                len(jobConfig["jobtasks"]),
+            ),
+            1,
         )
+        return True
+
+    # returns the name and data of a task, which a workstation addressed by its number
+    # (older versions) or by its name and the frames it showed. The frames don't match,
+    # when the ready tasks were split again after the workstation got the job.
+    def getCommandTask(self, jobName, taskId, frames, origin, configPath):
+        if isinstance(taskId, int):
+            taskName = "task%04d" % taskId
+        else:
+            taskName = taskId
+
+        taskData = self.getConfig("jobtasks", taskName, configPath=configPath)
+        if type(taskData) != list or len(taskData) != 7:
+            self.writeLog("Job %s has no task %s (%s)" % (jobName, taskName, origin), 2)
+            return [taskName, None]
+
+        if frames is not None and list(frames) != taskData[:2]:
+            self.writeLog(
+                "Task %s of job %s renders the frames %s-%s now. Ignored the command for the frames %s-%s (%s)"
+                % (
+                    taskName,
+                    jobName,
+                    taskData[0],
+                    taskData[1],
+                    frames[0],
+                    frames[1],
+                    origin,
+                ),
+                2,
+            )
+            return [taskName, None]
+
+        return [taskName, taskData]
+
+    # all changes of task states go through here to keep the scheduling index up to date
+    @err_decorator
+    def setTaskData(self, jobCode, taskName, taskData, configPath=None):
+        if configPath is None:
+            configPath = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+
+        self.setConfig("jobtasks", taskName, taskData, configPath=configPath)
+
+        # the frame progress is only valid as long as the task keeps rendering
+        if taskData[2] != "rendering" and taskName in self.taskProgress.get(jobCode, {}):
+            del self.taskProgress[jobCode][taskName]
+
+        self.schedulingIndex.updateTask(jobCode, taskName, taskData)
+        self.deadlineIndex.updateTask(jobCode, taskName, taskData)
 
+        # the task queries of the following phases see the change before it is committed
+        if self.jobStore is not None and self.deferConfigWrites:
+            if not self.jobStore.setTask(jobCode, taskName, taskData):
+                jobConfig = self.getConfig(configPath=configPath, getConf=True)
+                if jobConfig:
+                    self.jobStore.putJob(jobCode, jobConfig)
+
+        for depCode in self.dependencyIndex.updateTask(jobCode, taskName, taskData):
+            self.writeLog(
+                "Job %s was released, because all its dependencies are finished."
+                % self.dependencyIndex.getName(depCode),
+                1,
+            )
+
+    # commands are queued during a cycle and sent after the job configs were written,
+    # either through the direct connection or in one envelope per slave
+    @err_decorator
+    def sendCommand(self, slave, cmd):
         self.writeLog("Sending command: %s" % cmd)
 
-        with open(cmdFile, "w") as cFile:
-            cFile.write(str(cmd))
+        self.getOutbox(slave).queue(cmd)
+        if not self.deferConfigWrites:
+            self.sendQueuedCommands()
+
+    def getOutbox(self, slave):
+        mailbox = self.outboxes.get(slave)
+        if mailbox is None:
+            if self.mailboxCounter is None:
+                self.mailboxCounter = PandoraMailbox.MailboxCounter(
+                    os.path.join(self.coordBasePath, "MailboxCounters.json")
+                )
+
+            cmdDir = os.path.join(self.slPath, "Slaves", "S_%s" % slave, "Communication")
+            mailbox = PandoraMailbox.Mailbox(
+                cmdDir, "slaveIn", "Coordinator", self.mailboxCounter
+            )
+            self.outboxes[slave] = mailbox
+
+        return mailbox
+
+    @err_decorator
+    def sendQueuedCommands(self):
+        for slave in self.outboxes:
+            mailbox = self.outboxes[slave]
+            try:
+                # commands with an id were not acknowledged and are sent as files
+                if self.transport is not None and self.transport.isConnected(slave):
+                    queued = list(zip(mailbox.queuedIds, mailbox.queued))
+                    mailbox.clear()
+                    for cmdId, command in queued:
+                        if cmdId is None and self.transport.send(slave, command):
+                            continue
+
+                        mailbox.queue(command, cmdId)
+
+                mailbox.flush()
+            except Exception as e:
+                mailbox.clear()
+                self.writeLog(
+                    "ERROR - cannot send commands to slave %s: %s" % (slave, e), 3
+                )
+
+    # starts or stops the direct connection to the slaves and publishes its address in the
+    # Slaves folder
+    @err_decorator
+    def updateTransport(self):
+        if not self.transportEnabled:
+            self.stopTransport()
+            return
+
+        if PandoraTransport is None:
+            if self.transportAddress is None:
+                self.writeWarning("The direct slave connection requires python 3", 2)
+                self.transportAddress = []
+
+            return
+
+        host = self.transportHost or socket.gethostname()
+        if self.transport is not None and self.transportAddress == [host, self.transportPort]:
+            return
+
+        self.stopTransport()
+
+        slaveDir = os.path.join(self.slPath, "Slaves")
+        if not os.path.exists(slaveDir):
+            os.makedirs(slaveDir)
+
+        transport = PandoraTransport.TransportServer(port=self.transportPort)
+        transport.start()
+        self.transport = transport
+        self.transportAddress = [host, self.transportPort]
+        PandoraTransport.writeTransportInfo(
+            os.path.join(slaveDir, PandoraTransport.transportName), transport.getInfo(host)
+        )
+        self.writeLog("Started slave connection on %s:%s" % (host, transport.port), 1)
+
+    @err_decorator
+    def stopTransport(self):
+        if self.transport is None:
+            return
+
+        self.transport.stop()
+        self.transport = None
+        self.transportAddress = None
+
+        infoPath = os.path.join(self.slPath, "Slaves", PandoraTransport.transportName)
+        if os.path.exists(infoPath):
+            os.remove(infoPath)
+
+        self.writeLog("Stopped slave connection", 1)
+
+    # handles the commands, which the slaves sent through the direct connection, and sends
+    # commands, which were not acknowledged, through the Communication folders
+    @err_decorator
+    def checkTransport(self):
+        if self.transport is None:
+            return
+
+        for slaveName, cmdId, command in self.transport.getIncoming():
+            self.writeLog("Handle cmd from %s: %s" % (slaveName, command))
+            self.executeCmd(command, slaveName)
+
+        for slaveName, cmdId, command in self.transport.getExpired():
+            self.writeLog(
+                "Command was not acknowledged by %s, sending it as file: %s"
+                % (slaveName, command),
+                1,
+            )
+            self.getOutbox(slaveName).queue(command, cmdId)
 
     @err_decorator
     def checkTvRequests(self):
@@ -2107,18 +3186,28 @@ class PandoraCoordinator:
                     )
                     continue
 
-                fileCount = 0
-                for i in os.walk(outputPath):
-                    fileCount += len(i[2])
+                manifests = self.collectManifests.get(slave, {}).get(job)
+                if manifests:
+                    # only the files listed by the slave are checked and copied
+                    files = self.getManifestOutput(slave, job, manifests)
+                    if files is None:
+                        continue
+                else:
+                    files = None
+                    fileCount = 0
+                    for i in os.walk(outputPath):
+                        fileCount += len(i[2])
 
-                if fileCount != expNum:
-                    self.writeLog(
-                        "Can't collect output. The fileCount doesn't match: %s from %s for %s"
-                        % (fileCount, expNum, outputPath)
-                    )
-                    continue
+                    if fileCount != expNum:
+                        self.writeLog(
+                            "Can't collect output. The fileCount doesn't match: %s from %s for %s"
+                            % (fileCount, expNum, outputPath)
+                        )
+                        continue
 
-                copiedNum, errors, targetPath = self.collectOutput(slave=slave, jobCode=job)
+                copiedNum, errors, targetPath = self.collectOutput(
+                    slave=slave, jobCode=job, files=files
+                )
 
                 jobConf = os.path.join(self.repPath, "Jobs", job, "PandoraJob.json")
                 jName = self.getConfig("information", "jobName", configPath=jobConf)
@@ -2148,9 +3237,45 @@ class PandoraCoordinator:
 
         for i in removeTasks:
             del self.collectTasks[i[0]][i[1]]
+            self.collectManifests.get(i[0], {}).pop(i[1], None)
 
+    # returns the relative paths of the files in the output manifests of a job or None, if
+    # not all files are synchronized yet
     @err_decorator
-    def collectOutput(self, slave=None, jobCode=None):
+    def getManifestOutput(self, slave, job, manifests):
+        slavePath = os.path.join(self.slPath, "Slaves", "S_" + slave)
+        outputPath = os.path.join(slavePath, "Output", job)
+
+        files = {}
+        for manifestName in manifests:
+            manifestPath = os.path.join(
+                slavePath, PandoraManifest.outputManifestFolder, job, manifestName
+            )
+            manifest = PandoraManifest.readManifest(manifestPath)
+            if manifest is None:
+                self.writeLog(
+                    "Can't collect output. The output manifest doesn't exist: %s"
+                    % manifestPath
+                )
+                return
+
+            files.update(PandoraManifest.getOutputFiles(manifest))
+
+        for relPath in files:
+            filePath = os.path.join(outputPath, relPath)
+            if (
+                not os.path.exists(filePath)
+                or os.path.getsize(filePath) != files[relPath][0]
+            ):
+                self.writeLog(
+                    "Can't collect output. The file is not synchronized yet: %s" % filePath
+                )
+                return
+
+        return sorted(files)
+
+    @err_decorator
+    def collectOutput(self, slave=None, jobCode=None, files=None):
         jobConf = os.path.join(self.repPath, "Jobs", jobCode, "PandoraJob.json")
         if os.path.exists(jobConf):
             jconfig = self.getConfig(configPath=jobConf, getConf=True)
@@ -2185,11 +3310,15 @@ class PandoraCoordinator:
                 jfolderExists = False
 
         if jfolderExists:
+            self.flushConfigWrites(jobConf)
             try:
                 shutil.copy2(jobConf, targetBase)
             except:
                 pass
 
+        engine = PandoraTransfer.TransferEngine(
+            threads=self.transferThreads, verify=self.verifyTransfers
+        )
         slaveSyncPath = os.path.join(self.slPath, "Slaves")
         for i in os.listdir(slaveSyncPath):
             slaveName = i[len("S_") :]
@@ -2198,37 +3327,33 @@ class PandoraCoordinator:
 
             jobOutput = os.path.join(slaveSyncPath, i, "Output", jobCode)
             if os.path.exists(jobOutput):
-                for k in os.walk(jobOutput):
-                    for m in k[2]:
-                        filePath = os.path.join(k[0], m)
-                        relFilePath = filePath.replace(jobOutput, "")
-                        while relFilePath.startswith("\\") or relFilePath.startswith("/"):
-                            relFilePath = relFilePath[1:]
-                        targetPath = os.path.join(targetBase, relFilePath)
-
-                        copyFile = True
-
-                        if os.path.exists(targetPath):
-                            curFileDate = int(os.path.getmtime(os.path.abspath(filePath)))
-                            targetFileDate = int(os.path.getmtime(targetPath))
-
-                            if curFileDate <= targetFileDate:
-                                copyFile = False
-
-                        if copyFile:
-                            folderExists = True
-                            if not os.path.exists(os.path.dirname(targetPath)):
-                                try:
-                                    os.makedirs(os.path.dirname(targetPath))
-                                except:
-                                    errors += 1
-                                    folderExists = False
-                            if folderExists:
-                                try:
-                                    shutil.copy2(filePath, targetPath)
-                                    copiedNum += 1
-                                except:
-                                    errors += 1
+                if files is not None:
+                    result = engine.copyFiles(
+                        [
+                            [os.path.join(jobOutput, x), os.path.join(targetBase, x)]
+                            for x in files
+                        ]
+                    )
+                else:
+                    result = engine.copyTree(jobOutput, targetBase)
+                copiedNum += result["copied"]
+                errors += result["failed"]
+                if result["lastTarget"] is not None:
+                    targetPath = result["lastTarget"]
+
+                for k in result["errors"]:
+                    self.writeLog("could not collect %s: %s" % (k[0], k[1]), 2)
+
+                if result["copied"] > 0:
+                    self.writeLog(
+                        "collected %s files (%.1f MB/s) from slave %s for job %s"
+                        % (
+                            result["copied"],
+                            result["throughput"] / 1024.0 / 1024.0,
+                            slaveName,
+                            jobCode,
+                        )
+                    )
 
         if "jobtasks" in jconfig["jobtasks"]:
             for k in jconfig["jobtasks"]:
@@ -2273,37 +3398,147 @@ class PandoraCoordinator:
 
         validLogs = []
         validLogs += self.copyLogs(
-            [self.coordLog, self.coordConf, self.actSlvPath, self.coordWarningsConf],
+            [
+                self.coordLog,
+                self.coordConf,
+                self.actSlvPath,
+                self.coordWarningsConf,
+                self.slaveRegistry.path,
+            ],
             os.path.join(logDir, "Coordinator"),
         )
 
+        for request in list(self.logRequests):
+            if time.time() - self.logRequests[request] > PandoraFarmState.requestLease:
+                del self.logRequests[request]
+
+        jobs = self.getJobSummaries()
+
+        # only the configs of requested jobs are mirrored
         filesToCopy = []
-        for jobDir in self.jobDirs:
-            jobConf = os.path.join(self.jobPath, jobDir, "PandoraJob.json")
+        jobNames = {}
+        for jobCode in jobs:
+            if ("job", jobCode) not in self.logRequests:
+                continue
+
+            jobConf = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
             filesToCopy.append(jobConf)
+            jobNames[jobConf] = jobs[jobCode]["name"]
 
-        validLogs += self.copyLogs(filesToCopy, os.path.join(logDir, "Jobs"))
+        validLogs += self.copyLogs(
+            filesToCopy, os.path.join(logDir, "Jobs"), jobNames=jobNames
+        )
 
+        slaves = {}
         filesToCopy = []
-        for i in os.listdir(os.path.join(self.slPath, "Slaves")):
-            if i.startswith("S_"):
-                slaveName = i[len("S_") :]
-                slaveLog = os.path.join(
-                    self.slPath, "Slaves", i, "slaveLog_%s.txt" % slaveName
-                )
-                slaveSettings = os.path.join(
-                    os.path.dirname(slaveLog), "slaveSettings_%s.json" % slaveName
-                )
-                slaveWarnings = os.path.join(
-                    os.path.dirname(slaveLog), "slaveWarnings_%s.json" % slaveName
-                )
-                filesToCopy += [slaveLog, slaveSettings, slaveWarnings]
+        for slaveName, entry in self.slaveRegistry.getSlaves().items():
+            slaveLog = os.path.join(
+                self.slPath, "Slaves", "S_%s" % slaveName, "slaveLog_%s.txt" % slaveName
+            )
+            slaveWarnings = os.path.join(
+                os.path.dirname(slaveLog), "slaveWarnings_%s.jsonl" % slaveName
+            )
+            if not os.path.exists(slaveWarnings):
+                # slave script, which doesn't write a warnings journal yet
+                slaveWarnings = slaveWarnings[:-1]
+
+            slaves[slaveName] = dict(entry)
+            slaves[slaveName]["active"] = slaveName in self.activeSlaves
+            slaves[slaveName]["warnings"] = self.getWarningCount(slaveWarnings)
+
+            if ("slave", slaveName) not in self.logRequests:
+                continue
+
+            slaveSettings = os.path.join(
+                os.path.dirname(slaveLog), "slaveSettings_%s.json" % slaveName
+            )
+            filesToCopy += [slaveLog, slaveSettings, slaveWarnings]
 
         validLogs += self.copyLogs(filesToCopy, os.path.join(logDir, "Slaves"))
+
+        if self.farmState.publish(jobs, slaves):
+            self.writeLog("Published farm state version %s" % self.farmState.version)
+
+        if os.path.exists(self.farmState.path):
+            validLogs.append(
+                {
+                    "path": self.farmState.path,
+                    "mtime": int(os.path.getmtime(self.farmState.path)),
+                }
+            )
+
         for log in validLogs:
             log["path"] = log["path"].replace(logDir, "")
 
-        self.setConfig(configPath=self.logCache, confData=validLogs)
+        if validLogs != self.publishedLogs:
+            self.setConfig(configPath=self.logCache, confData=validLogs)
+            self.publishedLogs = validLogs
+
+    # returns the summaries of all jobs for the farm state. The job names are unique and
+    # are used as file names of the mirrored job configs. A summary is only calculated
+    # again, when the cached config of its job was replaced.
+    @err_decorator
+    def getJobSummaries(self):
+        jobs = {}
+        jobNames = []
+        summaries = {}
+        for jobCode in sorted(self.jobDirs):
+            jobConf = os.path.join(self.jobPath, jobCode, "PandoraJob.json")
+            entry = self.getConfigEntry(jobConf)
+            if entry is None or not entry["data"]:
+                continue
+
+            # summaries are only created again, when the config or the progress changed
+            taskProgress = self.taskProgress.get(jobCode) or {}
+            cached = self.jobSummaries.get(jobCode)
+            if (
+                cached is None
+                or cached[0] != entry["version"]
+                or cached[1] != taskProgress
+            ):
+                cached = [
+                    entry["version"],
+                    copyConfigData(taskProgress),
+                    PandoraFarmState.getJobSummary(entry["data"], jobCode, taskProgress),
+                ]
+
+            summaries[jobCode] = cached
+            summary = dict(cached[2])
+            jobName = origJobName = summary["name"]
+            jNum = 1
+            while jobName in jobNames:
+                jobName = origJobName + " (%s)" % jNum
+                jNum += 1
+
+            jobNames.append(jobName)
+            summary["name"] = jobName
+            jobs[jobCode] = summary
+
+        self.jobSummaries = summaries
+        self.taskProgress = dict(
+            (x, self.taskProgress[x]) for x in self.taskProgress if x in summaries
+        )
+        return jobs
+
+    # returns the number of warnings in a slave warnings file. Files are only read again,
+    # when they changed.
+    def getWarningCount(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        cached = self.warningCounts.get(path)
+        if cached is not None and cached[:2] == [stat.st_mtime, stat.st_size]:
+            return cached[2]
+
+        if path.endswith(".jsonl"):
+            count = len(PandoraWarnings.WarningsJournal(path).getWarnings())
+        else:
+            count = len(PandoraWarnings.readLegacyWarnings(path))
+
+        self.warningCounts[path] = [stat.st_mtime, stat.st_size, count]
+        return count
 
     @err_decorator
     def notifySlaves(self):
@@ -2328,7 +3563,7 @@ class PandoraCoordinator:
             self.sendCommand(slaveName, ["checkConnection"])
 
     @err_decorator
-    def copyLogs(self, files, target):
+    def copyLogs(self, files, target, jobNames=None):
         if not os.path.exists(target):
             try:
                 os.makedirs(target)
@@ -2340,9 +3575,8 @@ class PandoraCoordinator:
                     3,
                 )
 
-        jobNames = []
-
         validLogs = []
+        copiedNames = []
         for i in files:
             # self.writeLog(i)
             if not os.path.exists(i):
@@ -2351,18 +3585,22 @@ class PandoraCoordinator:
 
             origTime = int(os.path.getmtime(i))
 
-            if os.path.basename(i) == "PandoraJob.json":
+            if jobNames and i in jobNames:
+                jobName = jobNames[i]
+                copiedNames.append(jobName)
+                targetPath = os.path.join(target, jobName + ".json")
+            elif os.path.basename(i) == "PandoraJob.json":
                 jobName = self.getConfig("information", "jobName", configPath=i)
 
                 if jobName is not None:
                     origjobName = jobName
 
                     jNum = 1
-                    while jobName in jobNames:
+                    while jobName in copiedNames:
                         jobName = origjobName + " (%s)" % jNum
                         jNum += 1
 
-                    jobNames.append(jobName)
+                    copiedNames.append(jobName)
                 else:
                     jobName = os.path.basename(i)
 
@@ -2387,10 +3625,10 @@ class PandoraCoordinator:
                     )
 
         baseNames = [os.path.basename(x) for x in files if os.path.exists(x)]
-        baseNames.append("LogCache.json")
+        baseNames += ["LogCache.json", PandoraFarmState.farmStateName]
 
         for i in os.listdir(target):
-            if i not in baseNames and os.path.splitext(i)[0] not in jobNames:
+            if i not in baseNames and os.path.splitext(i)[0] not in copiedNames:
                 lpath = os.path.join(target, i)
                 os.remove(lpath)
                 self.writeLog("removed log: %s" % lpath)
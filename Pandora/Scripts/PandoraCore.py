@@ -93,6 +93,10 @@ except:
             from PySide.QtGui import *
             psVersion = 1
 
+import PandoraRegistry
+import PandoraMailbox
+import PandoraConfigIO
+
 
 logger = logging.getLogger(__name__)
 
@@ -670,29 +674,12 @@ class PandoraCore:
             except:
                 return
 
-        curNum = 1
-
-        for i in os.listdir(cmdDir):
-            if not i.startswith("slaveIn_"):
-                continue
-
-            num = i.split("_")[1]
-            if pVersion == 2:
-                if not unicode(num).isnumeric():
-                    continue
-            else:
-                if not num.isnumeric():
-                    continue
-
-            if int(num) >= curNum:
-                curNum = int(num) + 1
-
-        cmdFile = os.path.join(
-            cmdDir, "slaveIn_%s_%s.txt" % (format(curNum, "04"), time.time())
-        )
-
-        with open(cmdFile, "w") as cFile:
-            cFile.write(str(cmd))
+        PandoraMailbox.Mailbox(
+            cmdDir,
+            "slaveIn",
+            socket.gethostname(),
+            PandoraMailbox.MailboxCounter(os.path.join(slavepath, "MailboxCounters.json")),
+        ).send([cmd])
 
     @err_decorator
     def startCoordinator(self, restart=False):
@@ -835,21 +822,10 @@ class PandoraCore:
         if not os.path.exists(os.path.dirname(configPath)):
             return
 
-        if len(
-            [
-                x
-                for x in os.listdir(os.path.dirname(configPath))
-                if x.startswith(os.path.basename(configPath) + ".bak")
-            ]
-        ):
-            self.restoreConfig(configPath)
-
         userConfig = {}
 
         try:
-            if os.path.exists(configPath):
-                with open(configPath, "r") as f:
-                    userConfig = json.load(f)
+            userConfig = PandoraConfigIO.readConfig(configPath) or {}
         except:
             if silent:
                 return "Error"
@@ -958,18 +934,10 @@ class PandoraCore:
                     QMessageBox.warning(self.messageParent, "Pandora", errStr)
                     return
 
-        fcontent = os.listdir(os.path.dirname(configPath))
-        if len(
-            [x for x in fcontent if x.startswith(os.path.basename(configPath) + ".bak")]
-        ):
-            self.restoreConfig(configPath)
-
         if confData is None:
             userConfig = {}
             try:
-                if os.path.exists(configPath):
-                    with open(configPath, "r") as f:
-                        userConfig = json.load(f)
+                userConfig = PandoraConfigIO.readConfig(configPath) or {}
             except:
                 if silent:
                     return "Error - Cannot read the following file:\n\n%s" % configPath
@@ -1016,116 +984,21 @@ class PandoraCore:
         else:
             userConfig = confData
 
+        # locked configs are written later without blocking the caller
         try:
-            with open(configPath, "w") as confFile:
-                try:
-                    json.dump(userConfig, confFile, indent=4)
-                except UnicodeEncodeError:
-                    errStr = (
-                        "Cannot save config because it contains illegal characters:\n\n%s"
-                        % userConfig
-                    )
-                    if silent:
-                        return "Error - " + errStr
-                    else:
-                        QMessageBox.warning(
-                            self.messageParent, "Pandora", errStr, QMessageBox.Ok
-                        )
-
-            try:
-                with open(configPath, "r") as f:
-                    testConfig = json.load(f)
-                for i in userConfig:
-                    for k in userConfig[i]:
-                        if k not in testConfig[i]:
-                            raise RuntimeError
-            except:
-                backupPath = configPath + ".bak" + str(random.randint(1000000, 9999999))
-                with open(backupPath, "w") as confFile:
-                    json.dump(userConfig, confFile, indent=4)
+            PandoraConfigIO.writeConfig(configPath, userConfig)
+        except UnicodeEncodeError:
+            errStr = (
+                "Cannot save config because it contains illegal characters:\n\n%s"
+                % userConfig
+            )
+            if silent:
+                return "Error - " + errStr
+            else:
+                QMessageBox.warning(self.messageParent, "Pandora", errStr, QMessageBox.Ok)
         except IOError as e:
             return "Error - " + str(e)
 
-    @err_decorator
-    def restoreConfig(self, configPath):
-        path = os.path.dirname(configPath)
-        backups = []
-        for i in os.listdir(path):
-            if not i.startswith(os.path.basename(configPath) + "."):
-                continue
-
-            try:
-                backups.append(
-                    {
-                        "name": i,
-                        "time": os.path.getmtime(os.path.join(path, i)),
-                        "size": os.stat(os.path.join(path, i)).st_size,
-                    }
-                )
-            except Exception:
-                return False
-
-        times = [x["time"] for x in backups]
-
-        if len(times) == 0:
-            return False
-
-        minTime = min(times)
-
-        validBackup = None
-        for i in backups:
-            if i["time"] == minTime and (
-                validBackup is None or validBackup["size"] > i["size"]
-            ):
-                validBackup = i
-
-        if validBackup is None:
-            return False
-
-        while True:
-            try:
-                if os.path.exists(configPath):
-                    os.remove(configPath)
-                break
-            except Exception:
-                msg = QMessageBox(
-                    QMessageBox.Warning,
-                    "Restore config",
-                    "Could not remove corrupt config in order to restore a backup config:\n\n%s"
-                    % configPath,
-                    QMessageBox.Cancel,
-                )
-                msg.addButton("Retry", QMessageBox.YesRole)
-                msg.setFocus()
-                action = msg.exec_()
-
-                if action != 0:
-                    return False
-
-        validBuPath = os.path.join(path, validBackup["name"])
-
-        try:
-            shutil.copy2(validBuPath, configPath)
-        except:
-            msg = QMessageBox(
-                QMessageBox.Warning,
-                "Restore config",
-                "Could not restore backup config:\n\n%s" % validBuPath,
-                QMessageBox.Ok,
-            )
-            msg.setFocus()
-            msg.exec_()
-            return False
-
-        for i in backups:
-            buPath = os.path.join(path, i["name"])
-            try:
-                os.remove(buPath)
-            except:
-                pass
-
-        return True
-
     @err_decorator
     def validateStr(self, text, allowChars=[], denyChars=[]):
         invalidChars = [
@@ -1329,8 +1202,26 @@ class PandoraCore:
 
     @err_decorator
     def getSlaveData(self):
-        slaveData = {"slaveNames": [], "slaveGroups": []}
-        slaveDir = os.path.join(os.path.dirname(self.getSubmissionPath()), "Logs", "Slaves")
+        slaveData = {"slaveNames": [], "slaveGroups": [], "groupsBySlave": {}}
+        logDir = os.path.join(os.path.dirname(self.getSubmissionPath()), "Logs")
+
+        # the registry is published by the coordinator, older coordinators only provide
+        # the slave settings files
+        registry = PandoraRegistry.readRegistry(
+            os.path.join(logDir, "Coordinator", PandoraRegistry.registryName)
+        )
+        if registry is not None:
+            for slaveName in sorted(registry["slaves"]):
+                slaveData["slaveNames"].append(slaveName)
+                sGroups = registry["slaves"][slaveName]["groups"] or []
+                slaveData["groupsBySlave"][slaveName] = sGroups
+                for k in sGroups:
+                    if k not in slaveData["slaveGroups"]:
+                        slaveData["slaveGroups"].append(k)
+
+            return slaveData
+
+        slaveDir = os.path.join(logDir, "Slaves")
         if os.path.isdir(slaveDir):
             for i in os.listdir(slaveDir):
                 slaveLogPath = os.path.join(slaveDir, i)
@@ -1352,6 +1243,7 @@ class PandoraCore:
                         "settings", "slaveGroup", configPath=slaveSettingsPath
                     )
                     if sGroups is not None:
+                        slaveData["groupsBySlave"][slaveName] = sGroups
                         for k in sGroups:
                             if k not in slaveData["slaveGroups"]:
                                 slaveData["slaveGroups"].append(k)
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, time, json, hashlib
+
+import PandoraManifest
+import PandoraScheduling
+
+
+# The farm state is published by the coordinator in the Logs/Coordinator folder and
+# contains everything the RenderHandler needs to show the job and slave lists:
+#   {"schema": 1, "version": 12, "updated": 1600000000.0, "hash": "...",
+#    "jobs": {"jobCode": {"name": "shot010", "status": "rendering", "tasks": 20,
+#                         "counts": {"finished": 10, "rendering": 2, "ready": 8},
+#                         "progress": 50, "eta": 600, "priority": 50, "owner": "user",
+#                         "taskProgress": {"task0011": 3}, ...}},
+#    "slaves": {"name": {<slave registry entry>, "active": true, "warnings": 3}}}
+# The file is only rewritten when its content changes. Full job configs and slave logs
+# are only mirrored for jobs and slaves, which a workstation requested with a
+# "fetchLogs" command in the last requestLease seconds.
+
+farmStateName = "FarmState.json"
+schemaVersion = 1
+requestLease = 600  # seconds, in which requested job configs and slave logs are mirrored
+
+
+def readFarmState(path):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with io.open(path, "r", encoding="utf-8") as fFile:
+            state = json.load(fFile)
+    except Exception:
+        return None
+
+    if (
+        type(state) != dict
+        or type(state.get("jobs")) != dict
+        or type(state.get("slaves")) != dict
+    ):
+        return None
+
+    return state
+
+
+# returns the status of a job from the number of tasks in each state
+def getJobStatus(counts):
+    if not counts:
+        return "unknown"
+
+    for state in ["error", "rendering"]:
+        if counts.get(state):
+            return state
+
+    for state in counts:
+        if state not in ["assigned", "ready", "disabled", "finished"] and counts[state]:
+            return state
+
+    for state in ["assigned", "ready", "disabled", "finished"]:
+        if counts.get(state):
+            return state
+
+
+# summarizes a job config for the job list. The frame progress of the rendering tasks
+# is only kept by the coordinator: {taskName: [framesDone, frameTime, reportTime]}
+def getJobSummary(jobConfig, jobCode=None, taskProgress=None):
+    info = jobConfig.get("information") or {}
+    jobGlobals = jobConfig.get("jobglobals") or {}
+
+    jobTasks = jobConfig.get("jobtasks") or {}
+    taskProgress = taskProgress or {}
+
+    counts = {}
+    for taskData in jobTasks.values():
+        if type(taskData) == list and len(taskData) > 2:
+            counts[taskData[2]] = counts.get(taskData[2], 0) + 1
+
+    # the slaves report the finished frames of their rendering tasks, so the progress
+    # and the ETA are calculated per frame
+    numFrames = 0
+    doneFrames = 0
+    progressTimes = []
+    renderedFrames = {}
+    for taskName, taskData in jobTasks.items():
+        if not PandoraScheduling.isTaskData(taskData):
+            continue
+
+        frames = taskData[1] - taskData[0] + 1
+        numFrames += frames
+        if taskData[2] == "finished":
+            doneFrames += frames
+        elif taskData[2] == "rendering" and type(taskProgress.get(taskName)) == list:
+            renderedFrames[taskName] = min(taskProgress[taskName][0], frames)
+            doneFrames += renderedFrames[taskName]
+            if taskProgress[taskName][1]:
+                progressTimes.append(taskProgress[taskName][1])
+
+    numTasks = sum(counts.values())
+    if numFrames > 0:
+        progress = int(100 / float(numFrames) * float(doneFrames))
+    elif numTasks:
+        progress = int(100 / float(numTasks) * float(counts.get("finished", 0)))
+    else:
+        progress = None
+
+    frameTime = PandoraScheduling.getFrameTime(jobTasks)
+    if frameTime is None and progressTimes:
+        frameTime = sum(progressTimes) / float(len(progressTimes))
+
+    if numTasks and counts.get("finished", 0) == numTasks:
+        eta = 0
+    elif frameTime is not None and numFrames > 0:
+        remaining = (numFrames - doneFrames) * frameTime
+        eta = int(round(remaining / max(1, counts.get("rendering", 0)) / 60.0)) * 60
+    else:
+        eta = None
+
+    return {
+        "code": info.get("jobcode") or jobCode,
+        "name": info.get("jobName") or jobCode,
+        "status": getJobStatus(counts) if "jobtasks" in jobConfig else None,
+        "tasks": numTasks,
+        "counts": counts,
+        "progress": progress,
+        "eta": eta,
+        "priority": jobGlobals.get("priority"),
+        "owner": info.get("userName"),
+        "project": info.get("projectName"),
+        "program": info.get("program"),
+        "frameRange": info.get("frameRange"),
+        "submitDate": info.get("submitDate"),
+        "taskProgress": renderedFrames,
+    }
+
+
+class FarmStatePublisher(object):
+    def __init__(self, path):
+        self.path = path
+        self.version = None
+        self.hash = None
+
+    def load(self):
+        if self.version is not None:
+            return
+
+        state = readFarmState(self.path) or {}
+        self.version = state.get("version", 0)
+        self.hash = state.get("hash")
+
+    # writes the farm state, if its content changed and returns True, if it was written
+    def publish(self, jobs, slaves):
+        self.load()
+
+        content = json.dumps({"jobs": jobs, "slaves": slaves}, sort_keys=True)
+        contentHash = hashlib.sha1(content.encode("utf-8")).hexdigest()
+        if contentHash == self.hash and os.path.exists(self.path):
+            return False
+
+        state = {
+            "schema": schemaVersion,
+            "version": self.version + 1,
+            "updated": time.time(),
+            "hash": contentHash,
+            "jobs": jobs,
+            "slaves": slaves,
+        }
+
+        tmpPath = os.path.join(
+            os.path.dirname(self.path),
+            "~%s.%s.tmp" % (os.path.basename(self.path), os.getpid()),
+        )
+        with open(tmpPath, "w") as fFile:
+            json.dump(state, fFile, indent=4, sort_keys=True)
+
+        PandoraManifest.replaceFile(tmpPath, self.path)
+        self.version += 1
+        self.hash = contentHash
+        return True
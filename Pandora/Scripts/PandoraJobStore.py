@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import json, sqlite3
+
+
+# Optional repository backend of the coordinator. All jobs, their tasks, the job
+# priorities and the job dependencies are kept in one SQLite database in WAL mode, so
+# that the coordinator can query tasks by state or slave instead of parsing every
+# PandoraJob.json. The database is the source of truth while it is enabled. The
+# PandoraJob.json files are still written as exported copies for the RenderHandler and
+# other tools. The mtime and size of each exported file are stored with the job, so that
+# a file, which was changed by someone else, gets imported again.
+
+storeName = "PandoraJobs.db"
+schemaVersion = 1
+
+schema = """
+CREATE TABLE IF NOT EXISTS jobs (
+    code TEXT PRIMARY KEY,
+    name TEXT,
+    config TEXT NOT NULL,
+    fileTime REAL,
+    fileSize INTEGER
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job TEXT NOT NULL,
+    name TEXT NOT NULL,
+    idx INTEGER,
+    startFrame,
+    endFrame,
+    state TEXT,
+    slave TEXT,
+    time,
+    startTime,
+    endTime,
+    PRIMARY KEY (job, name)
+);
+CREATE INDEX IF NOT EXISTS tasksByState ON tasks (state);
+CREATE INDEX IF NOT EXISTS tasksBySlave ON tasks (slave);
+CREATE TABLE IF NOT EXISTS priorities (
+    job TEXT PRIMARY KEY,
+    priority INTEGER
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    job TEXT NOT NULL,
+    dependency TEXT NOT NULL,
+    frameOffset
+);
+CREATE INDEX IF NOT EXISTS dependenciesByJob ON dependencies (job);
+"""
+
+taskColumns = "startFrame, endFrame, state, slave, time, startTime, endTime"
+
+
+def isTaskData(taskData):
+    return type(taskData) == list and len(taskData) == 7
+
+
+class JobStore(object):
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(schema)
+        self.db.execute("PRAGMA user_version=%s" % schemaVersion)
+        self.db.commit()
+
+    def close(self):
+        self.db.rollback()
+        self.db.close()
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def getJobCodes(self):
+        return [x[0] for x in self.db.execute("SELECT code FROM jobs")]
+
+    def hasJob(self, jobCode):
+        row = self.db.execute("SELECT 1 FROM jobs WHERE code=?", (jobCode,)).fetchone()
+        return row is not None
+
+    # returns the stat of the last exported PandoraJob.json as (mtime, size)
+    def getFileStat(self, jobCode):
+        row = self.db.execute(
+            "SELECT fileTime, fileSize FROM jobs WHERE code=?", (jobCode,)
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+
+        return (row[0], row[1])
+
+    def setFileStat(self, jobCode, fileStat):
+        self.db.execute(
+            "UPDATE jobs SET fileTime=?, fileSize=? WHERE code=?",
+            (fileStat[0], fileStat[1], jobCode),
+        )
+
+    # returns the job config in the same format as the PandoraJob.json
+    def getJob(self, jobCode):
+        row = self.db.execute(
+            "SELECT config FROM jobs WHERE code=?", (jobCode,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        jobConfig = json.loads(row[0])
+        jobTasks = jobConfig.pop("jobtasks", {})
+        jobConfig["jobtasks"] = self.getJobTasks(jobCode)
+        jobConfig["jobtasks"].update(jobTasks)
+        return jobConfig
+
+    def getJobTasks(self, jobCode):
+        jobTasks = {}
+        rows = self.db.execute(
+            "SELECT name, %s FROM tasks WHERE job=? ORDER BY idx" % taskColumns,
+            (jobCode,),
+        )
+        for row in rows:
+            jobTasks[row[0]] = list(row[1:])
+
+        return jobTasks
+
+    # replaces a job with the given config. Task entries, which are not valid task data,
+    # are kept in the config column, so that the exported file stays unchanged. Without a
+    # fileStat the stat of the last export is kept
+    def putJob(self, jobCode, jobConfig, fileStat=None):
+        if fileStat is None:
+            fileStat = self.getFileStat(jobCode)
+
+        jobConfig = dict(jobConfig)
+        jobTasks = jobConfig.pop("jobtasks", None) or {}
+
+        invalidTasks = {}
+        taskRows = []
+        for idx, taskName in enumerate(jobTasks):
+            taskData = jobTasks[taskName]
+            if isTaskData(taskData):
+                taskRows.append([jobCode, taskName, idx] + list(taskData))
+            else:
+                invalidTasks[taskName] = taskData
+
+        if invalidTasks:
+            jobConfig["jobtasks"] = invalidTasks
+
+        jobName = jobConfig.get("information", {}).get("jobName")
+        self.db.execute(
+            "INSERT OR REPLACE INTO jobs (code, name, config, fileTime, fileSize) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                jobCode,
+                jobName,
+                json.dumps(jobConfig),
+                fileStat[0] if fileStat else None,
+                fileStat[1] if fileStat else None,
+            ),
+        )
+
+        self.db.execute("DELETE FROM tasks WHERE job=?", (jobCode,))
+        self.db.executemany(
+            "INSERT INTO tasks (job, name, idx, %s) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            % taskColumns,
+            taskRows,
+        )
+
+        jobDeps = jobConfig.get("jobglobals", {}).get("jobDependecies") or []
+        self.setDependencies(jobCode, jobDeps)
+
+    # updates a single task and returns False if the task is not in the store
+    def setTask(self, jobCode, taskName, taskData):
+        if not isTaskData(taskData):
+            return False
+
+        cursor = self.db.execute(
+            "UPDATE tasks SET startFrame=?, endFrame=?, state=?, slave=?, time=?, "
+            "startTime=?, endTime=? WHERE job=? AND name=?",
+            list(taskData) + [jobCode, taskName],
+        )
+        return cursor.rowcount > 0
+
+    def removeJob(self, jobCode):
+        self.db.execute("DELETE FROM jobs WHERE code=?", (jobCode,))
+        self.db.execute("DELETE FROM tasks WHERE job=?", (jobCode,))
+        self.db.execute("DELETE FROM dependencies WHERE job=?", (jobCode,))
+
+    # returns [jobCode, taskName, taskData] of all tasks in one of the states and/or
+    # assigned to the slave
+    def getTasks(self, states=None, slave=None):
+        query = "SELECT job, name, %s FROM tasks" % taskColumns
+        conditions = []
+        args = []
+        if states is not None:
+            conditions.append("state IN (%s)" % ", ".join(["?"] * len(states)))
+            args += list(states)
+
+        if slave is not None:
+            conditions.append("slave=?")
+            args.append(slave)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+
+        query += " ORDER BY job, idx"
+        return [[x[0], x[1], list(x[2:])] for x in self.db.execute(query, args)]
+
+    def getTaskCounts(self, jobCode):
+        rows = self.db.execute(
+            "SELECT state, COUNT(*) FROM tasks WHERE job=? GROUP BY state", (jobCode,)
+        )
+        return dict(rows.fetchall())
+
+    def getJobName(self, jobCode):
+        row = self.db.execute("SELECT name FROM jobs WHERE code=?", (jobCode,)).fetchone()
+        if row is None:
+            return None
+
+        return row[0]
+
+    # returns the priorities in the same format as the PriorityList.json
+    def getPriorities(self):
+        rows = self.db.execute("SELECT job, priority FROM priorities ORDER BY job")
+        return dict([[x[0], {"priority": x[1]}] for x in rows])
+
+    def setPriorities(self, prioConfig):
+        self.db.execute("DELETE FROM priorities")
+        self.db.executemany(
+            "INSERT INTO priorities (job, priority) VALUES (?, ?)",
+            [
+                [x, prioConfig[x].get("priority")]
+                for x in prioConfig
+                if type(prioConfig[x]) == dict
+            ],
+        )
+
+    def getDependencies(self, jobCode):
+        rows = self.db.execute(
+            "SELECT dependency, frameOffset FROM dependencies WHERE job=? ORDER BY rowid",
+            (jobCode,),
+        )
+        return [list(x) for x in rows]
+
+    # returns the codes of all jobs, which depend on the given job
+    def getDependents(self, jobCode):
+        rows = self.db.execute(
+            "SELECT DISTINCT job FROM dependencies WHERE dependency=?", (jobCode,)
+        )
+        return [x[0] for x in rows]
+
+    def setDependencies(self, jobCode, jobDeps):
+        self.db.execute("DELETE FROM dependencies WHERE job=?", (jobCode,))
+        self.db.executemany(
+            "INSERT INTO dependencies (job, dependency, frameOffset) VALUES (?, ?, ?)",
+            [[jobCode, x[0], x[1]] for x in jobDeps if len(x) == 2],
+        )
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, time, json, threading
+
+import PandoraManifest
+
+
+# Commands are exchanged as envelope files, which can contain any number of commands:
+#   <prefix>_<seq>_<sender>.json
+#   {"schema": 1, "sender": "WS01", "seq": 12, "created": 1600000000.0,
+#    "commands": [["restartTask", "J0001", "task0003", [31, 40]],
+#                 ["restartTask", "J0001", "task0004", [41, 50]]]}
+# The sequence number is counted per sender and mailbox folder and is stored in a
+# counter file of the sender, so sending doesn't need to list the mailbox folder.
+# Commands, which were first sent through a direct connection (see PandoraTransport),
+# have their message ids in an optional "ids" list, so that receivers can skip commands
+# they already got. Mailboxes and counters can be used from several threads of a sender.
+# Receivers also accept the old "<prefix>_<num>_<time>.txt" files, which contain a
+# single command.
+
+schemaVersion = 1
+envelopeExt = ".json"
+
+
+def getSeq(fileName):
+    try:
+        return int(fileName.split("_")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def isCommandFile(fileName, prefix):
+    if not fileName.startswith(prefix + "_"):
+        return False
+
+    return fileName.endswith(envelopeExt) or fileName.endswith(".txt")
+
+
+# returns the command files of a mailbox folder in the order they were sent
+def sortCommandFiles(fileNames, prefix):
+    cmdFiles = [x for x in fileNames if isCommandFile(x, prefix)]
+    return sorted(cmdFiles, key=lambda x: (getSeq(x) or 0, x))
+
+
+def readCommands(path):
+    return [x[1] for x in readEnvelope(path)]
+
+
+# returns the commands of an envelope or legacy command file as [id, command]. The id
+# is None for commands, which were only sent as files.
+def readEnvelope(path):
+    with io.open(path, "r", encoding="utf-8") as cmdFile:
+        cmdText = cmdFile.read()
+
+    if not path.endswith(envelopeExt):
+        command = eval(cmdText)
+        if type(command) != list:
+            raise ValueError("invalid command: %s" % cmdText)
+
+        return [[None, command]]
+
+    envelope = json.loads(cmdText)
+    if type(envelope) != dict or type(envelope.get("commands")) != list:
+        raise ValueError("invalid envelope: %s" % cmdText)
+
+    if envelope.get("schema", 0) > schemaVersion:
+        raise ValueError(
+            "unsupported envelope schema %s (supported: %s)"
+            % (envelope.get("schema"), schemaVersion)
+        )
+
+    ids = envelope.get("ids")
+    if type(ids) != list or len(ids) != len(envelope["commands"]):
+        ids = [None] * len(envelope["commands"])
+
+    return [
+        [cmdId, command]
+        for cmdId, command in zip(ids, envelope["commands"])
+        if type(command) == list and len(command) > 0
+    ]
+
+
+class MailboxCounter(object):
+    def __init__(self, path):
+        self.path = path
+        self.counters = None
+        self.lock = threading.RLock()
+
+    def load(self):
+        if self.counters is not None:
+            return
+
+        self.counters = {}
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with io.open(self.path, "r", encoding="utf-8") as cFile:
+                counters = json.load(cFile)
+        except Exception:
+            return
+
+        if type(counters) == dict:
+            self.counters = counters
+
+    def getKey(self, folder, prefix):
+        return "%s|%s" % (prefix, os.path.normcase(os.path.abspath(folder)))
+
+    # returns the next sequence number of a mailbox. The folder is only listed once
+    # per mailbox, in case the counter file was lost.
+    def next(self, folder, prefix, scanned):
+        with self.lock:
+            self.load()
+            key = self.getKey(folder, prefix)
+            seq = self.counters.get(key, 0)
+
+            if not scanned and os.path.exists(folder):
+                for fileName in os.listdir(folder):
+                    if isCommandFile(fileName, prefix):
+                        seq = max(seq, getSeq(fileName) or 0)
+
+            self.counters[key] = seq + 1
+            return seq + 1
+
+    def save(self):
+        with self.lock:
+            if self.counters is None:
+                return
+
+            tmpPath = os.path.join(
+                os.path.dirname(self.path),
+                "~%s.%s.tmp" % (os.path.basename(self.path), os.getpid()),
+            )
+            with open(tmpPath, "w") as cFile:
+                json.dump(self.counters, cFile, indent=4, sort_keys=True)
+
+            PandoraManifest.replaceFile(tmpPath, self.path)
+
+
+class Mailbox(object):
+    def __init__(self, folder, prefix, sender, counter):
+        self.folder = folder
+        self.prefix = prefix
+        self.sender = sender
+        self.counter = counter
+        self.scanned = False
+        self.queued = []
+        self.queuedIds = []
+        self.lock = threading.RLock()
+
+    def queue(self, command, cmdId=None):
+        with self.lock:
+            self.queued.append(list(command))
+            self.queuedIds.append(cmdId)
+
+    # writes all queued commands into one envelope and returns its path
+    def flush(self):
+        with self.lock:
+            if not self.queued:
+                return None
+
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+
+            seq = self.counter.next(self.folder, self.prefix, self.scanned)
+            self.scanned = True
+
+            envelope = {
+                "schema": schemaVersion,
+                "sender": self.sender,
+                "seq": seq,
+                "created": time.time(),
+                "commands": self.queued,
+            }
+            if any(x is not None for x in self.queuedIds):
+                envelope["ids"] = self.queuedIds
+
+            envPath = os.path.join(
+                self.folder, "%s_%06d_%s%s" % (self.prefix, seq, self.sender, envelopeExt)
+            )
+            tmpPath = os.path.join(
+                self.folder, "~%s.%s.tmp" % (os.path.basename(envPath), os.getpid())
+            )
+            with open(tmpPath, "w") as eFile:
+                json.dump(envelope, eFile)
+
+            PandoraManifest.replaceFile(tmpPath, envPath)
+            self.clear()
+            self.counter.save()
+            return envPath
+
+    def clear(self):
+        with self.lock:
+            self.queued = []
+            self.queuedIds = []
+
+    def send(self, commands):
+        with self.lock:
+            for command in commands:
+                self.queue(command)
+
+            return self.flush()
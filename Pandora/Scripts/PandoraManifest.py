@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, re, time, json, shutil, hashlib
+
+
+# A release manifest describes the files, which get distributed to the slaves:
+#   {"version": 3, "created": 1600000000.0,
+#    "files": {"PandoraSlave.py": {"hash": "<sha256>", "size": 1234, "mtime": 1600000000.0}}}
+# The version is only increased when the content of a file changes, so a slave needs to
+# compare a single number to know if it is up to date.
+
+manifestName = "ReleaseManifest.json"
+assetManifestName = "AssetManifest.json"
+outputManifestFolder = "OutputManifests"
+
+
+def hashFile(path, blockSize=1024 * 1024):
+    fileHash = hashlib.sha256()
+    with open(path, "rb") as hFile:
+        while True:
+            data = hFile.read(blockSize)
+            if not data:
+                break
+
+            fileHash.update(data)
+
+    return fileHash.hexdigest()
+
+
+def readManifest(path):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with io.open(path, "r", encoding="utf-8") as mFile:
+            manifest = json.load(mFile)
+    except Exception:
+        return None
+
+    if type(manifest) != dict or "version" not in manifest or "files" not in manifest:
+        return None
+
+    return manifest
+
+
+def writeManifest(path, manifest):
+    if not os.path.exists(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+
+    tmpPath = os.path.join(
+        os.path.dirname(path), "~%s.%s.tmp" % (os.path.basename(path), os.getpid())
+    )
+    with open(tmpPath, "w") as mFile:
+        json.dump(manifest, mFile, indent=4, sort_keys=True)
+
+    replaceFile(tmpPath, path)
+
+
+def replaceFile(src, dst):
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+    else:
+        if os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def isReleaseFile(fileName):
+    return (
+        fileName != manifestName
+        and not fileName.startswith("~")
+        and not fileName.endswith(".tmp")
+    )
+
+
+# compares the files in a folder with a manifest and returns the updated manifest and
+# wether the content changed. Files are only hashed if their size or mtime changed.
+def updateManifest(folder, manifest=None):
+    if manifest is None:
+        manifest = {"version": 0, "created": 0, "files": {}}
+
+    files = {}
+    for fileName in sorted(os.listdir(folder)):
+        filePath = os.path.join(folder, fileName)
+        if not isReleaseFile(fileName) or not os.path.isfile(filePath):
+            continue
+
+        fileStat = os.stat(filePath)
+        prevData = manifest["files"].get(fileName)
+        if (
+            prevData is not None
+            and prevData["size"] == fileStat.st_size
+            and prevData["mtime"] == fileStat.st_mtime
+        ):
+            files[fileName] = prevData
+            continue
+
+        files[fileName] = {
+            "hash": hashFile(filePath),
+            "size": fileStat.st_size,
+            "mtime": fileStat.st_mtime,
+        }
+
+    prevHashes = dict((x, manifest["files"][x]["hash"]) for x in manifest["files"])
+    curHashes = dict((x, files[x]["hash"]) for x in files)
+    changed = prevHashes != curHashes
+
+    newManifest = {
+        "version": manifest["version"] + (1 if changed else 0),
+        "created": time.time() if changed else manifest["created"],
+        "files": files,
+    }
+    return newManifest, changed
+
+
+# returns the names of the files, which have a different hash in the second manifest
+def getChangedFiles(manifest, prevManifest=None):
+    if prevManifest is None:
+        return sorted(manifest["files"])
+
+    changedFiles = []
+    for fileName in sorted(manifest["files"]):
+        prevData = prevManifest["files"].get(fileName)
+        if prevData is None or prevData["hash"] != manifest["files"][fileName]["hash"]:
+            changedFiles.append(fileName)
+
+    return changedFiles
+
+
+# An asset store keeps the project assets of a project once per content hash:
+#   <folder>/Store/ab/ab12...    the content of the asset
+#   <folder>/AssetManifest.json  {"version": 4, "created": 1600000000.0,
+#                                 "files": {"ab12...": {"size": 1234, "names": ["tex.jpg"]}}}
+# Two assets with the same name but a different content don't overwrite each other and an
+# asset, which is already in the store, never needs to be copied again. The content is
+# verified when it is added, so later checks only need to compare the size.
+class AssetStore(object):
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, assetManifestName)
+        self.manifest = None
+        self.sources = {}  # source path: [size, mtime, hash]
+        self.dirty = False
+
+    def load(self):
+        if self.manifest is not None:
+            return
+
+        self.manifest = readManifest(self.path)
+        if self.manifest is None:
+            self.manifest = {"version": 0, "created": 0, "files": {}}
+
+    def save(self):
+        if not self.dirty:
+            return
+
+        self.manifest["version"] += 1
+        self.manifest["created"] = time.time()
+        writeManifest(self.path, self.manifest)
+        self.dirty = False
+
+    def getPath(self, fileHash):
+        return os.path.join(self.folder, "Store", fileHash[:2], fileHash)
+
+    def getSize(self, fileHash):
+        self.load()
+        return self.manifest["files"][fileHash]["size"]
+
+    def hasAsset(self, fileHash, size=None):
+        self.load()
+        data = self.manifest["files"].get(fileHash)
+        return data is not None and (size is None or data["size"] == size)
+
+    # returns the hash of a file outside of the store. The file is only read again if its
+    # size or mtime changed
+    def getSourceHash(self, path):
+        fileStat = os.stat(path)
+        cached = self.sources.get(path)
+        if (
+            cached is not None
+            and cached[0] == fileStat.st_size
+            and cached[1] == fileStat.st_mtime
+        ):
+            return cached[2]
+
+        fileHash = hashFile(path)
+        self.sources[path] = [fileStat.st_size, fileStat.st_mtime, fileHash]
+        return fileHash
+
+    # adds a file to the store and returns its hash. If the hash is known already (e.g. when
+    # the source is another store), it can be passed to avoid reading the file
+    def addFile(self, path, name, fileHash=None, copyFunc=None, verify=True):
+        self.load()
+        if fileHash is None:
+            fileHash = self.getSourceHash(path)
+
+        data = self.manifest["files"].get(fileHash)
+        if data is not None and os.path.exists(self.getPath(fileHash)):
+            if name not in data["names"]:
+                data["names"].append(name)
+                self.dirty = True
+
+            return fileHash
+
+        targetPath = self.getPath(fileHash)
+        if not os.path.exists(os.path.dirname(targetPath)):
+            os.makedirs(os.path.dirname(targetPath))
+
+        tmpPath = "%s.%s.tmp" % (targetPath, os.getpid())
+        (copyFunc or shutil.copy2)(path, tmpPath)
+        if verify and hashFile(tmpPath) != fileHash:
+            os.remove(tmpPath)
+            raise ValueError("the content of %s changed while it was copied" % path)
+
+        replaceFile(tmpPath, targetPath)
+        self.manifest["files"][fileHash] = {
+            "size": os.path.getsize(targetPath),
+            "names": [name],
+        }
+        self.dirty = True
+        return fileHash
+
+    # reads the stored file again and compares it with its hash
+    def verify(self, fileHash):
+        path = self.getPath(fileHash)
+        return os.path.exists(path) and hashFile(path) == fileHash
+
+
+# An output manifest lists the files, which a slave uploaded for a task. Image sequences
+# are stored with a frame range instead of one entry per frame:
+#   {"version": 1, "task": "Task_0001", "created": 1600000000.0,
+#    "files": {"preview.jpg": [1234, 1600000000.0]},
+#    "sequences": [{"pattern": "beauty/shot.%04d.exr", "frames": "1001-1010,1012",
+#                   "sizes": [...], "mtimes": [...]}]}
+# The paths are relative to the output folder of the job and use "/" as separator.
+
+framePattern = re.compile(r"^(.*?)(\d+)(\.[^./]+)$")
+
+
+def compressFrames(frames):
+    ranges = []
+    for frame in sorted(frames):
+        if ranges and frame == ranges[-1][1] + 1:
+            ranges[-1][1] = frame
+        else:
+            ranges.append([frame, frame])
+
+    return ",".join(
+        [str(x[0]) if x[0] == x[1] else "%s-%s" % (x[0], x[1]) for x in ranges]
+    )
+
+
+def expandFrames(frameString):
+    frames = []
+    for frameRange in frameString.split(","):
+        if not frameRange:
+            continue
+
+        if "-" in frameRange[1:]:
+            start, end = frameRange[1:].split("-", 1)
+            frames += range(int(frameRange[0] + start), int(end) + 1)
+        else:
+            frames.append(int(frameRange))
+
+    return frames
+
+
+# creates the manifest from a dict {relative path: [size, mtime]}
+def createOutputManifest(taskName, files):
+    sequences = {}
+    single = {}
+    for relPath in sorted(files):
+        path = relPath.replace("\\", "/")
+        match = framePattern.match(path)
+        if match is None:
+            single[path] = files[relPath]
+            continue
+
+        key = (match.group(1), len(match.group(2)), match.group(3))
+        sequences.setdefault(key, []).append([int(match.group(2)), files[relPath]])
+
+    manifestSequences = []
+    for key in sorted(sequences):
+        frames = sorted(sequences[key])
+        if len(frames) == 1:
+            single["%s%0*d%s" % (key[0], key[1], frames[0][0], key[2])] = frames[0][1]
+            continue
+
+        manifestSequences.append(
+            {
+                "pattern": "%s%%0%sd%s" % (key[0].replace("%", "%%"), key[1], key[2]),
+                "frames": compressFrames([x[0] for x in frames]),
+                "sizes": [x[1][0] for x in frames],
+                "mtimes": [x[1][1] for x in frames],
+            }
+        )
+
+    return {
+        "version": 1,
+        "task": taskName,
+        "created": time.time(),
+        "files": single,
+        "sequences": manifestSequences,
+    }
+
+
+# returns the files of an output manifest as a dict {relative path: [size, mtime]}
+def getOutputFiles(manifest):
+    files = {}
+    for path in manifest["files"]:
+        files[os.path.normpath(path)] = manifest["files"][path]
+
+    for sequence in manifest["sequences"]:
+        frames = expandFrames(sequence["frames"])
+        for idx, frame in enumerate(frames):
+            path = os.path.normpath(sequence["pattern"] % frame)
+            files[path] = [sequence["sizes"][idx], sequence["mtimes"][idx]]
+
+    return files
@@ -0,0 +1,442 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, sys, io, time, json, threading, collections
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins
+
+import PandoraManifest
+
+
+# Measures the phases of the coordinator cycles. For every phase the wall time, the
+# number of opened files, stats, directory listings, read and written bytes and json
+# parses are recorded. The file system functions are wrapped while the metrics are
+# enabled and only count calls from the thread of the cycle, while it is running. The
+# threads of the log writer, the transfers and the transport aren't counted. Bytes, which are copied by the
+# operating system without reading them in python (like shutil.copyfile), aren't
+# counted.
+# Rolling percentiles of the last cycles are written to a json file and to a file in the
+# Prometheus text format. Optionally the slowest cycles are profiled with cProfile.
+
+metricsName = "CycleMetrics.json"
+prometheusName = "CycleMetrics.prom"
+profileFolder = "Profiles"
+schemaVersion = 1
+counterNames = ["opens", "stats", "listdirs", "bytesRead", "bytesWritten", "jsonParses"]
+quantiles = [0.5, 0.9, 0.99]
+
+
+class CountingFile(object):
+    def __init__(self, fileObj, metrics):
+        self.fileObj = fileObj
+        self.metrics = metrics
+
+    def read(self, *args):
+        data = self.fileObj.read(*args)
+        self.metrics.count("bytesRead", len(data))
+        return data
+
+    def readline(self, *args):
+        data = self.fileObj.readline(*args)
+        self.metrics.count("bytesRead", len(data))
+        return data
+
+    def readlines(self, *args):
+        lines = self.fileObj.readlines(*args)
+        self.metrics.count("bytesRead", sum([len(x) for x in lines]))
+        return lines
+
+    def write(self, data):
+        self.metrics.count("bytesWritten", len(data))
+        return self.fileObj.write(data)
+
+    def writelines(self, lines):
+        lines = list(lines)
+        self.metrics.count("bytesWritten", sum([len(x) for x in lines]))
+        return self.fileObj.writelines(lines)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.fileObj)
+        self.metrics.count("bytesRead", len(line))
+        return line
+
+    next = __next__  # python 2
+
+    def __enter__(self):
+        self.fileObj.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        return self.fileObj.__exit__(*args)
+
+    def __getattr__(self, name):
+        return getattr(self.fileObj, name)
+
+
+def getPercentile(values, quantile):
+    if not values:
+        return 0
+
+    values = sorted(values)
+    idx = int(round(quantile * (len(values) - 1)))
+    return values[idx]
+
+
+class CycleMetrics(object):
+    def __init__(self, folder, window=100, writeInterval=60):
+        self.folder = folder
+        self.window = window  # number of cycles used for the percentiles
+        self.writeInterval = writeInterval  # seconds between writes of the metric files
+        self.history = {}  # phase: {metric: deque of the last values}
+        self.totals = {}  # phase: {metric: sum over all cycles, "count": cycles}
+        self.lastCycle = None
+        self.cycleCount = 0
+        self.lastWrite = 0
+        self.installed = False
+        self.originals = {}
+        self.lock = threading.Lock()
+        self.cycleStart = None
+        self.cycleThread = None  # only the calls of this thread are counted
+        self.phaseName = None
+        self.counters = None
+        self.phases = None
+        self.profileCycles = 0  # number of slowest cycles, which are kept as profile
+        self.profiler = None
+        self.slowestProfiles = None  # [[duration, path]]
+
+    # wraps the file system functions, which are counted
+    def install(self):
+        if self.installed:
+            return
+
+        self.originals = {
+            "open": builtins.open,
+            "ioOpen": io.open,
+            "stat": os.stat,
+            "lstat": os.lstat,
+            "listdir": os.listdir,
+            "jsonLoads": json.loads,
+        }
+        if hasattr(os, "scandir"):
+            self.originals["scandir"] = os.scandir
+
+        builtins.open = self.wrapOpen(self.originals["open"])
+        io.open = self.wrapOpen(self.originals["ioOpen"])
+        os.stat = self.wrapCall(self.originals["stat"], "stats")
+        os.lstat = self.wrapCall(self.originals["lstat"], "stats")
+        os.listdir = self.wrapCall(self.originals["listdir"], "listdirs")
+        json.loads = self.wrapCall(self.originals["jsonLoads"], "jsonParses")
+        if "scandir" in self.originals:
+            os.scandir = self.wrapCall(self.originals["scandir"], "listdirs")
+
+        # the folder snapshot imports scandir directly
+        snapshotModule = sys.modules.get("PandoraSnapshot")
+        if snapshotModule is not None and getattr(snapshotModule, "scandir", None):
+            self.originals["snapshotScandir"] = snapshotModule.scandir
+            snapshotModule.scandir = self.wrapCall(snapshotModule.scandir, "listdirs")
+
+        self.installed = True
+
+    def uninstall(self):
+        if not self.installed:
+            return
+
+        builtins.open = self.originals["open"]
+        io.open = self.originals["ioOpen"]
+        os.stat = self.originals["stat"]
+        os.lstat = self.originals["lstat"]
+        os.listdir = self.originals["listdir"]
+        json.loads = self.originals["jsonLoads"]
+        if "scandir" in self.originals:
+            os.scandir = self.originals["scandir"]
+
+        if "snapshotScandir" in self.originals:
+            sys.modules["PandoraSnapshot"].scandir = self.originals["snapshotScandir"]
+
+        self.installed = False
+
+    def isCounting(self):
+        return (
+            self.counters is not None
+            and threading.current_thread() is self.cycleThread
+        )
+
+    def wrapCall(self, func, counterName):
+        def wrapper(*args, **kwargs):
+            if self.isCounting():
+                self.count(counterName)
+
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    def wrapOpen(self, func):
+        def wrapper(*args, **kwargs):
+            fileObj = func(*args, **kwargs)
+            if not self.isCounting():
+                return fileObj
+
+            self.count("opens")
+            return CountingFile(fileObj, self)
+
+        return wrapper
+
+    def count(self, counterName, value=1):
+        counters = self.counters
+        if counters is None or threading.current_thread() is not self.cycleThread:
+            return
+
+        with self.lock:
+            counters[counterName] += value
+
+    def startCycle(self):
+        self.cycleStart = time.time()
+        self.cycleThread = threading.current_thread()
+        self.phases = collections.OrderedDict()
+        self.startPhase("other")
+
+        if self.profileCycles > 0:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    # starts a new phase and returns the name of the previous phase
+    def startPhase(self, name):
+        now = time.time()
+        previous = self.phaseName
+        if previous is not None:
+            record = self.phases[previous]
+            record["time"] += now - record["started"]
+
+        self.phaseName = name
+        if name not in self.phases:
+            self.phases[name] = dict([[x, 0] for x in counterNames])
+            self.phases[name]["time"] = 0.0
+
+        self.phases[name]["started"] = now
+        self.counters = self.phases[name] if self.installed else None
+        return previous
+
+    # measures a phase. Nested phases are counted only in the inner phase
+    def measure(self, name, func, *args, **kwargs):
+        if self.phases is None:
+            return func(*args, **kwargs)
+
+        previous = self.startPhase(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.startPhase(previous)
+
+    # returns the duration of the cycle and the slowest phase
+    def endCycle(self):
+        if self.phases is None:
+            return None
+
+        self.startPhase("other")
+        self.counters = None
+        self.phaseName = None
+        duration = time.time() - self.cycleStart
+
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.saveProfile(duration)
+            self.profiler = None
+
+        phases = self.phases
+        self.phases = None
+        for name in phases:
+            phases[name].pop("started", None)
+
+        self.cycleCount += 1
+        self.lastCycle = {
+            "started": self.cycleStart,
+            "duration": duration,
+            "phases": phases,
+        }
+
+        for name in phases:
+            history = self.history.setdefault(name, {})
+            totals = self.totals.setdefault(name, {"count": 0})
+            totals["count"] += 1
+            for metric in ["time"] + counterNames:
+                values = history.setdefault(
+                    metric, collections.deque(maxlen=self.window)
+                )
+                values.append(phases[name][metric])
+                totals[metric] = totals.get(metric, 0) + phases[name][metric]
+
+        history = self.history.setdefault("cycle", {})
+        values = history.setdefault("time", collections.deque(maxlen=self.window))
+        values.append(duration)
+        totals = self.totals.setdefault("cycle", {"count": 0})
+        totals["count"] += 1
+        totals["time"] = totals.get("time", 0) + duration
+
+        if time.time() - self.lastWrite > self.writeInterval:
+            self.write()
+
+        slowest = max(phases, key=lambda x: phases[x]["time"])
+        return [duration, slowest, phases[slowest]["time"]]
+
+    def getSummary(self):
+        summary = {}
+        for name in self.history:
+            summary[name] = {}
+            for metric in self.history[name]:
+                values = list(self.history[name][metric])
+                stats = {}
+                for quantile in quantiles:
+                    stats["p%s" % int(quantile * 100)] = getPercentile(values, quantile)
+
+                stats["max"] = max(values) if values else 0
+                summary[name][metric] = stats
+
+        return summary
+
+    def write(self):
+        if not os.path.exists(self.folder):
+            return
+
+        self.lastWrite = time.time()
+        metrics = {
+            "schema": schemaVersion,
+            "updated": self.lastWrite,
+            "cycles": self.cycleCount,
+            "window": self.window,
+            "lastCycle": self.lastCycle,
+            "phases": self.getSummary(),
+        }
+        self.writeFile(metricsName, json.dumps(metrics, indent=4, sort_keys=True))
+        self.writeFile(prometheusName, self.getPrometheusText())
+
+    def getPrometheusText(self):
+        summary = self.getSummary()
+        lines = []
+        for metric in ["time"] + counterNames:
+            if metric == "time":
+                metricName = "pandora_coordinator_phase_seconds"
+                helpText = "Wall time of the coordinator cycle phases"
+            else:
+                metricName = "pandora_coordinator_phase_%s" % metric
+                helpText = "%s per coordinator cycle phase" % metric
+
+            lines.append("# HELP %s %s" % (metricName, helpText))
+            lines.append("# TYPE %s summary" % metricName)
+            for name in sorted(summary):
+                if metric not in summary[name]:
+                    continue
+
+                for quantile in quantiles:
+                    lines.append(
+                        '%s{phase="%s",quantile="%s"} %s'
+                        % (
+                            metricName,
+                            name,
+                            quantile,
+                            summary[name][metric]["p%s" % int(quantile * 100)],
+                        )
+                    )
+
+                lines.append(
+                    '%s_sum{phase="%s"} %s'
+                    % (metricName, name, self.totals[name].get(metric, 0))
+                )
+                lines.append(
+                    '%s_count{phase="%s"} %s'
+                    % (metricName, name, self.totals[name]["count"])
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def writeFile(self, fileName, content):
+        path = os.path.join(self.folder, fileName)
+        tmpPath = os.path.join(self.folder, "~%s.%s.tmp" % (fileName, os.getpid()))
+        with io.open(tmpPath, "w", encoding="utf-8") as f:
+            f.write(u"%s" % content)
+
+        PandoraManifest.replaceFile(tmpPath, path)
+
+    # keeps the profiles of the profileCycles slowest cycles
+    def saveProfile(self, duration):
+        profileDir = os.path.join(self.folder, profileFolder)
+        if self.slowestProfiles is None:
+            self.slowestProfiles = []
+            if os.path.exists(profileDir):
+                for fileName in os.listdir(profileDir):
+                    try:
+                        ms = int(fileName.rsplit("_", 1)[1].split("ms")[0])
+                    except (IndexError, ValueError):
+                        continue
+
+                    self.slowestProfiles.append(
+                        [ms / 1000.0, os.path.join(profileDir, fileName)]
+                    )
+
+        self.slowestProfiles.sort()
+        while len(self.slowestProfiles) > self.profileCycles:
+            self.removeProfile(self.slowestProfiles.pop(0)[1])
+
+        if self.profileCycles <= 0:
+            return
+
+        if (
+            len(self.slowestProfiles) >= self.profileCycles
+            and duration <= self.slowestProfiles[0][0]
+        ):
+            return
+
+        if not os.path.exists(profileDir):
+            os.makedirs(profileDir)
+
+        fileName = "cycle_%s_%sms.prof" % (int(self.cycleStart), int(duration * 1000))
+        path = os.path.join(profileDir, fileName)
+        self.profiler.dump_stats(path)
+        self.slowestProfiles.append([duration, path])
+        self.slowestProfiles.sort()
+        if len(self.slowestProfiles) > self.profileCycles:
+            self.removeProfile(self.slowestProfiles.pop(0)[1])
+
+    def removeProfile(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+import re
+
+
+# The render output of the DCCs is parsed line by line to find out, when a frame was
+# written. The patterns are compiled once per parser class, because they are matched
+# against every line of the render output. There are two kinds of patterns:
+#   donePattern: a line, which is printed after a frame was saved. If the pattern has
+#                no group, the frame of the last startPattern match is used.
+#   startPattern: a line, which is printed, when a frame starts. If there is no
+#                 donePattern, the previous frame is done, when the next one starts, and
+#                 the last frame is done, when the renderer exited successfully.
+# Lines, which don't match, are ignored, so unknown renderers only lose the progress.
+
+
+class ProgressParser(object):
+    startPattern = None
+    donePattern = None
+
+    def __init__(self):
+        self.curFrame = None
+        self.doneFrames = set()
+
+    # returns the frames, which were finished with this line
+    def parseLine(self, line):
+        frames = []
+        if self.donePattern is not None:
+            match = self.donePattern.search(line)
+            if match:
+                if match.groups():
+                    frames.append(int(float(match.group(1))))
+                elif self.curFrame is not None:
+                    frames.append(self.curFrame)
+
+        if self.startPattern is not None:
+            match = self.startPattern.search(line)
+            if match:
+                frame = int(float(match.group(1)))
+                if (
+                    self.donePattern is None
+                    and self.curFrame is not None
+                    and frame != self.curFrame
+                ):
+                    frames.append(self.curFrame)
+
+                self.curFrame = frame
+
+        newFrames = [x for x in frames if x not in self.doneFrames]
+        self.doneFrames.update(newFrames)
+        return newFrames
+
+    # returns the last frame, when the renderer exited successfully. Parsers without a
+    # donePattern only see the start of the next frame, which doesn't come after the last.
+    def finish(self):
+        if self.donePattern is not None or self.curFrame is None:
+            return []
+
+        if self.curFrame in self.doneFrames:
+            return []
+
+        self.doneFrames.add(self.curFrame)
+        return [self.curFrame]
+
+
+# Fra:12 Mem:120.00M (Peak 140.00M) | Time:00:01.23 | Rendering 1 / 64 samples
+# Saved: '/render/shot_0012.exr'
+class BlenderParser(ProgressParser):
+    startPattern = re.compile(r"^Fra:(\d+) ")
+    donePattern = re.compile(r"^Saved: ")
+
+
+# Finished Rendering /render/shot.0012.exr
+class MayaParser(ProgressParser):
+    donePattern = re.compile(r"Finished Rendering .*?(\d+)\.\w+\s*$")
+
+
+# Rendering frame 12.0 (1 of 5)
+class HoudiniParser(ProgressParser):
+    startPattern = re.compile(r"[Rr]endering frame (\d+(?:\.\d+)?)")
+
+
+# Frame 12 completed
+class MaxParser(ProgressParser):
+    donePattern = re.compile(r"Frame (\d+) (?:completed|done)", re.IGNORECASE)
+
+
+parsers = {
+    "blender": BlenderParser,
+    "maya": MayaParser,
+    "houdini": HoudiniParser,
+    "max": MaxParser,
+}
+
+
+def getParser(prog):
+    return parsers.get(prog, ProgressParser)()
+
+
+# returns the number of frames of a task
+def getFrameCount(taskData):
+    try:
+        return int(taskData[1]) - int(taskData[0]) + 1
+    except (TypeError, ValueError, IndexError):
+        return 0
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, time, json
+
+import PandoraManifest
+
+
+# The slave registry is published by the coordinator and contains the information about
+# all slaves, which other tools need to know without reading every slave settings file:
+#   {"version": 12, "updated": 1600000000.0,
+#    "slaves": {"name": {"groups": [], "status": "idle", "curtasks": [], "cpucount": 8,
+#                        "ram": 32, "maxConcurrentTasks": 2, "lastContact": 1600000000.0,
+#                        "version": "v1.1.0.0"}}}
+# The file is only rewritten when the information of a slave changes.
+
+registryName = "SlaveRegistry.json"
+contactResolution = 60  # seconds, in which a new contact time doesn't rewrite the registry
+
+
+def readRegistry(path):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with io.open(path, "r", encoding="utf-8") as rFile:
+            registry = json.load(rFile)
+    except Exception:
+        return None
+
+    if type(registry) != dict or type(registry.get("slaves")) != dict:
+        return None
+
+    return registry
+
+
+# converts the content of a slaveSettings file to a registry entry
+def getSlaveEntry(slaveSettings, lastContact=None):
+    settings = slaveSettings.get("settings") or {}
+    slaveInfo = slaveSettings.get("slaveinfo") or {}
+    return {
+        "groups": settings.get("slaveGroup"),
+        "maxConcurrentTasks": settings.get("maxConcurrentTasks"),
+        "status": slaveInfo.get("status"),
+        "curtasks": slaveInfo.get("curtasks"),
+        "cpucount": slaveInfo.get("cpucount"),
+        "ram": slaveInfo.get("ram"),
+        "version": slaveInfo.get("slaveScriptVersion"),
+        "lastContact": lastContact,
+    }
+
+
+class SlaveRegistry(object):
+    def __init__(self, path):
+        self.path = path
+        self.registry = None
+        self.dirty = False
+
+    def load(self):
+        if self.registry is not None:
+            return
+
+        self.registry = readRegistry(self.path)
+        if self.registry is None:
+            self.registry = {"version": 0, "updated": 0, "slaves": {}}
+
+    def getSlave(self, slaveName):
+        self.load()
+        return self.registry["slaves"].get(slaveName)
+
+    def getSlaves(self):
+        self.load()
+        return self.registry["slaves"]
+
+    # updates some or all fields of a slave entry
+    def updateSlave(self, slaveName, data):
+        self.load()
+        entry = self.registry["slaves"].get(slaveName)
+        if entry is None:
+            entry = getSlaveEntry({})
+            self.registry["slaves"][slaveName] = entry
+            self.dirty = True
+
+        for key in data:
+            if entry.get(key) == data[key]:
+                continue
+
+            if (
+                key == "lastContact"
+                and entry.get(key) is not None
+                and data[key] is not None
+                and abs(data[key] - entry[key]) < contactResolution
+            ):
+                continue
+
+            entry[key] = data[key]
+            self.dirty = True
+
+    def removeSlave(self, slaveName):
+        self.load()
+        if slaveName in self.registry["slaves"]:
+            del self.registry["slaves"][slaveName]
+            self.dirty = True
+
+    # returns True, if the registry was written
+    def save(self):
+        if not self.dirty:
+            return False
+
+        self.registry["version"] += 1
+        self.registry["updated"] = time.time()
+
+        tmpPath = os.path.join(
+            os.path.dirname(self.path),
+            "~%s.%s.tmp" % (os.path.basename(self.path), os.getpid()),
+        )
+        with open(tmpPath, "w") as rFile:
+            json.dump(self.registry, rFile, indent=4, sort_keys=True)
+
+        PandoraManifest.replaceFile(tmpPath, self.path)
+        self.dirty = False
+        return True
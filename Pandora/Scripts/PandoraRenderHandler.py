@@ -93,6 +93,11 @@ else:
 
 import qdarkstyle
 
+import PandoraWarnings
+import PandoraRegistry
+import PandoraMailbox
+import PandoraFarmState
+
 
 logger = logging.getLogger(__name__)
 
@@ -165,6 +170,8 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
             self.logDir = self.localLogDir
 
             self.writeSettings = True
+            self.farmState = None  # job and slave summaries published by the coordinator
+            self.logRequests = {}  # time of the last fetchLogs command per job and slave
 
             self.getRVpath()
 
@@ -243,7 +250,7 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
             getattr(self.core.appPlugin, "setRCStyle", lambda x, y: None)(self, helpMenu)
 
-            self.tw_jobs.setColumnCount(10)
+            self.tw_jobs.setColumnCount(11)
             self.tw_jobs.setHorizontalHeaderLabels(
                 [
                     "Name",
@@ -256,9 +263,12 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                     "User",
                     "Program",
                     "settingsPath",
+                    "ETA",
                 ]
             )
             self.tw_jobs.setColumnHidden(9, True)
+            # the ETA column was added after the settingsPath and is only moved in the view
+            self.tw_jobs.horizontalHeader().moveSection(10, 3)
             self.tw_jobs.horizontalHeader().setDefaultAlignment(Qt.AlignLeft)
             if psVersion == 1:
                 self.tw_jobs.verticalHeader().setResizeMode(QHeaderView.Fixed)
@@ -279,9 +289,18 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                 self.styleSheet().replace("QCheckBox::indicator", "QTableWidget::indicator")
             )
 
-            self.tw_taskList.setColumnCount(7)
+            self.tw_taskList.setColumnCount(8)
             self.tw_taskList.setHorizontalHeaderLabels(
-                ["Num", "Frames", "Status", "Slave", "Rendertime", "Start", "End"]
+                [
+                    "Num",
+                    "Frames",
+                    "Status",
+                    "Slave",
+                    "Rendertime",
+                    "Start",
+                    "End",
+                    "Progress",
+                ]
             )
             self.tw_taskList.horizontalHeader().setDefaultAlignment(Qt.AlignLeft)
 
@@ -715,6 +734,9 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
     @err_decorator
     def jobChanged(self):
+        for jobName in set(x.text() for x in self.tw_jobs.selectedItems() if x.column() == 0):
+            self.requestLogs("job", self.getJobCode(jobName))
+
         self.updateTaskList()
         self.updateJobSettings()
 
@@ -731,16 +753,87 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
     @err_decorator
     def slaveChanged(self):
+        if self.tw_slaves.currentRow() != -1:
+            slaveItem = self.tw_slaves.item(self.tw_slaves.currentRow(), 0)
+            if slaveItem is not None:
+                self.requestLogs("slave", slaveItem.text())
+
         self.updateSlaveLog()
         self.updateSlaveSettings()
         self.updateSlaveWarnings()
 
+    # reads the farm state, which the coordinator publishes instead of mirroring all job
+    # configs and slave logs
+    @err_decorator
+    def updateFarmState(self):
+        self.farmState = PandoraFarmState.readFarmState(
+            os.path.join(self.logDir, "Coordinator", PandoraFarmState.farmStateName)
+        )
+        if self.farmState is not None:
+            self.farmJobs = dict((x["name"], x) for x in self.farmState["jobs"].values())
+
+    # asks the coordinator to mirror the config of a job or the logs of a slave
+    @err_decorator
+    def requestLogs(self, logType, name):
+        if self.farmState is None:
+            return
+
+        lastRequest = self.logRequests.get((logType, name), 0)
+        if time.time() - lastRequest < PandoraFarmState.requestLease / 2:
+            return
+
+        self.logRequests[(logType, name)] = time.time()
+        self.writeCmd(["fetchLogs", logType, name])
+
+    def getJobSummary(self, jobName, jobPath=None):
+        if self.farmState is not None:
+            return self.farmJobs.get(jobName)
+
+        if jobPath is None:
+            jobPath = os.path.join(self.logDir, "Jobs", "%s.json" % jobName)
+
+        jsconfig = self.getConfig(configPath=jobPath, getConf=True)
+        if not jsconfig or jsconfig == "Error":
+            return
+
+        return PandoraFarmState.getJobSummary(jsconfig, jobName)
+
+    def getJobCode(self, jobName):
+        summary = self.getJobSummary(jobName)
+        if summary is not None and summary["code"]:
+            return summary["code"]
+
+        return jobName
+
+    # returns the task numbers of a job from its mirrored config or, if it wasn't fetched
+    # yet, from the number of tasks in the farm state
+    def getJobTaskNums(self, jobName, jobConf):
+        taskNames = self.getConfig("jobtasks", getOptions=True, configPath=jobConf)
+        if taskNames:
+            return [int(x[4:]) for x in taskNames]
+
+        summary = self.getJobSummary(jobName)
+        if summary is not None:
+            return list(range(summary["tasks"]))
+
+        return []
+
     @err_decorator
     def updateJobs(self):
         self.tw_jobs.setRowCount(0)
         self.tw_jobs.setSortingEnabled(False)
+        self.updateFarmState()
         jobDir = os.path.join(self.logDir, "Jobs")
-        if os.path.isdir(jobDir):
+        if self.farmState is not None:
+            for jobName in self.farmJobs:
+                rc = self.tw_jobs.rowCount()
+                self.tw_jobs.insertRow(rc)
+                self.tw_jobs.setRowHeight(rc, 15)
+
+                settingsPath = os.path.join(jobDir, "%s.json" % jobName)
+                self.tw_jobs.setItem(rc, 9, QTableWidgetItem(settingsPath))
+                self.updateJobData(rc)
+        elif os.path.isdir(jobDir):
             for i in os.listdir(jobDir):
                 settingsPath = os.path.join(jobDir, i)
                 if not (os.path.isfile(settingsPath) and i.endswith(".json")):
@@ -772,104 +865,65 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
     @err_decorator
     def updateJobData(self, rc):
         jobPath = self.tw_jobs.item(rc, 9).text()
-        if not (os.path.isfile(jobPath) and jobPath.endswith(".json")):
+        jobName = os.path.splitext(os.path.basename(jobPath))[0]
+        if self.farmState is None and not (
+            os.path.isfile(jobPath) and jobPath.endswith(".json")
+        ):
             self.updateJobs()
             return
 
         self.tw_jobs.setSortingEnabled(False)
 
-        jobName = QTableWidgetItem(os.path.splitext(os.path.basename(jobPath))[0])
-        self.tw_jobs.setItem(rc, 0, jobName)
+        self.tw_jobs.setItem(rc, 0, QTableWidgetItem(jobName))
 
         rowColorStyle = "ready"
 
-        jsconfig = self.getConfig(configPath=jobPath, getConf=True)
-        jcData = {}
-        jcData["priority"] = ["jobglobals", "priority"]
-        jcData["frameRange"] = ["information", "frameRange"]
-        jcData["submitDate"] = ["information", "submitDate"]
-        jcData["projectName"] = ["information", "projectName"]
-        jcData["userName"] = ["information", "userName"]
-        jcData["program"] = ["information", "program"]
-        jcData = self.getConfig(configPath=jobPath, data=jcData)
-
-        if "jobtasks" in jsconfig:
-            finNum = 0
-            notfinNum = 0
-            status = "unknown"
-            for taskData in jsconfig["jobtasks"].values():
-                if taskData[2] == "finished":
-                    finNum += 1
-                    if status == "unknown":
-                        status = "finished"
-                elif taskData[2] == "rendering":
-                    notfinNum += 1
-                    if status != "error":
-                        status = "rendering"
-                elif taskData[2] == "error":
-                    notfinNum += 1
-                    status = "error"
-                elif taskData[2] == "disabled":
-                    notfinNum += 1
-                    if status not in ["rendering", "error", "ready", "assigned"]:
-                        status = "disabled"
-                elif taskData[2] == "ready":
-                    notfinNum += 1
-                    if status not in ["rendering", "error", "assigned"]:
-                        status = "ready"
-                elif taskData[2] == "assigned":
-                    notfinNum += 1
-                    if status not in ["rendering", "error"]:
-                        status = "assigned"
-                else:
-                    notfinNum += 1
-                    if status not in ["rendering", "error"]:
-                        status = taskData[2]
+        summary = self.getJobSummary(jobName, jobPath)
+        if summary is None:
+            summary = PandoraFarmState.getJobSummary({}, jobName)
 
-            rowColorStyle = status
+        if summary["status"] is not None:
+            rowColorStyle = summary["status"]
 
-            statusItem = QTableWidgetItem(status)
+            statusItem = QTableWidgetItem(summary["status"])
             self.tw_jobs.setItem(rc, 1, statusItem)
 
-            progress = int(100 / float(finNum + notfinNum) * float(finNum))
+            if summary["progress"] is not None:
+                progressItem = QTableWidgetItem(str(summary["progress"]) + " %")
+                self.tw_jobs.setItem(rc, 2, progressItem)
 
-            progressItem = QTableWidgetItem(str(progress) + " %")
-            self.tw_jobs.setItem(rc, 2, progressItem)
+            if summary.get("eta") is not None:
+                etaItem = QTableWidgetItem(self.formatDuration(summary["eta"]))
+                self.tw_jobs.setItem(rc, 10, etaItem)
 
-        if jcData:
-            if jcData["priority"] is not None:
-                jobPrio = jcData["priority"]
-                jobPrioItem = QTableWidgetItem(str(jobPrio))
-                self.tw_jobs.setItem(rc, 3, jobPrioItem)
+        if summary["priority"] is not None:
+            jobPrioItem = QTableWidgetItem(str(summary["priority"]))
+            self.tw_jobs.setItem(rc, 3, jobPrioItem)
 
-            if jcData["frameRange"] is not None:
-                framerange = jcData["frameRange"]
-                framerangeItem = QTableWidgetItem(framerange)
-                self.tw_jobs.setItem(rc, 4, framerangeItem)
+        if summary["frameRange"] is not None:
+            framerangeItem = QTableWidgetItem(summary["frameRange"])
+            self.tw_jobs.setItem(rc, 4, framerangeItem)
 
-            if jcData["submitDate"] is not None:
-                submitDate = jcData["submitDate"]
-                submitdateItem = QTableWidgetItem(submitDate)
-                submitdateItem.setData(
-                    0, QDateTime.fromString(submitDate, "dd.MM.yy, hh:mm:ss").addYears(100)
-                )
-                submitdateItem.setToolTip(submitDate)
-                self.tw_jobs.setItem(rc, 5, submitdateItem)
+        if summary["submitDate"] is not None:
+            submitDate = summary["submitDate"]
+            submitdateItem = QTableWidgetItem(submitDate)
+            submitdateItem.setData(
+                0, QDateTime.fromString(submitDate, "dd.MM.yy, hh:mm:ss").addYears(100)
+            )
+            submitdateItem.setToolTip(submitDate)
+            self.tw_jobs.setItem(rc, 5, submitdateItem)
 
-            if jcData["projectName"] is not None:
-                pName = jcData["projectName"]
-                pNameItem = QTableWidgetItem(pName)
-                self.tw_jobs.setItem(rc, 6, pNameItem)
+        if summary["project"] is not None:
+            pNameItem = QTableWidgetItem(summary["project"])
+            self.tw_jobs.setItem(rc, 6, pNameItem)
 
-            if jcData["userName"] is not None:
-                uName = jcData["userName"]
-                uNameItem = QTableWidgetItem(uName)
-                self.tw_jobs.setItem(rc, 7, uNameItem)
+        if summary["owner"] is not None:
+            uNameItem = QTableWidgetItem(summary["owner"])
+            self.tw_jobs.setItem(rc, 7, uNameItem)
 
-            if jcData["program"] is not None:
-                pName = jcData["program"]
-                pNameItem = QTableWidgetItem(pName)
-                self.tw_jobs.setItem(rc, 8, pNameItem)
+        if summary["program"] is not None:
+            pNameItem = QTableWidgetItem(summary["program"])
+            self.tw_jobs.setItem(rc, 8, pNameItem)
 
         if rowColorStyle not in ["ready", "assigned"]:
             cc = self.tw_jobs.columnCount()
@@ -891,6 +945,16 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
         self.tw_jobs.setSortingEnabled(True)
 
+    # formats the remaining seconds of a job like "1h 20min"
+    def formatDuration(self, seconds):
+        minutes = int(seconds) // 60
+        hours = minutes // 60
+        minutes -= hours * 60
+        if hours > 0:
+            return "%sh %smin" % (hours, minutes)
+        else:
+            return "%s min" % minutes
+
     @err_decorator
     def updateSlaves(self):
         self.tw_slaves.setRowCount(0)
@@ -900,49 +964,50 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         activeSlaves = {}
         actSlvPath = os.path.join(self.logDir, "Coordinator", "ActiveSlaves.json")
 
-        if os.path.exists(actSlvPath):
-            activeSlaves = self.getConfig(configPath=actSlvPath, getConf=True)
+        # the slave logs are only mirrored on request, so the slaves of the farm state are
+        # listed, if the coordinator publishes one
+        if self.farmState is not None:
+            registry = {"slaves": self.farmState["slaves"]}
+            slaveLogs = ["slaveLog_%s.txt" % x for x in self.farmState["slaves"]]
+            for slaveName, slaveEntry in self.farmState["slaves"].items():
+                if slaveEntry.get("lastContact"):
+                    activeSlaves[slaveName] = slaveEntry["lastContact"]
+        else:
+            if os.path.exists(actSlvPath):
+                activeSlaves = self.getConfig(configPath=actSlvPath, getConf=True)
 
-        if os.path.isdir(slaveDir):
+            registry = PandoraRegistry.readRegistry(
+                os.path.join(self.logDir, "Coordinator", PandoraRegistry.registryName)
+            )
+            slaveLogs = []
+            if os.path.isdir(slaveDir):
+                slaveLogs = [
+                    x
+                    for x in os.listdir(slaveDir)
+                    if os.path.isfile(os.path.join(slaveDir, x))
+                ]
+
+        if slaveLogs:
             corruptSlaves = []
-            for i in os.listdir(slaveDir):
+            for i in slaveLogs:
                 try:
                     slaveLogPath = os.path.join(slaveDir, i)
-                    if (
-                        i.startswith("slaveLog_")
-                        and i.endswith(".txt")
-                        and os.path.isfile(slaveLogPath)
-                    ):
+                    if i.startswith("slaveLog_") and i.endswith(".txt"):
                         rc = self.tw_slaves.rowCount()
                         slaveName = i[len("slaveLog_") : -len(".txt")]
                         slaveSettingsPath = (
                             slaveLogPath.replace("slaveLog_", "slaveSettings_")[:-3]
                             + "json"
                         )
-                        slaveWarningsPath = (
-                            slaveLogPath.replace("slaveLog_", "slaveWarnings_")[:-3]
-                            + "json"
-                        )
+                        slaveWarningsPath = self.getSlaveWarnPath(slaveLogPath)
                         self.tw_slaves.insertRow(rc)
                         self.tw_slaves.setItem(rc, 0, QTableWidgetItem(slaveName))
 
                         rowColorStyle = "idle"
                         slaveStatusItem = None
 
-                        if os.path.exists(slaveSettingsPath):
-                            scData = {}
-                            scData["status"] = ["slaveinfo", "status"]
-                            scData["curtasks"] = ["slaveinfo", "curtasks"]
-                            scData["cpucount"] = ["slaveinfo", "cpucount"]
-                            scData["ram"] = ["slaveinfo", "ram"]
-                            scData["slaveScriptVersion"] = [
-                                "slaveinfo",
-                                "slaveScriptVersion",
-                            ]
-                            scData = self.getConfig(
-                                configPath=slaveSettingsPath, data=scData
-                            )
-
+                        scData = self.getSlaveInfo(slaveName, slaveSettingsPath, registry)
+                        if scData is not None:
                             if scData["status"] is not None:
                                 slaveStatus = scData["status"]
                                 rowColorStyle = slaveStatus
@@ -970,17 +1035,16 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                                 slaveVersion = QTableWidgetItem(scriptVersion)
                                 self.tw_slaves.setItem(rc, 8, slaveVersion)
 
-                        if os.path.exists(slaveWarningsPath):
-                            options = self.getConfig(
-                                cat="warnings",
-                                configPath=slaveWarningsPath,
-                                getOptions=True,
-                                silent=True,
-                            )
-                            if options == "Error":
-                                numWarns = options
-                            else:
-                                numWarns = len(options)
+                        numWarns = None
+                        if self.farmState is not None:
+                            numWarns = registry["slaves"][slaveName].get("warnings")
+                        elif os.path.exists(slaveWarningsPath):
+                            try:
+                                numWarns = len(self.getWarnings(slaveWarningsPath))
+                            except Exception:
+                                numWarns = "Error"
+
+                        if numWarns is not None:
                             warns = QTableWidgetItem(str(numWarns))
                             self.tw_slaves.setItem(rc, 4, warns)
 
@@ -1055,6 +1119,31 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         self.tw_slaves.setSortingEnabled(True)
         self.tw_slaves.sortByColumn(0, Qt.AscendingOrder)
 
+    # returns the information of a slave from the slave registry or from the settings of
+    # the slave, if the coordinator doesn't publish a registry
+    @err_decorator
+    def getSlaveInfo(self, slaveName, slaveSettingsPath, registry=None):
+        if registry is not None and slaveName in registry["slaves"]:
+            slaveEntry = registry["slaves"][slaveName]
+            return {
+                "status": slaveEntry["status"],
+                "curtasks": slaveEntry["curtasks"],
+                "cpucount": slaveEntry["cpucount"],
+                "ram": slaveEntry["ram"],
+                "slaveScriptVersion": slaveEntry["version"],
+            }
+
+        if not os.path.exists(slaveSettingsPath):
+            return
+
+        scData = {}
+        scData["status"] = ["slaveinfo", "status"]
+        scData["curtasks"] = ["slaveinfo", "curtasks"]
+        scData["cpucount"] = ["slaveinfo", "cpucount"]
+        scData["ram"] = ["slaveinfo", "ram"]
+        scData["slaveScriptVersion"] = ["slaveinfo", "slaveScriptVersion"]
+        return self.getConfig(configPath=slaveSettingsPath, data=scData)
+
     @err_decorator
     def getTasksStr(self, tasks):
         if tasks:
@@ -1089,7 +1178,12 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
         jconfig = self.getConfig(configPath=jobConf, getConf=True)
 
-        if "jobtasks" in jconfig:
+        # the coordinator only publishes the frame progress in the farm state
+        taskProgress = {}
+        if self.farmState is not None:
+            taskProgress = (self.farmJobs.get(jobName) or {}).get("taskProgress") or {}
+
+        if jconfig and "jobtasks" in jconfig:
             for idx, i in enumerate(sorted(jconfig["jobtasks"])):
                 taskData = jconfig["jobtasks"][i]
 
@@ -1136,6 +1230,14 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                     self.tw_taskList.setItem(rc, 5, taskStart)
                     self.tw_taskList.setItem(rc, 6, taskEnd)
 
+                # finished frames of a rendering task, which the slave reported
+                framesDone = taskProgress.get(i)
+                if taskData[2] == "rendering" and framesDone is not None:
+                    progressItem = QTableWidgetItem(
+                        "%s/%s" % (framesDone, taskData[1] - taskData[0] + 1)
+                    )
+                    self.tw_taskList.setItem(rc, 7, progressItem)
+
                 if rowColorStyle != "ready":
                     cc = self.tw_taskList.columnCount()
                     for i in range(cc):
@@ -1481,18 +1583,16 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
             if pItem is None:
                 return
 
-            warningsPath = (
-                self.tw_slaves.item(self.tw_slaves.currentRow(), 7)
-                .text()
-                .replace("slaveLog_", "slaveWarnings_")[:-3]
-                + "json"
+            warningsPath = self.getSlaveWarnPath(
+                self.tw_slaves.item(self.tw_slaves.currentRow(), 7).text()
             )
             if os.path.exists(warningsPath):
-                swconfig = self.getConfig(
-                    configPath=warningsPath, getConf=True, silent=True
-                )
-
-                if swconfig == "Error":
+                try:
+                    # only the newest warnings are read from the end of the journal
+                    slaveWarns = self.getWarnings(
+                        warningsPath, limit=self.sp_logLimit.value() + 1
+                    )
+                except Exception:
                     rc = self.tw_slaveWarnings.rowCount()
                     self.tw_slaveWarnings.insertRow(rc)
                     item = QTableWidgetItem("Unable to read:")
@@ -1500,14 +1600,6 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                     item = QTableWidgetItem(warningsPath)
                     self.tw_slaveWarnings.setItem(rc, 1, item)
 
-                if "warnings" in swconfig:
-                    for i in swconfig["warnings"]:
-                        try:
-                            warnVal = swconfig["warnings"][i]
-                            slaveWarns.append(warnVal)
-                        except:
-                            continue
-
         for idx, i in enumerate(reversed(sorted(slaveWarns, key=lambda x: x[1]))):
             rc = self.tw_slaveWarnings.rowCount()
             self.tw_slaveWarnings.insertRow(rc)
@@ -1550,12 +1642,9 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         warningsPath = self.getCoordWarnPath()
 
         if os.path.exists(warningsPath):
-            wconfig = self.getConfig(configPath=warningsPath, getConf=True)
-
-            if "warnings" in wconfig:
-                for i in wconfig["warnings"]:
-                    warnVal = wconfig["warnings"][i]
-                    coordWarns.append(warnVal)
+            coordWarns = self.getWarnings(
+                warningsPath, limit=self.sp_logLimit.value() + 1
+            )
 
         for i in reversed(sorted(coordWarns, key=lambda x: x[1])):
             rc = self.tw_coordWarnings.rowCount()
@@ -1782,6 +1871,14 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
     @err_decorator
     def writeCmd(self, cmd):
+        self.writeCmds([cmd])
+
+    # writes all commands into one envelope, so that bulk operations create a single file
+    @err_decorator
+    def writeCmds(self, cmds):
+        if not cmds:
+            return
+
         cmdDir = os.path.join(self.sourceDir, "Commands")
 
         if not os.path.exists(cmdDir):
@@ -1793,33 +1890,24 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                 )
                 return
 
-        curNum = 1
-
-        for i in os.listdir(cmdDir):
-            if not i.startswith("handlerOut_"):
-                continue
-
-            num = i.split("_")[1]
-            if pVersion == 2:
-                if not unicode(num).isnumeric():
-                    continue
-            else:
-                if not num.isnumeric():
-                    continue
-
-            if int(num) >= curNum:
-                curNum = int(num) + 1
-
-        cmdFile = os.path.join(
-            cmdDir, "handlerOut_%s_%s.txt" % (format(curNum, "04"), time.time())
-        )
+        if getattr(self, "mailbox", None) is None or self.mailbox.folder != cmdDir:
+            self.mailbox = PandoraMailbox.Mailbox(
+                cmdDir,
+                "handlerOut",
+                socket.gethostname(),
+                PandoraMailbox.MailboxCounter(
+                    os.path.join(self.sourceDir, "MailboxCounters.json")
+                ),
+            )
 
         try:
-            with open(cmdFile, "w") as cFile:
-                cFile.write(str(cmd))
+            self.mailbox.send(cmds)
         except Exception as e:
-            if e.errno == 13:
-                self.core.popup("Permission denied to write to file:\n\n%s" % cmdFile)
+            self.mailbox.clear()
+            if getattr(e, "errno", None) == 13:
+                self.core.popup(
+                    "Permission denied to write to folder:\n\n%s" % cmdDir
+                )
             else:
                 raise
 
@@ -2105,15 +2193,37 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         if not os.path.exists(warnDir):
             return ""
 
-        for i in os.listdir(warnDir):
-            if i.startswith("Coordinator_Warnings_") and i.endswith(".json"):
-                warningsPath = os.path.join(warnDir, i)
-                break
-        else:
+        warnFiles = [
+            x
+            for x in os.listdir(warnDir)
+            if x.startswith("Coordinator_Warnings_")
+            and x.endswith((".jsonl", ".json"))
+        ]
+        if not warnFiles:
             return ""
 
+        # prefer the warnings journal over the config of older coordinator versions
+        warnFiles = sorted(warnFiles, key=lambda x: not x.endswith(".jsonl"))
+        warningsPath = os.path.join(warnDir, warnFiles[0])
         return warningsPath
 
+    @err_decorator
+    def getSlaveWarnPath(self, slaveLogPath):
+        warningsPath = (
+            slaveLogPath.replace("slaveLog_", "slaveWarnings_")[:-3] + "jsonl"
+        )
+        if not os.path.exists(warningsPath) and os.path.exists(warningsPath[:-1]):
+            warningsPath = warningsPath[:-1]
+
+        return warningsPath
+
+    # returns the newest warnings of a warnings journal or of an old warnings config
+    def getWarnings(self, warningsPath, limit=None):
+        if warningsPath.endswith(".jsonl"):
+            return PandoraWarnings.WarningsJournal(warningsPath).getWarnings(limit=limit)
+        else:
+            return PandoraWarnings.readLegacyWarnings(warningsPath)[:limit]
+
     @err_decorator
     def colorLogLine(self, textLine, level=0):
         if (
@@ -2522,11 +2632,8 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
             if pItem is None:
                 return
 
-            warningsPath = (
-                self.tw_slaves.item(self.tw_slaves.currentRow(), 7)
-                .text()
-                .replace("slaveLog_", "slaveWarnings_")[:-3]
-                + "json"
+            warningsPath = self.getSlaveWarnPath(
+                self.tw_slaves.item(self.tw_slaves.currentRow(), 7).text()
             )
             if not os.path.exists(warningsPath):
                 return
@@ -2540,12 +2647,11 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
 
             text = self.tw_coordWarnings.item(row, 1).text()
 
-        warnNum = "warning" + str(row)
-        warnData = self.getConfig(configPath=warningsPath, getConf=True)
         warnVal = []
-        for i in warnData["warnings"]:
-            if str(warnData["warnings"][i][0]) == str(text):
-                warnVal = warnData["warnings"][i]
+        for i in self.getWarnings(warningsPath):
+            if str(i[0]) == str(text):
+                warnVal = i
+                break
 
         if warnVal == []:
             return
@@ -2571,6 +2677,16 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         if result == 0:
             self.writeCmd(["deleteWarning", warnType, curSlave, warnVal[0], warnVal[1]])
 
+            if warningsPath.endswith(".jsonl"):
+                journal = PandoraWarnings.WarningsJournal(warningsPath)
+                journal.delete(warnVal[0], warnVal[1])
+                if warnType == "Slave":
+                    self.updateSlaveWarnings()
+                elif warnType == "Coordinator":
+                    self.updateCoordWarnings()
+
+                return
+
             warns = self.getConfig("warnings", configPath=warningsPath, getItems=True)
 
             warnings = []
@@ -2608,11 +2724,8 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
             if pItem is None:
                 return
 
-            warningsPath = (
-                self.tw_slaves.item(self.tw_slaves.currentRow(), 7)
-                .text()
-                .replace("slaveLog_", "slaveWarnings_")[:-3]
-                + "json"
+            warningsPath = self.getSlaveWarnPath(
+                self.tw_slaves.item(self.tw_slaves.currentRow(), 7).text()
             )
             if not os.path.exists(warningsPath):
                 return
@@ -2640,9 +2753,11 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         if result == 0:
             self.writeCmd(["clearWarnings", warnType, curSlave])
 
-            warningConfig = {"warnings": {}}
-
-            self.modifyConfig(configPath=warningsPath, confData=warningConfig)
+            if warningsPath.endswith(".jsonl"):
+                PandoraWarnings.WarningsJournal(warningsPath).clear()
+            else:
+                warningConfig = {"warnings": {}}
+                self.modifyConfig(configPath=warningsPath, confData=warningConfig)
 
             if warnType == "Slave":
                 self.updateSlaveWarnings()
@@ -2659,11 +2774,8 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
             if pItem is None:
                 return
 
-            warningsPath = (
-                self.tw_slaves.item(self.tw_slaves.currentRow(), 7)
-                .text()
-                .replace("slaveLog_", "slaveWarnings_")[:-3]
-                + "json"
+            warningsPath = self.getSlaveWarnPath(
+                self.tw_slaves.item(self.tw_slaves.currentRow(), 7).text()
             )
             if not os.path.exists(warningsPath):
                 return
@@ -2674,20 +2786,21 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                 return
 
         text = item.text()
-        warnNum = "warning" + str(item.row())
-        warnData = self.getConfig(configPath=warningsPath, getConf=True)
+        try:
+            warnData = self.getWarnings(warningsPath)
+        except Exception:
+            QMessageBox.warning(self, "Warning", "Corrupt warning file")
+            return
+
         warnVal = []
-        for i in warnData["warnings"]:
-            if str(warnData["warnings"][i][0]) == str(text):
-                warnVal = warnData["warnings"][i]
+        for i in warnData:
+            if str(i[0]) == str(text):
+                warnVal = i
+                break
 
         if warnVal == []:
             return
 
-        if warnData is None:
-            QMessageBox.warning(self, "Warning", "Corrupt warning file")
-            return
-
         message = "%s\n\n%s\n" % (
             time.strftime("%d.%m.%y %X", time.localtime(warnVal[1])),
             warnVal[0],
@@ -2740,18 +2853,12 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
             if jobName not in selJobs:
                 selJobs.append(jobName)
 
+        cmds = []
         for curJobName in selJobs:
-            jobConf = os.path.join(self.logDir, "Jobs", "%s.json" % curJobName)
-
-            jCode = self.getConfig("information", "jobcode", configPath=jobConf)
-
-            if jCode is not None:
-                jobCode = jCode
-            else:
-                jobCode = curJobName
-
-            self.writeCmd(["collectJob", jobCode])
+            jobCode = self.getJobCode(curJobName)
+            cmds.append(["collectJob", jobCode])
 
+        self.writeCmds(cmds)
         QMessageBox.information(self, "CollectOutput", "Collect request was sent.")
 
     @err_decorator
@@ -2769,20 +2876,18 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
         result = delMsg.exec_()
 
         if result == 0:
+            cmds = []
             for curJobName in selJobs:
                 jobConf = os.path.join(self.logDir, "Jobs", "%s.json" % curJobName)
 
-                jCode = self.getConfig("information", "jobcode", configPath=jobConf)
-
-                if jCode is not None:
-                    jobCode = jCode
-                else:
-                    jobCode = curJobName
+                jobCode = self.getJobCode(curJobName)
 
-                self.writeCmd(["deleteJob", jobCode])
+                cmds.append(["deleteJob", jobCode])
 
-                self.modifyConfig(configPath=jobConf, clear=True)
+                if os.path.exists(jobConf):
+                    self.modifyConfig(configPath=jobConf, clear=True)
 
+            self.writeCmds(cmds)
             self.updateJobs()
 
     @err_decorator
@@ -2795,33 +2900,27 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                 if jobName not in selJobNames:
                     selJobNames.append(jobName)
                     jobConf = os.path.join(self.logDir, "Jobs", "%s.json" % jobName)
-                    jobTasks = [
-                        int(x[4:])
-                        for x in self.getConfig(
-                            "jobtasks", getOptions=True, configPath=jobConf
-                        )
-                    ]
+                    jobTasks = self.getJobTaskNums(jobName, jobConf)
                     taskItems.append([jobName, jobTasks, i.row()])
         else:
             taskItems = [
                 [self.tw_jobs.item(job, 0).text(), tasks, self.tw_jobs.currentRow()]
             ]
 
+        cmds = []
         for jobName, tasks, jobRow in taskItems:
             jobConf = os.path.join(self.logDir, "Jobs", "%s.json" % jobName)
 
-            jCode = self.getConfig("information", "jobcode", configPath=jobConf)
-
-            if jCode is not None:
-                jobCode = jCode
-            else:
-                jobCode = jobName
+            jobCode = self.getJobCode(jobName)
 
             cData = []
 
             for i in tasks:
-                self.writeCmd(["restartTask", jobCode, i])
+                # the frames let the coordinator ignore the command, when the tasks of the
+                # job were split again since the job config was fetched
                 taskData = self.getConfig("jobtasks", "task%04d" % i, configPath=jobConf)
+                frames = self.getTaskFrames(taskData)
+                cmds.append(["restartTask", jobCode, "task%04d" % i, frames])
                 if taskData is not None:
                     taskData[2] = "ready"
                     taskData[3] = "unassigned"
@@ -2830,11 +2929,22 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                     taskData[6] = ""
                     cData.append(["jobtasks", "task%04d" % i, taskData])
 
-            self.modifyConfig(configPath=jobConf, data=cData)
+            if cData:
+                self.modifyConfig(configPath=jobConf, data=cData)
+
             self.updateJobData(jobRow)
 
+        self.writeCmds(cmds)
         self.updateTaskList()
 
+    # returns the frame range of a task or None, if the job config wasn't fetched yet
+    @err_decorator
+    def getTaskFrames(self, taskData):
+        if type(taskData) == list and len(taskData) > 1:
+            return [taskData[0], taskData[1]]
+
+        return None
+
     @err_decorator
     def disableTask(self, job=None, tasks=None, selJobs=False, enable=False):
         if selJobs:
@@ -2845,34 +2955,33 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                 if jobName not in selJobNames:
                     selJobNames.append(jobName)
                     jobConf = os.path.join(self.logDir, "Jobs", "%s.json" % jobName)
-                    jobTasks = [
-                        int(x[4:])
-                        for x in self.getConfig(
-                            "jobtasks", getOptions=True, configPath=jobConf
-                        )
-                    ]
+                    jobTasks = self.getJobTaskNums(jobName, jobConf)
                     taskItems.append([jobName, jobTasks, i.row()])
         else:
             taskItems = [
                 [self.tw_jobs.item(job, 0).text(), tasks, self.tw_jobs.currentRow()]
             ]
 
+        cmds = []
         for jobName, tasks, jobRow in taskItems:
             jobConf = os.path.join(self.logDir, "Jobs", "%s.json" % jobName)
 
-            jCode = self.getConfig("information", "jobcode", configPath=jobConf)
-
-            if jCode is not None:
-                jobCode = jCode
-            else:
-                jobCode = jobName
+            jobCode = self.getJobCode(jobName)
 
             cData = []
 
             for i in tasks:
-                self.writeCmd(["disableTask", jobCode, i, enable])
-
                 taskData = self.getConfig("jobtasks", "task%04d" % i, configPath=jobConf)
+                cmds.append(
+                    [
+                        "disableTask",
+                        jobCode,
+                        "task%04d" % i,
+                        enable,
+                        self.getTaskFrames(taskData),
+                    ]
+                )
+
                 if taskData is not None:
                     if (
                         taskData[2] in ["ready", "rendering", "assigned"] and not enable
@@ -2885,9 +2994,12 @@ class RenderHandler(QMainWindow, RenderHandler_ui.Ui_mw_RenderHandler):
                             taskData[3] = "unassigned"
                         cData.append(["jobtasks", "task%04d" % i, taskData])
 
-            self.modifyConfig(configPath=jobConf, data=cData)
+            if cData:
+                self.modifyConfig(configPath=jobConf, data=cData)
+
             self.updateJobData(jobRow)
 
+        self.writeCmds(cmds)
         self.updateTaskList()
 
     @err_decorator
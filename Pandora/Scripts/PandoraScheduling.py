@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import heapq
+import bisect
+
+
+# Keeps track of the jobs, which have tasks in the "ready" state, so that the coordinator
+# doesn't need to load all job configs to find tasks, which can be assigned.
+# The jobs are stored in a heap ordered by priority. Entries of the heap are invalidated
+# by a version number instead of being removed, so that every change costs O(log jobs).
+class SchedulingIndex(object):
+    def __init__(self):
+        self.jobs = {}
+        self.heap = []
+        self.jobOrder = 0  # jobs, which were added later, come first on equal priority
+        self.sortedJobs = None
+
+    def setJob(self, jobCode, priority, jobTasks):
+        if jobCode in self.jobs:
+            order = self.jobs[jobCode]["order"]
+        else:
+            self.jobOrder += 1
+            order = self.jobOrder
+
+        readyTasks = sorted(
+            [
+                x
+                for x in jobTasks
+                if type(jobTasks[x]) == list
+                and len(jobTasks[x]) == 7
+                and jobTasks[x][2] == "ready"
+            ]
+        )
+
+        self.jobs[jobCode] = {
+            "priority": priority,
+            "order": order,
+            "ready": readyTasks,
+            "version": 0,
+            "inHeap": False,
+        }
+        self.sortedJobs = None
+        self.pushJob(jobCode)
+
+    def removeJob(self, jobCode):
+        if jobCode in self.jobs:
+            del self.jobs[jobCode]
+            self.sortedJobs = None
+
+    def setPriority(self, jobCode, priority):
+        if jobCode not in self.jobs or self.jobs[jobCode]["priority"] == priority:
+            return
+
+        self.jobs[jobCode]["priority"] = priority
+        self.jobs[jobCode]["inHeap"] = False
+        self.sortedJobs = None
+        self.pushJob(jobCode)
+
+    def updateTask(self, jobCode, taskName, taskData):
+        if jobCode not in self.jobs:
+            return
+
+        job = self.jobs[jobCode]
+        readyTasks = job["ready"]
+        idx = bisect.bisect_left(readyTasks, taskName)
+        listed = idx < len(readyTasks) and readyTasks[idx] == taskName
+        isReady = type(taskData) == list and len(taskData) == 7 and taskData[2] == "ready"
+
+        if isReady and not listed:
+            readyTasks.insert(idx, taskName)
+            self.pushJob(jobCode)
+        elif listed and not isReady:
+            del readyTasks[idx]
+            if not readyTasks:
+                # the heap entry becomes invalid and gets skipped
+                job["inHeap"] = False
+
+    def pushJob(self, jobCode):
+        job = self.jobs[jobCode]
+        if job["inHeap"] or not job["ready"]:
+            return
+
+        job["version"] += 1
+        job["inHeap"] = True
+        heapq.heappush(
+            self.heap, (-job["priority"], -job["order"], job["version"], jobCode)
+        )
+
+        if len(self.heap) > 2 * len(self.jobs) + 16:
+            self.compact()
+
+    # removes invalid entries from the heap
+    def compact(self):
+        self.heap = [x for x in self.heap if self.isValidEntry(x)]
+        heapq.heapify(self.heap)
+
+    def isValidEntry(self, entry):
+        job = self.jobs.get(entry[3])
+        return (
+            job is not None
+            and job["inHeap"]
+            and job["version"] == entry[2]
+            and len(job["ready"]) > 0
+        )
+
+    # yields the jobs with ready tasks, highest priority first
+    def getReadyJobs(self):
+        heap = list(self.heap)
+        while heap:
+            entry = heapq.heappop(heap)
+            if self.isValidEntry(entry):
+                yield entry[3]
+
+    def getReadyTasks(self, jobCode):
+        if jobCode not in self.jobs:
+            return []
+
+        return list(self.jobs[jobCode]["ready"])
+
+    # returns all indexed jobs, highest priority first
+    def getJobs(self):
+        if self.sortedJobs is None:
+            self.sortedJobs = sorted(
+                self.jobs,
+                key=lambda x: (self.jobs[x]["priority"], self.jobs[x]["order"]),
+                reverse=True,
+            )
+
+        return list(self.sortedJobs)
+
+
+# Keeps the completion state of all jobs and the dependencies between them, so that the
+# coordinator doesn't need to read the configs of the dependencies to know if a job can
+# be rendered. The state is updated with every task change and a dependent job is
+# released as soon as the last task of its last unfinished dependency finishes.
+class DependencyIndex(object):
+    def __init__(self):
+        self.jobs = {}  # jobCode: {"name", "open": unfinished tasks, "slaves": {task: slave}}
+        self.dependencies = {}  # jobCode: jobCodes, which need to finish first
+        self.dependents = {}  # jobCode: jobCodes, which wait for this job
+
+    def setJob(self, jobCode, jobName, jobTasks, dependencies=None):
+        openTasks = set()
+        slaves = {}
+        for taskName in jobTasks:
+            taskData = jobTasks[taskName]
+            if type(taskData) == list and len(taskData) == 7 and taskData[2] == "finished":
+                slaves[taskName] = taskData[3]
+            else:
+                openTasks.add(taskName)
+
+        self.jobs[jobCode] = {"name": jobName, "open": openTasks, "slaves": slaves}
+        self.setDependencies(jobCode, dependencies or [])
+
+    # the job stays known as dependency of other jobs, which will be blocked
+    def removeJob(self, jobCode):
+        self.jobs.pop(jobCode, None)
+        self.setDependencies(jobCode, [])
+
+    def setDependencies(self, jobCode, dependencies):
+        for depCode in self.dependencies.pop(jobCode, []):
+            waiting = self.dependents.get(depCode)
+            if waiting is not None:
+                waiting.discard(jobCode)
+                if not waiting:
+                    del self.dependents[depCode]
+
+        if not dependencies:
+            return
+
+        self.dependencies[jobCode] = list(dependencies)
+        for depCode in dependencies:
+            self.dependents.setdefault(depCode, set()).add(jobCode)
+
+    # returns the jobs, which got released by this change
+    def updateTask(self, jobCode, taskName, taskData):
+        job = self.jobs.get(jobCode)
+        if job is None:
+            return []
+
+        wasFinished = self.isFinished(jobCode)
+        if type(taskData) == list and len(taskData) == 7 and taskData[2] == "finished":
+            job["open"].discard(taskName)
+            job["slaves"][taskName] = taskData[3]
+        else:
+            job["open"].add(taskName)
+            job["slaves"].pop(taskName, None)
+
+        if wasFinished or not self.isFinished(jobCode):
+            return []
+
+        return [
+            x
+            for x in sorted(self.dependents.get(jobCode, []))
+            if self.getState(x)[0] is None
+        ]
+
+    def isFinished(self, jobCode):
+        job = self.jobs.get(jobCode)
+        return job is not None and len(job["slaves"]) > 0 and not job["open"]
+
+    def getName(self, jobCode):
+        job = self.jobs.get(jobCode)
+        return job["name"] if job is not None else jobCode
+
+    # returns [blockingJob, reason, dependentSlaves]. blockingJob is None, if all
+    # dependencies are finished. dependentSlaves are the slaves, which rendered the
+    # dependencies and which can therefore access their output.
+    def getState(self, jobCode):
+        dependentSlaves = set()
+        for depCode in self.dependencies.get(jobCode, []):
+            dep = self.jobs.get(depCode)
+            if dep is None:
+                return [depCode, "missing", []]
+
+            if not dep["slaves"] and not dep["open"]:
+                return [depCode, "noTasks", []]
+
+            if dep["open"]:
+                return [depCode, "unfinished", []]
+
+            dependentSlaves.update(dep["slaves"].values())
+
+        return [None, None, sorted(dependentSlaves)]
+
+
+assignedTimeout = 15  # minutes, in which an assigned task has to start rendering
+
+
+# Keeps the assigned and rendering tasks of all jobs with their timeout deadline in a
+# heap, so that the coordinator only needs to look at tasks, which actually timed out.
+# The number of busy tasks per slave is updated with every task change as well.
+class DeadlineIndex(object):
+    def __init__(self):
+        self.jobs = {}  # jobCode: {"timeout": minutes or None, "concurrent": int}
+        self.tasks = {}  # (jobCode, taskName): {"state", "slave", "start", "version"}
+        self.heap = []
+        self.version = 0  # heap entries of changed or removed tasks become invalid
+        self.slaveTasks = {}  # slave: {(jobCode, taskName): concurrentTasks of the job}
+
+    def setJob(self, jobCode, jobTasks, timeout=None, concurrent=None):
+        self.removeJob(jobCode)
+        self.jobs[jobCode] = {"timeout": timeout, "concurrent": concurrent or 1}
+        for taskName in jobTasks:
+            self.updateTask(jobCode, taskName, jobTasks[taskName])
+
+    def removeJob(self, jobCode):
+        self.jobs.pop(jobCode, None)
+        for key in [x for x in self.tasks if x[0] == jobCode]:
+            self.removeTask(key)
+
+    # changes the timeout or the concurrent tasks of a job and updates its busy tasks
+    def setJobSettings(self, jobCode, timeout=None, concurrent=None):
+        job = self.jobs.get(jobCode)
+        if job is None:
+            return
+
+        if timeout is not None:
+            job["timeout"] = timeout
+
+        if concurrent is not None:
+            job["concurrent"] = concurrent
+
+        for key in [x for x in self.tasks if x[0] == jobCode]:
+            task = self.tasks[key]
+            self.addTask(key, task["state"], task["slave"], task["start"])
+
+    def updateTask(self, jobCode, taskName, taskData):
+        if jobCode not in self.jobs:
+            return
+
+        key = (jobCode, taskName)
+        if (
+            type(taskData) != list
+            or len(taskData) != 7
+            or taskData[2] not in ["assigned", "rendering"]
+        ):
+            self.removeTask(key)
+            return
+
+        task = self.tasks.get(key)
+        if (
+            task is not None
+            and task["state"] == taskData[2]
+            and task["slave"] == taskData[3]
+            and task["start"] == taskData[5]
+        ):
+            return
+
+        self.addTask(key, taskData[2], taskData[3], taskData[5])
+
+    def addTask(self, key, state, slave, start):
+        self.removeTask(key)
+
+        deadline = None
+        try:
+            startTime = float(start)
+        except:
+            pass
+        else:
+            if state == "assigned":
+                deadline = startTime + assignedTimeout * 60
+            elif self.jobs[key[0]]["timeout"] is not None:
+                try:
+                    deadline = startTime + float(self.jobs[key[0]]["timeout"]) * 60
+                except:
+                    pass
+
+        self.version += 1
+        self.tasks[key] = {
+            "state": state,
+            "slave": slave,
+            "start": start,
+            "version": self.version,
+        }
+        self.slaveTasks.setdefault(slave, {})[key] = self.jobs[key[0]]["concurrent"]
+
+        if deadline is not None:
+            heapq.heappush(self.heap, (deadline, self.version, key))
+            if len(self.heap) > 2 * len(self.tasks) + 16:
+                self.compact()
+
+    # the heap entry of the task becomes invalid and gets skipped
+    def removeTask(self, key):
+        task = self.tasks.pop(key, None)
+        if task is None:
+            return
+
+        slaveTasks = self.slaveTasks.get(task["slave"])
+        if slaveTasks is not None:
+            slaveTasks.pop(key, None)
+            if not slaveTasks:
+                del self.slaveTasks[task["slave"]]
+
+    def compact(self):
+        self.heap = [x for x in self.heap if self.isValidEntry(x)]
+        heapq.heapify(self.heap)
+
+    def isValidEntry(self, entry):
+        task = self.tasks.get(entry[2])
+        return task is not None and task["version"] == entry[1]
+
+    # returns [jobCode, taskName, state, slave, startTime] of all tasks, which passed
+    # their deadline. The tasks stay busy until they get updated
+    def getExpired(self, now):
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            entry = heapq.heappop(self.heap)
+            if not self.isValidEntry(entry):
+                continue
+
+            task = self.tasks[entry[2]]
+            expired.append(
+                [entry[2][0], entry[2][1], task["state"], task["slave"], task["start"]]
+            )
+
+        return expired
+
+    # returns the concurrent task settings of the busy tasks by slave
+    def getSlaveAssignments(self):
+        slaveAssignments = {}
+        for slave in self.slaveTasks:
+            slaveTasks = self.slaveTasks[slave]
+            slaveAssignments[slave] = {
+                "concurrent": [slaveTasks[x] for x in sorted(slaveTasks)]
+            }
+
+        return slaveAssignments
+
+
+maxTaskCount = 10000  # task names have four digits, more tasks wouldn't sort correctly
+rechunkTolerance = 0.5  # relative difference of the task size, which is ignored
+
+
+def isTaskData(taskData):
+    return type(taskData) == list and len(taskData) == 7
+
+
+# returns the average render time of a frame in seconds, measured on the finished tasks
+def getFrameTime(jobTasks):
+    duration = 0.0
+    frames = 0
+    for taskData in jobTasks.values():
+        if not isTaskData(taskData) or taskData[2] != "finished":
+            continue
+
+        try:
+            taskTime = float(taskData[6]) - float(taskData[5])
+        except (TypeError, ValueError):
+            continue
+
+        if taskTime <= 0:
+            continue
+
+        duration += taskTime
+        frames += taskData[1] - taskData[0] + 1
+
+    if frames <= 0:
+        return None
+
+    return duration / frames
+
+
+# splits the frames of the ready tasks at the end of a job into new tasks, which render
+# about taskDuration seconds. Only ready tasks are renamed, so the slaves and the output
+# manifests can still refer to the other tasks and the task names stay consecutive for
+# the RenderHandler. Returns [jobTasks, framesPerTask] or None, if nothing changes.
+def rechunkTasks(jobTasks, taskDuration):
+    taskNames = sorted(jobTasks)
+    if taskNames != ["task%04d" % x for x in range(len(taskNames))]:
+        return None
+
+    if not all(isTaskData(jobTasks[x]) for x in taskNames):
+        return None
+
+    frameTime = getFrameTime(jobTasks)
+    if not frameTime:
+        return None
+
+    firstReady = len(taskNames)
+    while firstReady > 0 and jobTasks[taskNames[firstReady - 1]][2] == "ready":
+        firstReady -= 1
+
+    readyNames = taskNames[firstReady:]
+    if not readyNames:
+        return None
+
+    framesPerTask = max(1, int(round(taskDuration / frameTime)))
+    curFrames = max([jobTasks[x][1] - jobTasks[x][0] + 1 for x in readyNames])
+    if abs(framesPerTask - curFrames) <= curFrames * rechunkTolerance:
+        return None
+
+    # the frame ranges of the tasks don't need to be consecutive
+    frameRanges = []
+    for taskName in readyNames:
+        start, end = jobTasks[taskName][:2]
+        if frameRanges and frameRanges[-1][1] + 1 == start:
+            frameRanges[-1][1] = end
+        else:
+            frameRanges.append([start, end])
+
+    newTasks = []
+    for start, end in frameRanges:
+        for taskStart in range(start, end + 1, framesPerTask):
+            taskEnd = min(taskStart + framesPerTask - 1, end)
+            newTasks.append([taskStart, taskEnd, "ready", "unassigned", "", "", ""])
+
+    if firstReady + len(newTasks) > maxTaskCount:
+        return None
+
+    rechunked = {}
+    for taskName in taskNames[:firstReady]:
+        rechunked[taskName] = jobTasks[taskName]
+
+    for idx, taskData in enumerate(newTasks):
+        rechunked["task%04d" % (firstReady + idx)] = taskData
+
+    return [rechunked, framesPerTask]
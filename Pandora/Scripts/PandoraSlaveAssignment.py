@@ -135,6 +135,7 @@ class PandoraSlaveAssignment(QDialog, PandoraSlaveAssignment_ui.Ui_dlg_SlaveAssi
 
         for i in slaveData["slaveNames"]:
             sItem = QListWidgetItem(i)
+            sItem.setToolTip(", ".join(slaveData["groupsBySlave"].get(i, [])))
             self.lw_slaves.addItem(sItem)
 
         for i in slaveData["slaveGroups"]:
@@ -0,0 +1,2164 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import sys, os, shutil, time, io, platform, multiprocessing, threading, socket, subprocess, traceback
+import argparse
+from functools import wraps
+
+pandoraRoot = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+scriptPath = os.path.abspath(os.path.dirname(__file__))
+if scriptPath not in sys.path:
+    sys.path.append(scriptPath)
+
+if sys.version[0] == "3":
+    pyLibs = "Python37"
+    pVersion = 3
+else:
+    pyLibs = "Python27"
+    pVersion = 2
+
+pyLibPath = os.path.join(pandoraRoot, "PythonLibs", pyLibs)
+cpLibs = os.path.join(pandoraRoot, "PythonLibs", "CrossPlatform")
+
+if cpLibs not in sys.path:
+    sys.path.append(cpLibs)
+
+if pyLibPath not in sys.path:
+    sys.path.append(pyLibPath)
+
+import psutil
+
+import PandoraConfigIO
+import PandoraWarnings
+import PandoraManifest
+import PandoraTransfer
+import PandoraMailbox
+import PandoraProgress
+
+try:
+    import PandoraTransport
+except (ImportError, SyntaxError):
+    PandoraTransport = None  # the direct connection to the coordinator requires python 3
+
+
+# minimal replacement for PandoraCore, which doesn't need Qt. It is used, when the slave
+# runs as a daemon without the tray icon.
+class HeadlessCore(object):
+    def __init__(self, configPath=None):
+        self.version = "v1.1.0.11"
+        self.pandoraRoot = pandoraRoot
+        self.pluginPathApp = os.path.join(self.pandoraRoot, "Plugins", "Apps")
+        self.plugins = {}
+
+        if configPath is None:
+            configPath = os.path.join(
+                os.path.expanduser("~"), "Documents", "Pandora", "Pandora.json"
+            )
+
+        self.configPath = configPath
+
+    def getConfig(
+        self, cat=None, param=None, data=None, configPath=None, getConf=False, silent=False
+    ):
+        if configPath is None:
+            configPath = self.configPath
+
+        if not os.path.exists(os.path.dirname(configPath)):
+            return
+
+        try:
+            userConfig = PandoraConfigIO.readConfig(configPath) or {}
+        except:
+            if silent:
+                return "Error"
+
+            userConfig = {}
+
+        if getConf:
+            return userConfig
+
+        if data is None:
+            rData = {"val": [cat, param]}
+        else:
+            rData = data
+
+        returnData = {}
+        for i in rData:
+            cat = rData[i][0]
+            param = rData[i][1]
+
+            if cat in userConfig and param in userConfig[cat]:
+                returnData[i] = userConfig[cat][param]
+            else:
+                returnData[i] = None
+
+        if data is None:
+            return returnData["val"]
+        else:
+            return returnData
+
+    def setConfig(
+        self,
+        cat=None,
+        param=None,
+        val=None,
+        data=None,
+        configPath=None,
+        delete=False,
+        confData=None,
+        silent=False,
+    ):
+        if configPath is None:
+            configPath = self.configPath
+
+        if not os.path.exists(os.path.dirname(configPath)):
+            try:
+                os.makedirs(os.path.dirname(configPath))
+            except Exception as e:
+                return "Error - The folder couldn't be created: %s - %s" % (
+                    os.path.dirname(configPath),
+                    e,
+                )
+
+        if confData is None:
+            try:
+                userConfig = PandoraConfigIO.readConfig(configPath) or {}
+            except:
+                return "Error - Cannot read the following file: %s" % configPath
+
+            if data is None:
+                data = [[cat, param, val]]
+
+            for i in data:
+                if i[0] not in userConfig:
+                    userConfig[i[0]] = {}
+
+                if delete:
+                    userConfig[i[0]].pop(i[1], None)
+                    continue
+
+                userConfig[i[0]][i[1]] = i[2]
+        else:
+            userConfig = confData
+
+        try:
+            PandoraConfigIO.writeConfig(configPath, userConfig)
+        except (IOError, UnicodeEncodeError) as e:
+            return "Error - " + str(e)
+
+    # the DCC plugins are only loaded, when a task for them is started
+    def getPlugin(self, pluginName):
+        if pluginName in self.plugins:
+            return self.plugins[pluginName]
+
+        initPath = os.path.join(
+            self.pluginPathApp,
+            pluginName,
+            "Scripts",
+            "Pandora_%s_init_unloaded.py" % pluginName,
+        )
+        if not os.path.exists(initPath):
+            return None
+
+        if os.path.dirname(initPath) not in sys.path:
+            sys.path.append(os.path.dirname(initPath))
+
+        plugin = getattr(
+            __import__("Pandora_%s_init_unloaded" % pluginName),
+            "Pandora_%s_unloaded" % pluginName,
+        )(self)
+        if platform.system() not in plugin.platforms:
+            plugin = None
+
+        self.plugins[pluginName] = plugin
+        return plugin
+
+
+# decision logic of the RenderSlave. It doesn't depend on Qt, so it can run as a daemon on
+# render nodes. A front end like the tray icon can be passed, which is asked, when the
+# logic needs to interact with the user.
+class SlaveCore(object):
+    def __init__(self, core, frontend=None):
+        self.core = core
+        self.frontend = frontend
+        self.slaveLogicVersion = "v1.1.0.6"
+
+        # define some initial variables
+        self.slaveState = "idle"  # slave render status
+        self.debugMode = (
+            False
+        )  # if slave is in debug mode, more information will be printed to the log file
+        self.updateTime = (
+            10
+        )  # interval in seconds after which the slave checks for new render jobs or commands
+        self.useRestPeriod = (
+            False
+        )  # restperiod defines a time in which the slave does not render
+        self.startRP = 9  # start time of rest period
+        self.endRP = 18  # end time of rest period
+        self.maxCPU = (
+            30
+        )  # the CPU usage has to be lower than this value before the rendering starts. This prevents the slave from starting a render, when the PC is currently rendering locally.
+        self.prerenderwaittime = 0
+        self.maxTasks = 2  # maximum concurrent tasks rendering at the same time
+        self.warningsLimit = 500  # maximum number of warnings, which are kept in the warnings journal
+        self.transferThreads = 4  # number of output files, which are uploaded at the same time
+        self.progressInterval = 10  # minimum seconds between progress updates via the mailbox
+
+        self.cursorCheckPos = None  # cursor position  to check if the PC is currently used
+        self.pauseEnd = 0
+
+        self.userAsked = (
+            False
+        )  # defines wether the user was already asked if it is ok to start rendering
+        self.interrupted = False  # holds wether the current rendering was interrupted
+        self.assignedTasks = []  # stores new job assigments from the coordinator
+        self.curTasks = []  # list of currently rendering tasks
+        self.waitingForFiles = False
+        self.nextCheck = 0  # time of the next checkAssignments call
+        self.checking = False
+        self.running = False
+
+        cData = {}
+        cData["localMode"] = ["globals", "localMode"]
+        cData["repositoryPath"] = ["globals", "repositoryPath"]
+        cData["rootPath"] = ["globals", "rootPath"]
+        cData["slavePath"] = ["slave", "slavePath"]
+        cData = self.core.getConfig(data=cData)
+
+        if cData["localMode"] is not None:
+            self.localMode = cData["localMode"]
+        else:
+            self.localMode = True
+
+        if cData["repositoryPath"] is None:
+            self.showWarning("Pandora repository path is not defined.")
+            sys.exit()
+            return
+
+        repoDir = os.path.join(cData["repositoryPath"], "Slave")
+        if not os.path.exists(repoDir):
+            try:
+                os.makedirs(repoDir)
+            except:
+                pass
+
+        if not os.path.exists(repoDir):
+            try:
+                os.makedirs(repoDir)
+            except:
+                self.showWarning("Pandora repository path doesn't exist.\n\n%s" % repoDir)
+                sys.exit()
+                return
+
+        self.localSlavePath = repoDir
+        self.mailbox = None
+        self.transport = None  # direct connection to the coordinator
+        self.transportAddress = None
+
+        if self.localMode:
+            if cData["rootPath"] is None:
+                self.showWarning("Pandora root path is not defined.")
+                sys.exit()
+                return
+
+            if not os.path.exists(cData["rootPath"]):
+                try:
+                    os.makedirs(cData["rootPath"])
+                except:
+                    self.showWarning("Pandora root path doesn't exist.")
+                    sys.exit()
+                    return
+
+            self.slavePath = os.path.join(
+                cData["rootPath"], "Slaves", "S_" + socket.gethostname()
+            )
+        else:
+            if cData["slavePath"] is None:
+                self.showWarning("No slave root folder specified in the Pandora config")
+                sys.exit()
+                return
+            else:
+                self.slavePath = cData["slavePath"]
+
+        self.slaveConf = os.path.join(
+            self.slavePath, "slaveSettings_%s.json" % socket.gethostname()
+        )  # path for the file with the RenderSlave settings
+        self.slaveLog = os.path.join(
+            self.slavePath, "slaveLog_%s.txt" % socket.gethostname()
+        )  # path for the RenderSlave Log file
+        self.slaveWarningsConf = os.path.join(
+            self.slavePath, "slaveWarnings_%s.jsonl" % socket.gethostname()
+        )
+        self.slaveComPath = os.path.join(
+            self.slavePath, "Communication"
+        )  # path where the in- and out-commands are stored
+
+        # create the communication folder if it doesn't exist already
+        if not os.path.exists(self.slaveComPath):
+            try:
+                os.makedirs(self.slaveComPath)
+            except:
+                self.writeLog(
+                    "could not create Communication folder for %s" % socket.gethostname(), 2
+                )
+
+        self.warningsJournal = PandoraWarnings.WarningsJournal(
+            self.slaveWarningsConf,
+            limit=self.warningsLimit,
+            legacyPath=self.slaveWarningsConf[:-1],
+        )
+
+        # save the default slave settings to the settings file if they don't exist already
+        self.createSettings(complement=True)
+        self.setSlaveInfo()
+
+        slaveEnabled = self.getConfSetting("enabled")
+        if slaveEnabled is None:
+            self.getConfSetting("enabled", setval=True, value=True)
+            slaveEnabled = True
+        elif slaveEnabled and self.slaveState == "disabled":
+            self.setState("idle")
+        elif not slaveEnabled:
+            self.setState("disabled")
+
+    def err_decorator(func):
+        @wraps(func)
+        def func_wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                erStr = "%s ERROR - Pandora RenderSlave %s:\n%s\n\n%s\n%s - %s" % (
+                    time.strftime("%d.%m.%y %X"),
+                    args[0].slaveLogicVersion,
+                    "".join(traceback.format_stack()),
+                    traceback.format_exc(),
+                    args,
+                    kwargs,
+                )
+                args[0].writeLog(erStr, 3)
+
+        return func_wrapper
+
+    # displays a warning in the front end or prints it, when the slave runs as a daemon
+    def showWarning(self, text):
+        if self.frontend is not None:
+            self.frontend.showWarning(text)
+        else:
+            sys.stderr.write("Pandora RenderSlave: %s\n" % text)
+
+    # calls a method of the front end. Does nothing, when the slave runs as a daemon.
+    def callFrontend(self, name, *args):
+        if self.frontend is not None:
+            return getattr(self.frontend, name)(*args)
+
+    # runs the logic until the slave exits. Used, when there is no front end with its own
+    # event loop.
+    def run(self):
+        self.running = True
+        self.writeLog("Slave started - %s" % self.slaveLogicVersion, 1)
+
+        while self.running:
+            self.update()
+
+            # commands from the direct connection wake up the loop immediately
+            if self.transport is not None:
+                self.transport.waitIncoming(1)
+            else:
+                time.sleep(1)
+
+    # checks the assignments, when the next check is due or a command arrived on the
+    # direct connection
+    def update(self):
+        if self.checking:
+            return
+
+        self.sendProgress()
+
+        if time.time() < self.nextCheck and not (
+            self.transport is not None and self.transport.incomingEvent.is_set()
+        ):
+            return
+
+        self.checking = True
+        # the next check is scheduled before, so the loop continues after an error
+        self.scheduleCheck(self.updateTime)
+        try:
+            self.checkAssignments()
+        finally:
+            self.checking = False
+
+        for path, message in PandoraConfigIO.getWriteErrors():
+            self.writeLog("ERROR - could not write config %s - %s" % (path, message), 3)
+
+    # defines the number of seconds until the next checkAssignments call
+    def scheduleCheck(self, seconds):
+        self.nextCheck = time.time() + seconds
+
+    # forces the slave to immediately check for renderjobs/commands
+    @err_decorator
+    def activateSlave(self):
+        self.setState("idle")
+        self.scheduleCheck(0)
+
+    # enables/disables the slave
+    @err_decorator
+    def setSlave(self, enabled):
+        if enabled:
+            self.setState("idle")
+            self.getConfSetting("enabled", setval=True, value=True)
+        else:
+            self.stopRender()
+            self.getConfSetting("enabled", setval=True, value=False)
+            self.setState("disabled")
+            self.writeLog("slave disabled", 1)
+
+        self.scheduleCheck(0)
+
+    # pauses the slave
+    @err_decorator
+    def pauseSlave(self, duration, stop=True):
+        if stop:
+            self.stopRender()
+
+        self.setState("paused")
+
+        self.pauseEnd = time.time() + duration * 60
+
+        self.writeLog("slave paused for %s minutes" % duration, 1)
+
+    # restarts or closes the slave
+    @err_decorator
+    def restartLogic(self, restart=True):
+        self.stopRender()
+
+        if restart:
+            self.setState("restarting")
+            self.writeLog("slave restarting", 1)
+        else:
+            self.setState("shut down")
+
+        self.running = False
+        if self.frontend is not None:
+            self.frontend.quit(restart)
+        elif restart:
+            cmd = [sys.executable, os.path.abspath(__file__)] + sys.argv[1:]
+            if "forcestart" not in cmd:
+                cmd.append("forcestart")
+
+            self.writeLog(cmd)
+            subprocess.Popen(cmd)
+
+        sys.exit()
+
+    # closes the slave
+    @err_decorator
+    def exitLogic(self):
+        self.writeLog("exit slave", 1)
+        self.restartLogic(restart=False)
+
+    # writes text to a log file. A higher level means more importance.
+    @err_decorator
+    def writeLog(self, text, level=0, writeWarning=True):
+        try:
+            if not os.path.exists(self.slaveLog):
+                try:
+                    if not os.path.exists(os.path.dirname(self.slaveLog)):
+                        os.makedirs(os.path.dirname(self.slaveLog))
+                    open(self.slaveLog, "a").close()
+                except:
+                    return None
+
+            if level == 0 and not self.debugMode:
+                return
+
+            elif level > 1 and writeWarning:
+                self.writeWarning(text, level)
+
+            #   print text
+
+            with io.open(self.slaveLog, "a", encoding="utf-16") as log:
+                log.write(
+                    "[%s] %s : %s\n" % (level, time.strftime("%d.%m.%y %X"), text)
+                )
+        except:
+            pass
+
+    # writes warning to a file. A higher level means more importance.
+    def writeWarning(self, text, level=1):
+        if not hasattr(self, "warningsJournal"):
+            return
+
+        try:
+            self.warningsJournal.add(text, level)
+        except Exception as e:
+            self.writeLog("writeWarning %s" % e, 2, writeWarning=False)
+
+    # writes slave infos to file
+    @err_decorator
+    def setSlaveInfo(self):
+        self.getConfSetting(
+            "status", section="slaveinfo", setval=True, value=self.slaveState
+        )
+
+        self.getConfSetting("curtasks", section="slaveinfo", setval=True, value=self.getCurTasksData())
+        self.getConfSetting(
+            "cpucount", section="slaveinfo", setval=True, value=multiprocessing.cpu_count()
+        )
+        self.getConfSetting(
+            "slaveScriptVersion",
+            section="slaveinfo",
+            setval=True,
+            value=self.slaveLogicVersion,
+        )
+
+        # psutil doesn't need to start a wmic process and works on every platform
+        totalMem = psutil.virtual_memory().total
+        self.getConfSetting(
+            "ram",
+            section="slaveinfo",
+            setval=True,
+            value=int(round(totalMem / float(1024 ** 3))),
+        )
+
+    # reads a slave setting from file and returns the value
+    @err_decorator
+    def getConfSetting(
+        self, setting, section="settings", stype="string", setval=False, value=""
+    ):
+        if not os.path.exists(self.slaveConf):
+            self.writeLog("create config", 1)
+            self.createSettings()
+
+        if setval:
+            self.setConfig(section, setting, value, configPath=self.slaveConf)
+
+            if setting == "debugMode":
+                self.debugMode = value
+
+            if setting == "cursorCheck" and value == False:
+                self.cursorCheckPos = None
+                if self.slaveState == "userActive":
+                    self.setState("idle")
+        else:
+            val = self.core.getConfig(
+                section, setting, configPath=self.slaveConf, silent=True
+            )
+            if val == "Error":
+                self.writeLog(
+                    "Failed to read config setting: %s %s" % (setting, section), 2
+                )
+                return
+
+            return val
+
+    @err_decorator
+    def setConfig(
+        self,
+        cat=None,
+        param=None,
+        val=None,
+        data=None,
+        configPath=None,
+        delete=False,
+        confData=None,
+        silent=True,
+    ):
+        result = self.core.setConfig(
+            cat=cat,
+            param=param,
+            val=val,
+            data=data,
+            configPath=configPath,
+            delete=delete,
+            confData=confData,
+            silent=silent,
+        )
+
+        # configs, which are locked by a sync client, are retried by the core in the
+        # background
+        if type(result) == str and result.startswith("Error"):
+            self.writeLog(result, 2)
+
+    # shutdown this PC
+    @err_decorator
+    def shutdownPC(self, restart):
+        self.stopRender()
+        self.writeLog("restarting PC", 1)
+        self.setState("restarting")
+
+        cmd = "shutdown -t 0 -f"
+
+        if restart:
+            cmd = "shutdown -t 0 -r -f"
+
+        os.system(cmd)
+
+    # clears the log file
+    @err_decorator
+    def clearLog(self):
+        try:
+            open(self.slaveLog, "w").close()
+            self.writeLog("SlaveLog cleared", 1)
+        except:
+            self.writeLog("ERROR - Could not clear log: %s" % self.slaveLog, 3)
+
+    # starts teamviewer portable
+    @err_decorator
+    def startTeamviewer(self):
+        self.writeLog("starting Teamviewer", 1)
+        tvPath = os.path.join(pandoraRoot, "Tools", "TeamViewerPortable", "TeamViewer.exe")
+        if not os.path.exists(tvPath):
+            self.writeLog("WARNING - teamviewer.exe not found.", 2)
+            return
+
+        subprocess.Popen(tvPath)
+        time.sleep(5)
+
+        self.writeScreenshot()
+
+    # makes a screenshot and save it. Usefull to get the teamviewer password
+    @err_decorator
+    def writeScreenshot(self):
+        # PIL is only imported here, because the daemon usually runs without a display
+        from PIL import ImageGrab
+
+        filename = "ScreenShot_%s.jpg" % socket.gethostname()
+        img = ImageGrab.grab()
+        saveas = os.path.join(self.slavePath, filename)
+        img.save(saveas)
+
+    # writes out a command to the coordinator
+    @err_decorator
+    def communicateOut(self, cmd):
+        if self.transport is not None and self.transport.send(cmd) is not None:
+            self.writeLog("communicate out (direct): %s" % cmd, 0)
+            return
+
+        self.getMailbox().send([cmd])
+
+        self.writeLog("communicate out: %s" % cmd, 0)
+
+    def getMailbox(self):
+        if self.mailbox is None:
+            self.mailbox = PandoraMailbox.Mailbox(
+                self.slaveComPath,
+                "slaveOut",
+                socket.gethostname(),
+                PandoraMailbox.MailboxCounter(
+                    os.path.join(self.localSlavePath, "MailboxCounters.json")
+                ),
+            )
+
+        return self.mailbox
+
+    # connects to the coordinator, when it publishes a direct connection in the Slaves
+    # folder
+    @err_decorator
+    def updateTransport(self):
+        address = None
+        if PandoraTransport is not None and self.getConfSetting("useTransport") != False:
+            info = PandoraTransport.readTransportInfo(
+                os.path.join(os.path.dirname(self.slavePath), PandoraTransport.transportName)
+            )
+            if info is not None:
+                address = [info["host"], info["port"], info.get("token")]
+
+        if address == self.transportAddress:
+            return
+
+        if self.transport is not None:
+            self.transport.stop()
+            self.transport = None
+            self.writeLog("disconnected from coordinator", 1)
+
+        self.transportAddress = address
+        if address is None:
+            return
+
+        self.transport = PandoraTransport.TransportClient(
+            socket.gethostname(), address[0], address[1], address[2]
+        )
+        self.transport.start()
+        self.writeLog("connecting to coordinator at %s:%s" % (address[0], address[1]), 1)
+
+    # removes a file
+    @err_decorator
+    def remove(self, filepath):
+        try:
+            os.remove(filepath)
+        except:
+            self.writeLog("ERROR - cannot remove file: " % filepath, 3)
+
+    # writes the slave settings to file
+    @err_decorator
+    def createSettings(self, complement=False):
+        sConfig = {
+            "settings": {
+                "updateTime": 10,
+                "restPeriod": [False, 9, 18],
+                "maxCPU": 30,
+                "command": "",
+                "cursorCheck": False,
+                "slaveGroup": [],
+                "enabled": True,
+                "debugMode": False,
+                "connectionTimeout": 15,
+                "preRenderWaitTime": 0,
+                "showSlaveWindow": False,
+                "showInterruptWindow": False,
+                "maxConcurrentTasks": 2,
+                "warningsLimit": 500,
+                "transferThreads": 4,
+                "progressInterval": 10,
+                "useTransport": True,
+            },
+            "slaveinfo": {},
+        }
+
+        if complement:
+            curConfig = self.core.getConfig(
+                configPath=self.slaveConf, getConf=True, silent=True
+            )
+            if curConfig == "Error":
+                self.writeLog("Failed to read config: %s" % self.slaveConf, 2)
+                curConfig = {}
+
+            for i in sConfig:
+                if i not in curConfig:
+                    curConfig[i] = {}
+
+            for i in sConfig["settings"]:
+                if i not in curConfig["settings"]:
+                    curConfig["settings"][i] = sConfig["settings"][i]
+                    self.writeLog(
+                        "complement config: %s %s" % (i, sConfig["settings"][i]), 1
+                    )
+
+            sConfig = curConfig
+
+        self.setConfig(configPath=self.slaveConf, confData=sConfig)
+
+    # sets the slavestate and writes it to file
+    @err_decorator
+    def setState(self, state):
+        if self.slaveState != state:
+            self.slaveState = state
+            self.getConfSetting(
+                "status", section="slaveinfo", setval=True, value=self.slaveState
+            )
+
+    # checks if the slave can start rendering
+    @err_decorator
+    def checkAssignments(self):
+        self.writeLog("start checking assignments")
+        self.writeActive()
+
+        debug = self.getConfSetting("debugMode")
+        if debug is None:
+            self.getConfSetting("debugMode", setval=True, value=False)
+            self.debugMode = False
+        else:
+            self.debugMode = debug
+
+        warnLimit = self.getConfSetting("warningsLimit")
+        if warnLimit is not None:
+            self.warningsLimit = warnLimit
+            self.warningsJournal.limit = warnLimit
+
+        threads = self.getConfSetting("transferThreads")
+        if threads is not None:
+            self.transferThreads = threads
+
+        progressInterval = self.getConfSetting("progressInterval")
+        if progressInterval is not None:
+            self.progressInterval = progressInterval
+
+        slaveEnabled = self.getConfSetting("enabled")
+        if slaveEnabled is None:
+            self.getConfSetting("enabled", setval=True, value=True)
+            slaveEnabled = True
+        elif slaveEnabled and self.slaveState == "disabled":
+            self.setState("idle")
+        elif not slaveEnabled:
+            self.setState("disabled")
+
+        if not (os.path.exists(self.slavePath)):
+            self.writeWarning("paths don't exist", 3)
+            self.scheduleCheck(self.updateTime)
+            return False
+
+        newUTime = self.getConfSetting("updateTime")
+        if newUTime is None:
+            self.getConfSetting("updateTime", setval=True, value=self.updateTime)
+        elif newUTime != self.updateTime:
+            self.writeLog(
+                "updating updateTime from %s to %s" % (self.updateTime, newUTime), 1
+            )
+            self.updateTime = newUTime
+
+        self.checkCmds()
+        self.checkCommandSetting()
+
+        #       timeout = self.getConfSetting("connectionTimeout", stype="int")
+        #       if timeout is None:
+        #           self.getConfSetting("connectionTimeout", setval=True, value=self.connectionTimeout)
+        #       else:
+        #           self.connectionTimeout = timeout
+        #
+        #       if (time.time() - self.lastConnectionTime) > (60 * self.connectionTimeout):
+        #           self.restartGDrive()
+        #           self.lastConnectionTime = time.time()
+
+        if self.slaveState != "rendering":
+            self.checkForUpdates()
+
+        if self.slaveState == "userActive":
+            cresult = self.checkCursor()
+            if cresult > 0:
+                self.scheduleCheck(cresult)
+                return False
+
+        if self.checkRest():
+            if self.slaveState == "idle":
+                self.setState("rest")
+        elif self.slaveState == "rest":
+            self.setState("idle")
+
+        if self.slaveState == "paused" and time.time() > self.pauseEnd:
+            self.writeLog("Pause ended. Changed slavestate to idle.")
+            self.setState("idle")
+
+        if slaveEnabled and len(self.assignedTasks) > 0:
+            for task in self.assignedTasks:
+                rcheck = self.preRenderCheck()
+                if not rcheck[0]:
+                    self.writeLog("preRenderCheck not passed")
+                    if rcheck[1] > 0:
+                        self.scheduleCheck(rcheck[1])
+                    return
+
+                self.startRenderJob(task)
+
+        if self.cursorCheckPos is None:
+            if not self.waitingForFiles:
+                for i in self.assignedTasks:
+                    for task in self.curTasks:
+                        if not (i["name"] == task["jobname"] and i["task"] == task["taskname"]):
+                            self.writeLog(
+                                "giving back assignment of %s from job %s"
+                                % (i["task"], i["name"])
+                            )
+                            self.communicateOut(
+                                ["taskUpdate", i["code"], i["task"], "ready", "", "", ""]
+                            )
+                self.assignedTasks = []
+
+        if self.slaveState != "idle":
+            self.scheduleCheck(self.updateTime)
+            return
+
+        if self.waitingForFiles:
+            #           self.writeLog("DEBUG - waiting for files")
+            self.scheduleCheck(30)
+            return
+
+        self.writeLog("no task assigned")
+        self.callFrontend("closeInterruptWindow")
+
+        self.userAsked = False
+
+        self.scheduleCheck(self.updateTime)
+
+    # tells the server that this slave is currently running
+    @err_decorator
+    def writeActive(self):
+        slaveActive = os.path.join(
+            self.slavePath, "slaveActive_%s" % socket.gethostname()
+        )  # path for the RenderSlave active file. The modifing date is used to tell wether the slave is running
+
+        if (
+            os.path.exists(slaveActive)
+            and float(os.stat(slaveActive).st_size / 1024.0) > 10
+        ):
+            open(slaveActive, "w").close()
+
+        with open(slaveActive, "a") as actFile:
+            actFile.write(" ")
+
+    # open a questionbox, which asks the user if this PC should start rendering.
+    @err_decorator
+    def openActiveQuestion(self):
+        if self.getConfSetting("preRenderWaitTime") is None:
+            self.getConfSetting(
+                "preRenderWaitTime", setval=True, value=self.prerenderwaittime
+            )
+        else:
+            self.prerenderwaittime = self.getConfSetting("preRenderWaitTime")
+
+        # without a front end there is nobody to ask
+        if self.prerenderwaittime <= 0 or self.frontend is None:
+            return 1
+
+        result = self.frontend.askUser(self.prerenderwaittime)
+
+        if result == 0:
+            self.writeLog("User pressed active button - slave paused for 60 min", 1)
+            self.callFrontend("closeInterruptWindow")
+
+            for task in self.curTasks:
+                self.communicateOut(
+                    ["taskUpdate", task["jobcode"], task["taskname"], "ready", "", "", ""]
+                )
+            self.pauseSlave(60)
+
+        return result
+
+    # evaluates the command parameter in the settings file
+    @err_decorator
+    def checkCommandSetting(self):
+        val = self.getConfSetting("command")
+        self.getConfSetting("command", setval=True)
+        if val is not None and val != "":
+            self.writeLog("checkCommands - execute: %s" % val, 1)
+            try:
+                exec(val)
+            except Exception as e:
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                self.writeLog(
+                    "ERROR - checkCommandSetting - %s - %s - %s - %s"
+                    % (val, str(e), exc_type, exc_tb.tb_lineno),
+                    3,
+                )
+
+    # evaluates the commands from the direct connection and the command files in the
+    # communication folder
+    @err_decorator
+    def checkCmds(self):
+        if not os.path.exists(self.slaveComPath):
+            self.writeWarning("Communication path does not exist", 2)
+            self.scheduleCheck(self.updateTime)
+            return False
+
+        self.updateTransport()
+        if self.transport is not None:
+            for peer, cmdId, command in self.transport.getIncoming():
+                self.handleCmd(command, None)
+
+            # commands, which were not acknowledged, are sent as files
+            expired = self.transport.getExpired()
+            if expired:
+                mailbox = self.getMailbox()
+                for peer, cmdId, command in expired:
+                    mailbox.queue(command, cmdId)
+
+                mailbox.flush()
+                self.writeLog("sent %s unacknowledged commands as file" % len(expired), 1)
+
+        cmdFiles = PandoraMailbox.sortCommandFiles(
+            os.listdir(self.slaveComPath), "slaveIn"
+        )
+        for i in cmdFiles:
+            cmFile = os.path.join(self.slaveComPath, i)
+
+            commands = []
+            try:
+                commands = PandoraMailbox.readEnvelope(cmFile)
+            except Exception as e:
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                self.writeLog(
+                    "ERROR - checkCmds - %s - %s - %s"
+                    % (str(e), exc_type, exc_tb.tb_lineno),
+                    3,
+                )
+
+            for cmdId, command in commands:
+                if self.transport is not None and self.transport.wasDelivered(cmdId):
+                    continue
+
+                self.handleCmd(command, cmFile)
+
+            #           self.lastConnectionTime = time.time()
+
+            self.remove(cmFile)
+
+    # handles different types of commands
+    @err_decorator
+    def handleCmd(self, command, cmFile):
+        self.writeLog("handle cmd: %s" % command)
+
+        if command is not None and type(command) == list:
+            if command[0] == "clearLog":
+                self.clearLog()
+
+            elif command[0] == "setSetting":
+                settingName = command[1]
+                settingVal = command[2]
+
+                section = "settings"
+
+                if not os.path.exists(self.slaveConf):
+                    self.writeLog("ERROR - handle cmd - slaveConfig doesn't exist.", 2)
+                    return
+
+                self.getConfSetting(settingName, setval=True, value=settingVal)
+
+                self.writeLog("set config setting - %s: %s" % (settingName, settingVal), 1)
+
+            elif command[0] == "renderTask":
+                # commands from the direct connection don't have a file
+                if cmFile is None or time.time() - os.path.getmtime(cmFile) < 60 * 15:
+                    assignment = {"code": command[1], "name": command[2], "task": command[3]}
+                    if len(command) > 5:
+                        assignment["frames"] = [command[4], command[5]]
+
+                    self.assignedTasks.append(assignment)
+                else:
+                    self.communicateOut(
+                        ["taskUpdate", command[1], command[3], "ready", "", "", ""]
+                    )
+                    self.writeLog(
+                        "render job expired - %s: %s" % (command[1], command[2]), 1
+                    )
+
+            elif command[0] == "cancelTask":
+                cJobCode = command[1]
+                cTaskNum = command[2]
+
+                self.assignedTasks = [
+                    x
+                    for x in self.assignedTasks
+                    if not (x["code"] == cJobCode and x["task"] == cTaskNum)
+                ]
+
+                for task in self.curTasks:
+                    if task["jobcode"] == cJobCode and task["taskname"] == cTaskNum:
+                        self.writeLog(
+                            "cancel task command recieved: %s - %s" % (cJobCode, cTaskNum), 1
+                        )
+                        self.stopRender(tasks=[task])
+
+            elif command[0] == "deleteWarning":
+                warnText = command[1]
+                warnTime = command[2]
+
+                if not os.path.exists(self.slaveWarningsConf):
+                    self.writeLog(
+                        "ERROR - handle cmd - slave warningfile doesn't exist.", 2
+                    )
+                    return None
+
+                self.warningsJournal.delete(warnText, warnTime)
+                self.writeLog("warning deleted", 1)
+            elif command[0] == "clearWarnings":
+                if not os.path.exists(self.slaveWarningsConf):
+                    self.writeLog(
+                        "ERROR - handle cmd - slave warningfile doesn't exist.", 2
+                    )
+                    return None
+
+                self.warningsJournal.clear()
+            elif command[0] == "deleteJob":
+                jobCode = command[1]
+                jobName = command[1]
+
+                jobPath = os.path.join(self.localSlavePath, "Jobs", jobCode)
+                jobConf = os.path.join(jobPath, "PandoraJob.json")
+
+                if os.path.exists(jobConf):
+                    cData = {}
+                    cData["jobName"] = ["information", "jobName"]
+                    cData = self.core.getConfig(data=cData, configPath=jobConf, silent=True)
+                    if cData == "Error":
+                        self.writeLog("Failed to read config: %s" % jobConf, 2)
+                    else:
+                        if cData["jobName"] is not None:
+                            jobName = cData["jobName"]
+
+                if os.path.exists(jobPath):
+                    shutil.rmtree(jobPath)
+                    self.writeLog("deleted local job %s" % (jobName), 1)
+                else:
+                    self.writeLog("job %s did not exist before deletion" % (jobName), 0)
+
+            elif command[0] == "checkConnection":
+                pass
+            elif command[0] == "exitSlave":
+                if cmFile is not None:
+                    self.remove(cmFile)
+
+                self.exitLogic()
+            else:
+                self.writeLog("unknown command: %s" % command, 1)
+
+    # checks wether this PC is allowed to start rendering
+    @err_decorator
+    def preRenderCheck(self):
+        # enabled/paused
+        if self.slaveState == "disabled":
+            self.writeLog("slave is disabled", 1)
+            return [False, 0]
+        elif self.slaveState == "paused":
+            if time.time() < self.pauseEnd:
+                return [False, self.updateTime]
+
+        # still rendering
+        if self.slaveState == "rendering":
+            concurrent = []
+            for task in self.curTasks:
+                concurrent.append(task.get("concurrentTasks", 1))
+
+            self.maxTasks = self.getConfSetting("maxConcurrentTasks")
+            if not self.maxTasks:
+                self.getConfSetting("maxConcurrentTasks", setval=True, value=self.maxTasks)
+                self.maxTasks = self.getConfSetting("maxConcurrentTasks")
+            self.writeLog(self.maxTasks, 2)
+
+            if len(concurrent) >= min(concurrent) or len(concurrent) >= self.maxTasks:
+                self.writeLog("maximum concurrent tasks reached")
+                return [False, self.updateTime]
+
+        # restperiod
+        if self.checkRest():
+            self.setState("rest")
+            self.writeLog("slave in rest period")
+            return [False, self.updateTime]
+
+        # max CPU usage
+        if self.getConfSetting("maxCPU") is None:
+            self.getConfSetting("maxCPU", setval=True, value=self.maxCPU)
+        else:
+            self.maxCPU = self.getConfSetting("maxCPU")
+
+        response = psutil.cpu_percent(interval=1)
+        try:
+            if response > self.maxCPU:
+                self.writeLog("processor usage is over %s%%" % self.maxCPU, 1)
+                return [False, self.updateTime]
+        except:
+            self.writeLog("unable to measure processor usage. %s" % response, 2)
+
+        # cursor check
+        cresult = self.checkCursor()
+        if cresult > 0:
+            return [False, cresult]
+
+        return [True]
+
+    # checks if the rest period is active
+    @err_decorator
+    def checkRest(self):
+        restData = self.getConfSetting("restPeriod")
+        if restData is None:
+            self.getConfSetting(
+                "restPeriod",
+                setval=True,
+                value=[self.useRestPeriod, self.startRP, self.endRP],
+            )
+        else:
+            try:
+                self.useRestPeriod = restData[0]
+                self.startRP = restData[1]
+                self.endRP = restData[2]
+            except:
+                self.writeLog("unable to read rest period: %s" % restData, 2)
+
+        restActive = self.useRestPeriod and int(time.strftime("%H")) in range(
+            self.startRP, self.endRP
+        )
+        return restActive
+
+    # checks if the pc is beeing used by comparing the cursor position over time
+    @err_decorator
+    def checkCursor(self):
+        # the cursor position is only available in the front end
+        if self.frontend is not None and self.getConfSetting("cursorCheck"):
+            self.writeLog("startCursorCheck")
+            cursorPos = self.frontend.getCursorPos()
+            if self.cursorCheckPos is None:
+                self.cursorCheckPos = cursorPos
+                return 15
+
+            self.userMovedMouse = self.cursorCheckPos != cursorPos
+            if self.userMovedMouse:
+                level = 1
+                self.writeLog(
+                    "cursorCheck positions: %s - %s" % (self.cursorCheckPos, cursorPos),
+                    0,
+                )
+            else:
+                level = 0
+
+            self.cursorCheckPos = None
+
+            self.writeLog("endcursorCheck - User active: %s" % self.userMovedMouse, level)
+            if self.userMovedMouse:
+                self.setState("userActive")
+                return self.updateTime
+            else:
+                self.setState("idle")
+        elif self.slaveState == "userActive":
+            self.setState("idle")
+
+        return 0
+
+    # starts a render job
+    @err_decorator
+    def startRenderJob(self, command):
+        jobCode = command["code"]
+        jobName = command["name"]
+        taskName = command["task"]
+
+        if self.interrupted:
+            self.interrupted = False
+
+        localPath = os.path.join(self.localSlavePath, "Jobs", jobCode, "JobFiles")
+        jobPath = os.path.join(self.slavePath, "AssignedJobs", jobCode, "JobFiles")
+
+        jobConf = os.path.join(os.path.dirname(jobPath), "PandoraJob.json")
+        if not os.path.exists(jobConf):
+            self.writeLog("Warning - JobConfig does not exist %s" % jobCode, 2)
+            return
+
+        jobConfig = self.core.getConfig(configPath=jobConf, getConf=True, silent=True)
+        if jobConfig == "Error":
+            self.writeLog("Warning - Failed to read config: %s" % jobConf, 2)
+            return
+
+        jobData = {}
+        if "jobglobals" in jobConfig:
+            for k in jobConfig["jobglobals"]:
+                jobData[k] = jobConfig["jobglobals"][k]
+
+        if "information" in jobConfig:
+            for k in jobConfig["information"]:
+                jobData[k] = jobConfig["information"][k]
+
+        # the local job config can be older than the task, when the coordinator split the
+        # tasks of the job again
+        if "frames" in command:
+            tData = command["frames"]
+        elif taskName in jobConfig["jobtasks"]:
+            tData = jobConfig["jobtasks"][taskName]
+        else:
+            self.writeLog("could not find assigned task", 2)
+            return
+
+        if "jobName" in jobData:
+            jobName = jobData["jobName"]
+        else:
+            self.writeLog("Warning - No jobName in %s config" % jobCode, 2)
+            return True
+
+        if "sceneName" in jobData:
+            sceneName = jobData["sceneName"]
+        else:
+            self.writeLog("Warning - No sceneName in %s config" % jobName, 2)
+            return True
+
+        if "program" not in jobData:
+            self.writeLog("Warning - No program is defined in %s config" % jobName, 2)
+            return True
+
+        if "projectName" not in jobData:
+            self.writeLog("Warning - No Projectname is defined in %s config" % jobName, 2)
+            return True
+
+        if "outputFolder" not in jobData:
+            self.writeLog("Warning - No OutputFolder is defined in %s config" % jobName, 2)
+            return True
+
+        if "jobDependecies" in jobData:
+            depsFinished = [True]
+            for jDep in jobData["jobDependecies"]:
+                if len(jDep) == 2:
+                    depName = jDep[0]
+                    if self.localMode:
+                        depConf = os.path.join(
+                            os.path.join(
+                                self.localSlavePath, "Jobs", depName, "PandoraJob.json"
+                            )
+                        )
+                        if not os.path.exists(depConf):
+                            self.writeLog(
+                                "Warning - dependent JobConfig does not exist %s" % depConf,
+                                2,
+                            )
+                            return
+
+                        depOutPath = self.core.getConfig(
+                            "information", "outputPath", configPath=depConf, silent=True
+                        )
+                        if depOutPath == "Error":
+                            self.writeLog(
+                                "Warning - Failed to read config: %s" % depConf, 2
+                            )
+                            return
+
+                        if depOutPath is not None and depOutPath != "":
+                            depPath = os.path.dirname(depOutPath)
+                        else:
+                            return
+                    else:
+                        depPath = os.path.join(
+                            os.path.join(self.localSlavePath, "RenderOutput", depName)
+                        )
+
+                    if not os.path.exists(depPath):
+                        self.writeLog(
+                            "Warning - For job %s the dependent job %s is missing."
+                            % (jobName, depName),
+                            2,
+                        )
+                        return True
+
+        sceneFile = os.path.join(localPath, sceneName)
+        self.waitingForFiles = False
+
+        if "fileCount" in jobData:
+            expNum = int(jobData["fileCount"])
+
+            if "projectAssets" in jobData:
+                passets = jobData["projectAssets"][1:]
+                pName = jobData["projectName"]
+                paFolder = os.path.join(self.slavePath, "ProjectAssets", pName)
+                assetStore = PandoraManifest.AssetStore(paFolder)
+
+                epAssets = []
+                for m in passets:
+                    if len(m) > 3:
+                        # stored assets never change, so the size shows if the sync is complete
+                        aPath = assetStore.getPath(m[2])
+                        if not os.path.exists(aPath) or os.path.getsize(aPath) != m[3]:
+                            self.writeLog("Project asset missing: %s (%s)" % (m[0], aPath))
+                            continue
+                    else:
+                        aPath = os.path.join(paFolder, m[0])
+                        if not os.path.exists(aPath) or int(
+                            os.path.getmtime(aPath)
+                        ) != int(m[1]):
+                            self.writeLog("Project asset missing or outdated: %s" % (aPath))
+                            continue
+
+                    epAssets.append([aPath, m[0]])
+
+                expNum -= len(epAssets)
+
+            if os.path.exists(jobPath):
+                curNum = len(os.listdir(jobPath))
+            else:
+                curNum = 0
+
+            if curNum < expNum:
+                self.writeLog(
+                    "Not all required files are already available. %s %s from %s"
+                    % (sceneName, curNum, expNum),
+                    1,
+                )
+                self.waitingForFiles = True
+                return
+
+        taskData = {
+            "jobcode": jobCode,
+            "jobname": jobName,
+            "taskname": taskName,
+            "scenefile": sceneFile,
+            "taskStartframe": tData[0],
+            "taskEndframe": tData[1],
+        }
+        taskData.update(jobData)
+        self.curTasks.append(taskData)
+
+        if not self.userAsked:
+            result = self.openActiveQuestion()
+            if result == 0:
+                return True
+
+        showinterruptwindow = self.getConfSetting("showInterruptWindow")
+        if self.getConfSetting("showInterruptWindow") is None:
+            self.getConfSetting("showInterruptWindow", setval=True, value=False)
+        else:
+            showinterruptwindow = self.getConfSetting("showInterruptWindow")
+
+        if showinterruptwindow:
+            self.callFrontend("showInterruptWindow")
+
+        # the scene can be saved during the rendering, so the job files are only cloned, but
+        # never hardlinked
+        if not os.path.exists(localPath):
+            PandoraTransfer.linkTree(
+                os.path.join(self.slavePath, "AssignedJobs", jobCode),
+                os.path.dirname(localPath),
+                hardlink=False,
+            )
+
+        if "projectAssets" in taskData:
+            for k in epAssets:
+                local_asset = os.path.join(localPath, k[1])
+                if (
+                    os.path.exists(local_asset)
+                    and os.path.getmtime(k[0]) == os.path.getmtime(local_asset)
+                    and os.path.getsize(k[0]) == os.path.getsize(local_asset)
+                ):
+                    continue
+
+                try:
+                    PandoraTransfer.linkFile(k[0], local_asset, hardlink=False)
+                    self.writeLog("copy asset to slave repository: %s" % k[1])
+                except:
+                    self.writeLog(
+                        "Could not copy file to Job folder: %s %s %s"
+                        % (taskData["projectName"], k[1], jobName),
+                        2,
+                    )
+
+        if self.localMode:
+            basePath = taskData["outputFolder"]
+        else:
+            basePath = os.path.join(
+                self.localSlavePath, "RenderOutput", taskData["jobcode"]
+            )
+
+        fileNum = 0
+        for i in os.walk(basePath):
+            for k in i[2]:
+                fileNum += 1
+
+        taskData["existingOutputFileNum"] = fileNum
+        self.taskStartTime = time.time()
+
+        self.setState("rendering")
+        self.getConfSetting(
+            "curtasks",
+            section="slaveinfo",
+            setval=True,
+            value=self.getCurTasksData(),
+        )
+
+        self.communicateOut(
+            ["taskUpdate", jobCode, taskName, self.slaveState, "", self.taskStartTime, ""]
+        )
+
+        self.assignedTasks = [
+            x
+            for x in self.assignedTasks
+            if not (x["code"] == jobCode and x["task"] == taskName)
+        ]
+
+        self.userAsked = True
+        self.taskFailed = False
+
+        self.writeLog("starting %s from job %s" % (taskName, jobName), 1)
+
+        dccPlugin = self.core.getPlugin(taskData["program"])
+
+        if dccPlugin is not None:
+            result = dccPlugin.startJob(self, jobData=taskData)
+        else:
+            self.writeLog("unknown scene type: %s" % os.path.splitext(sceneName)[1], 2)
+            self.renderingFailed(task=taskData)
+            self.setState("idle")
+
+        return True
+
+    @err_decorator
+    def getCurTasksData(self):
+        curTasksData = []
+        for task in self.curTasks:
+            data = {
+                "jobname": task["jobname"],
+                "jobcode": task["jobcode"],
+                "taskname": task["taskname"],
+            }
+            curTasksData.append(data)
+
+        return curTasksData
+
+    # stops any renderjob if there is one active
+    @err_decorator
+    def stopRender(self, tasks=None, msgPressed=False):
+        self.userAsked = False
+        self.interrupted = True
+        self.cursorCheckPos = None
+
+        if not tasks:
+            tasks = self.curTasks
+
+        for task in tasks:
+            try:
+                proc = psutil.Process(task["renderProc"].pid)
+                for child in proc.children():
+                    child.kill()
+                proc.kill()
+            except:
+                self.interrupted = False
+
+        self.callFrontend("closeInterruptWindow")
+        self.callFrontend("closeQuestion")
+
+        if self.slaveState == "rendering":
+            self.setState("idle")
+
+        self.writeLog("stopRender - msgPressed = %s" % msgPressed, 1)
+
+        if msgPressed:
+            self.pauseSlave(60, stop=False)
+
+    # check for newer script versions
+    @err_decorator
+    def checkForUpdates(self):
+        # if the coordinator publishes release manifests, only the version number is compared
+        if self.applyRelease():
+            return
+
+        # logic update. All scripts are updated together, because the front end, the core
+        # and their helper modules import each other.
+        restart = False
+        for fileName in self.getUpdateScripts():
+            latestFile = self.getLatestScript(fileName)
+            curFile = os.path.join(scriptPath, fileName)
+            if os.path.exists(curFile):
+                curFileDate = int(os.path.getmtime(curFile))
+            else:
+                curFileDate = 0
+
+            latestFileDate = int(os.path.getmtime(latestFile))
+
+            if curFileDate < latestFileDate:
+                self.writeLog("updating '%s'" % fileName, 1)
+                try:
+                    shutil.copy2(latestFile, curFile)
+                except Exception as e:
+                    self.writeLog("could not update %s - %s" % (fileName, e), 2)
+                    continue
+
+                restart = True
+            elif curFileDate > latestFileDate:
+                self.writeWarning("local %s is newer than the global" % fileName, 2)
+
+        if restart:
+            self.writeLog("restart for updating", 1)
+            self.restartLogic()
+
+        # zip Pandora update
+        latestFile = self.getLatestScript("Pandora-development.zip")
+        if os.path.exists(latestFile):
+            if not hasattr(self.core, "updatePandora"):
+                self.writeWarning("Pandora updates can only be installed with the tray slave", 2)
+                return
+
+            targetdir = os.path.join(
+                os.environ["temp"], "PandoraSlaveUpdate", "Pandora_update.zip"
+            )
+
+            if not os.path.exists(os.path.dirname(targetdir)):
+                try:
+                    os.makedirs(os.path.dirname(targetdir))
+                except:
+                    self.writeLog("could not create PandoraUpdate folder", 2)
+                    return
+
+            shutil.move(latestFile, targetdir)
+
+            self.writeLog("restart for Pandora update", 1)
+            self.stopRender()
+            self.core.updatePandora(filepath=targetdir, silent=True, startSlave=True)
+
+    # returns the names of the python scripts in the update folders of this slave
+    def getUpdateScripts(self):
+        fileNames = set()
+        for folder in [
+            os.path.join(self.slavePath, "Scripts"),
+            os.path.join(self.slavePath, "Scripts", socket.gethostname()),
+        ]:
+            if not os.path.isdir(folder):
+                continue
+
+            for fileName in os.listdir(folder):
+                if fileName.endswith(".py") and os.path.isfile(
+                    os.path.join(folder, fileName)
+                ):
+                    fileNames.add(fileName)
+
+        return sorted(fileNames)
+
+    # returns the path of an update file. Files for this PC are preferred.
+    def getLatestScript(self, fileName):
+        latestFile = os.path.join(
+            self.slavePath, "Scripts", socket.gethostname(), fileName
+        )
+        if not os.path.exists(latestFile):
+            latestFile = os.path.join(self.slavePath, "Scripts", fileName)
+
+        return latestFile
+
+    # updates the local scripts from the release manifest in the Scripts folder of the slave.
+    # Returns False, if there is no manifest.
+    @err_decorator
+    def applyRelease(self):
+        scriptDir = os.path.join(self.slavePath, "Scripts")
+        manifest = PandoraManifest.readManifest(
+            os.path.join(scriptDir, PandoraManifest.manifestName)
+        )
+        if manifest is None:
+            return False
+
+        localDir = scriptPath
+        appliedPath = os.path.join(localDir, "PandoraSlaveRelease.json")
+        applied = PandoraManifest.readManifest(appliedPath)
+        if applied is not None and applied["version"] == manifest["version"]:
+            return True
+
+        restart = False
+        updateZip = None
+        for fileName in PandoraManifest.getChangedFiles(manifest, applied):
+            sourcePath = os.path.join(scriptDir, fileName)
+            fileHash = manifest["files"][fileName]["hash"]
+
+            if fileName.endswith(".zip"):
+                if not os.path.exists(sourcePath):
+                    if applied is None:
+                        # the update was already installed before the slave used manifests
+                        continue
+
+                    self.writeLog("waiting for release file: %s" % fileName)
+                    return True
+
+                if PandoraManifest.hashFile(sourcePath) != fileHash:
+                    self.writeLog("waiting for release file: %s" % fileName)
+                    return True
+
+                updateZip = sourcePath
+                continue
+
+            if not fileName.endswith(".py"):
+                continue
+
+            localPath = os.path.join(localDir, fileName)
+            if (
+                os.path.exists(localPath)
+                and PandoraManifest.hashFile(localPath) == fileHash
+            ):
+                continue
+
+            # the file might not be synchronized completely yet
+            if (
+                not os.path.exists(sourcePath)
+                or PandoraManifest.hashFile(sourcePath) != fileHash
+            ):
+                self.writeLog("waiting for release file: %s" % fileName)
+                return True
+
+            self.writeLog("updating '%s'" % fileName, 1)
+            shutil.copy2(sourcePath, localPath)
+            # helper modules are only loaded again with a restart
+            restart = True
+
+        PandoraManifest.writeManifest(appliedPath, manifest)
+        self.writeLog("applied release %s" % manifest["version"], 1)
+
+        if updateZip is not None and not hasattr(self.core, "updatePandora"):
+            self.writeWarning("Pandora updates can only be installed with the tray slave", 2)
+        elif updateZip is not None:
+            targetdir = os.path.join(
+                os.environ["temp"], "PandoraSlaveUpdate", "Pandora_update.zip"
+            )
+
+            if not os.path.exists(os.path.dirname(targetdir)):
+                try:
+                    os.makedirs(os.path.dirname(targetdir))
+                except:
+                    self.writeLog("could not create PandoraUpdate folder", 2)
+                    return True
+
+            shutil.move(updateZip, targetdir)
+
+            self.writeLog("restart for Pandora update", 1)
+            self.stopRender()
+            self.core.updatePandora(filepath=targetdir, silent=True, startSlave=True)
+        elif restart:
+            self.writeLog("restart for updating", 1)
+            self.restartLogic()
+
+        return True
+
+    # start the thread for the rendering process
+    @err_decorator
+    def startRenderThread(self, pOpenArgs, jData, prog, decode=False):
+        def runInThread(popenArgs, jobData, prog, decode):
+            try:
+                self.writeLog("call " + prog, 1)
+                self.writeLog(popenArgs, 0)
+                jobData["renderStart"] = time.time()
+                jobData["framesDone"] = 0
+                jobData["renderProc"] = subprocess.Popen(
+                    popenArgs, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, text=True
+                )
+
+                parser = PandoraProgress.getParser(prog)
+
+                def readStdout(jobData, prog, decode):
+                    try:
+                        for line in iter(jobData["renderProc"].stdout.readline, ""):
+                            if decode:
+                                line = line.replace("\x00", "")
+
+                            if line in ["", "\n"]:
+                                continue
+
+                            for frame in parser.parseLine(line):
+                                self.frameFinished(jobData, frame)
+
+                            if "Error" in line or "ERROR" in line or "error" in line:
+                                logLevel = 2
+                            else:
+                                logLevel = 1
+
+                                # reduce blender logdata
+                                if (
+                                    prog == "blender"
+                                    and line.startswith("Fra:")
+                                    and " | Time:" in line in line
+                                ):
+                                    continue
+
+                            self.writeLog(line.strip(), logLevel)
+
+                    except Exception as e:
+                        exc_type, exc_obj, exc_tb = sys.exc_info()
+                        self.writeLog(
+                            "ERROR - readStdout - %s - %s - %s"
+                            % (str(e), exc_type, exc_tb.tb_lineno),
+                            3,
+                        )
+
+                def readStderr(jobData, prog, decode):
+                    try:
+                        for line in iter(jobData["renderProc"].stderr.readline, ""):
+                            if decode:
+                                line = line.replace("\x00", "")
+
+                            line = line.strip()
+
+                            if line == "" or (
+                                prog == "maya"
+                                and line.startswith('Starting "')
+                                and line.endswith('mayabatch.exe"')
+                            ):
+                                continue
+
+                            line = "stderr - " + line
+
+                            if prog == "max":
+                                self.writeLog(line, 2)
+                            elif prog == "maya":
+                                if (
+                                    " (kInvalidParameter): No element at given index"
+                                    in line
+                                ):
+                                    self.writeLog(line, 1)
+                                else:
+                                    self.writeLog(line, 2)
+                            elif prog == "houdini":
+                                if "Unable to load HFS OpenCL platform." in line:
+                                    self.writeLog(line, 1)
+                                else:
+                                    self.writeLog(line, 2)
+                            elif prog == "blender":
+                                if (
+                                    (
+                                        "AL lib: (EE) UpdateDeviceParams: Failed to set 44100hz, got 48000hz instead"
+                                        in line
+                                    )
+                                    or ("Could not open" in line)
+                                    or ("Unable to open" in line)
+                                    or (
+                                        "Warning: edge " in line
+                                        and "appears twice, correcting" in line
+                                    )
+                                ):
+                                    self.writeLog(line, 1)
+                                else:
+                                    self.writeLog(line, 2)
+                            else:
+                                self.writeLog(line, 3)
+                                self.taskFailed = True
+
+                    except Exception as e:
+                        exc_type, exc_obj, exc_tb = sys.exc_info()
+                        self.writeLog(
+                            "ERROR - readStderr - %s - %s - %s"
+                            % (str(e), exc_type, exc_tb.tb_lineno),
+                            3,
+                        )
+
+                rothread = threading.Thread(target=readStdout, args=(jobData, prog, decode))
+                rothread.start()
+                rethread = threading.Thread(target=readStderr, args=(jobData, prog, decode))
+                rethread.start()
+
+                jobData["renderProc"].wait()
+                #   self.writeLog(jobData["renderProc"].communicate()[0].decode('utf-16'))
+
+                # the last lines of the output are parsed before the last frame is counted
+                rothread.join(10)
+                if jobData["renderProc"].returncode == 0:
+                    for frame in parser.finish():
+                        self.frameFinished(jobData, frame)
+
+                self.finishedJob(jobData)
+                return
+
+            except Exception as e:
+                exc_type, exc_obj, exc_tb = sys.exc_info()
+                self.writeLog(
+                    "ERROR - runInThread - %s - %s - %s"
+                    % (str(e), exc_type, exc_tb.tb_lineno),
+                    3,
+                )
+                self.renderingFailed(task=jobData)
+
+        thread = threading.Thread(target=runInThread, args=(pOpenArgs, jData, prog, decode))
+        thread.start()
+
+        self.writeLog("thread started", 0)
+
+    # called from the stdout thread, when the renderer saved a frame. The progress is
+    # only stored in the task and sent by sendProgress from the main loop.
+    @err_decorator
+    def frameFinished(self, task, frame):
+        frameCount = PandoraProgress.getFrameCount(
+            [task["taskStartframe"], task["taskEndframe"]]
+        )
+        framesDone = min(task["framesDone"] + 1, max(frameCount, 1))
+        task["frameTime"] = round(
+            (time.time() - task["renderStart"]) / float(framesDone), 2
+        )
+        task["framesDone"] = framesDone
+        self.writeLog(
+            "frame %s finished - %s (%s/%s)"
+            % (frame, task["taskname"], framesDone, frameCount),
+            0,
+        )
+
+    # sends the number of finished frames and the average frame time of the rendering
+    # tasks to the coordinator. Updates through the mailbox are limited to one per
+    # progressInterval.
+    @err_decorator
+    def sendProgress(self):
+        connected = self.transport is not None and self.transport.isConnected()
+        for task in list(self.curTasks):
+            framesDone = task.get("framesDone", 0)
+            if framesDone <= task.get("framesSent", 0):
+                continue
+
+            frameCount = PandoraProgress.getFrameCount(
+                [task["taskStartframe"], task["taskEndframe"]]
+            )
+            if (
+                not connected
+                and framesDone < frameCount
+                and time.time() - task.get("progressSent", 0) < self.progressInterval
+            ):
+                continue
+
+            task["framesSent"] = framesDone
+            task["progressSent"] = time.time()
+            self.communicateOut(
+                [
+                    "taskProgress",
+                    task["jobcode"],
+                    task["taskname"],
+                    framesDone,
+                    task["frameTime"],
+                ]
+            )
+
+    # called when a renderjob is finished. Evaluates the result.
+    @err_decorator
+    def finishedJob(self, task):
+        if self.localMode:
+            basePath = task["outputFolder"]
+        else:
+            basePath = os.path.join(
+                self.localSlavePath, "RenderOutput", task["jobcode"]
+            )
+
+        syncPath = os.path.join(self.slavePath, "Output", task["jobcode"])
+
+        hasNewOutput = False
+        fileNum = 0
+        taskFiles = {}  # output of this task for the output manifest
+        for i in os.walk(basePath):
+            for k in i[2]:
+                fpath = os.path.join(i[0], k)
+                fileStat = os.stat(fpath)
+                if int(fileStat.st_mtime) > self.taskStartTime:
+                    hasNewOutput = True
+                if fileStat.st_mtime >= self.taskStartTime and not k.endswith(".exr.lock"):
+                    taskFiles[os.path.relpath(fpath, basePath)] = [
+                        fileStat.st_size,
+                        fileStat.st_mtime,
+                    ]
+                fileNum += 1
+
+        if fileNum > task["existingOutputFileNum"]:
+            hasNewOutput = True
+
+        if self.interrupted:
+            self.writeLog(
+                "rendering interrupted - %s - %s" % (task["taskname"], task["jobname"]), 2
+            )
+        elif self.taskFailed:
+            self.writeLog(
+                "rendering failed - %s - %s" % (task["taskname"], task["jobname"]), 3
+            )
+        elif not hasNewOutput:
+            self.writeLog(
+                "rendering didn't produce any output - %s - %s"
+                % (task["taskname"], task["jobname"]),
+                3,
+            )
+        else:
+            self.writeLog(
+                "rendering finished - %s - %s" % (task["taskname"], task["jobname"]), 1
+            )
+
+        outputManifest = None
+        if (
+            hasNewOutput
+            and not self.localMode
+            and "uploadOutput" in task
+            and task["uploadOutput"]
+        ):
+            engine = PandoraTransfer.TransferEngine(threads=self.transferThreads)
+            result = engine.copyTree(
+                basePath, syncPath, ignore=lambda x: x.endswith(".exr.lock")
+            )
+            for k in result["errors"]:
+                self.writeLog("ERROR occured while copying files %s %s" % (k[1], k[0]), 3)
+                taskFiles.pop(os.path.relpath(k[0], basePath), None)
+
+            if not self.interrupted and not self.taskFailed:
+                outputManifest = self.writeOutputManifest(task, taskFiles)
+
+            self.writeLog(
+                "uploading files (%s copied, %s skipped, %.1f MB/s)"
+                % (
+                    result["copied"],
+                    result["skipped"],
+                    result["throughput"] / 1024.0 / 1024.0,
+                ),
+                1,
+            )
+
+        if self.interrupted:
+            self.communicateOut(
+                ["taskUpdate", task["jobcode"], task["taskname"], "ready", "", "", ""]
+            )
+            self.interrupted = False
+        else:
+            elapsed = time.time() - self.taskStartTime
+            hours = int(elapsed / 3600)
+            elapsed = elapsed - (hours * 3600)
+            minutes = int(elapsed / 60)
+            elapsed = elapsed - (minutes * 60)
+            seconds = int(elapsed)
+            taskTime = "%s:%s:%s" % (
+                format(hours, "02"),
+                format(minutes, "02"),
+                format(seconds, "02"),
+            )
+
+            outputNum = -1
+            if self.taskFailed or not hasNewOutput:
+                status = "error"
+                taskResult = "failed"
+            else:
+                status = "finished"
+                taskResult = "completed"
+
+                outputNum = 0
+                for i in os.walk(syncPath):
+                    outputNum += len(i[2])
+
+                    for k in i[2]:
+                        if os.path.splitext(k)[1] not in [
+                            ".exr",
+                            "jpg",
+                            ".png",
+                            ".bgeo",
+                            ".abc",
+                            ".tif",
+                            ".tiff",
+                            ".tga",
+                        ]:
+                            self.writeLog("unknown fileoutput type: %s" % (k), 2)
+
+            cmd = [
+                "taskUpdate",
+                task["jobcode"],
+                task["taskname"],
+                status,
+                taskTime,
+                self.taskStartTime,
+                time.time(),
+                outputNum,
+            ]
+            if outputManifest is not None:
+                cmd.append(outputManifest)
+
+            self.communicateOut(cmd)
+
+            self.setState("idle")
+
+            self.writeLog("task " + taskResult, 1)
+
+            if self.interrupted:
+                self.interrupted = False
+
+        if self.prerenderwaittime == 0:
+            self.callFrontend("closeInterruptWindow")
+
+        self.curTasks = [x for x in self.curTasks if not (x["jobcode"] == task["jobcode"] and x["taskname"] == task["taskname"])]
+        self.getConfSetting("curtasks", section="slaveinfo", setval=True, value=self.getCurTasksData())
+
+    # writes the list of the uploaded files of a task, so the coordinator doesn't need to
+    # search the output folder. Returns the filename of the manifest
+    @err_decorator
+    def writeOutputManifest(self, task, taskFiles):
+        manifest = PandoraManifest.createOutputManifest(task["taskname"], taskFiles)
+        manifestName = "%s.json" % task["taskname"]
+        PandoraManifest.writeManifest(
+            os.path.join(
+                self.slavePath,
+                PandoraManifest.outputManifestFolder,
+                task["jobcode"],
+                manifestName,
+            ),
+            manifest,
+        )
+        return manifestName
+
+    # called by the user, if he wants to upload all renderings from the current job, before the job is finished
+    @err_decorator
+    def uploadCurJob(self):
+        engine = PandoraTransfer.TransferEngine(threads=self.transferThreads)
+        for task in self.curTasks:
+            syncPath = os.path.join(self.slavePath, "Output", task["jobcode"])
+
+            basePath = os.path.join(
+                self.localSlavePath,
+                "RenderOutput",
+                task["jobcode"],
+                task["projectName"],
+            )
+            result = engine.copyTree(basePath, syncPath, mode="missing")
+            for k in result["errors"]:
+                self.writeLog("ERROR occured while copying files %s %s" % (k[1], k[0]), 3)
+
+            self.writeLog(
+                "uploaded files from current job (%s): %s"
+                % (task["jobname"], result["copied"]),
+                1,
+            )
+
+    # called when the rendering failed and writes out the error
+    @err_decorator
+    def renderingFailed(self, task):
+        self.stopRender()
+        self.communicateOut(
+            ["taskUpdate", task["jobcode"], task["taskname"], "ready", "", "", ""]
+        )
+        self.interrupted = False
+        self.curTasks = [x for x in self.curTasks if not (x["jobcode"] == task["jobcode"] and x["taskname"] == task["taskname"])]
+        self.getConfSetting("curtasks", section="slaveinfo", setval=True, value=self.getCurTasksData())
+        # this can be called from the render thread, so the logic is only scheduled
+        self.scheduleCheck(0)
+
+
+# returns the other running slave daemons
+def getDaemonProcesses():
+    # the parents can contain the script name in their arguments, e.g. a service wrapper
+    ownPids = [x.pid for x in psutil.Process().parents()] + [os.getpid()]
+    daemons = []
+    for proc in psutil.process_iter():
+        try:
+            if proc.pid not in ownPids and os.path.basename(__file__) in [
+                os.path.basename(x) for x in proc.cmdline()
+            ]:
+                daemons.append(proc)
+        except:
+            pass
+
+    return daemons
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs the Pandora RenderSlave as a daemon without a user interface."
+    )
+    parser.add_argument(
+        "--config",
+        help="path of the Pandora.json (default: ~/Documents/Pandora/Pandora.json)",
+    )
+    parser.add_argument(
+        "mode",
+        nargs="?",
+        choices=["forcestart"],
+        help="stop a running slave daemon instead of exiting",
+    )
+    args = parser.parse_args()
+
+    slaveProc = getDaemonProcesses()
+    if len(slaveProc) > 0:
+        if args.mode == "forcestart":
+            for proc in slaveProc:
+                proc.kill()
+        else:
+            sys.stderr.write("Pandora RenderSlave is already running.\n")
+            sys.exit(1)
+
+    slave = SlaveCore(HeadlessCore(configPath=args.config))
+    try:
+        slave.run()
+    except KeyboardInterrupt:
+        slave.exitLogic()
+
+
+# true when this script is executed and not imported
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, time
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+
+# Caches directory listings of the sync folder between coordinator cycles.
+# A listing is only read again when the modification time of the directory has changed,
+# which happens when files are added, removed or renamed. Files, which are modified in
+# place (like the slaveActive files), have to be checked with statFile.
+class DirectorySnapshot(object):
+    # listings, which were read shortly after the directory changed, are not trusted,
+    # because a change in the same second wouldn't change the directory mtime
+    racyTime = 2.0
+
+    def __init__(self):
+        self.dirs = {}  # path: {"mtime", "scanTime", "entries": {name: isDir}}
+        self.files = {}  # path: (mtime, size)
+        self.counters = {"stats": 0, "scans": 0}
+
+    # returns {"entries": {name: isDir}, "added": [], "removed": []} or None if the
+    # directory doesn't exist
+    def scanDir(self, path):
+        self.counters["stats"] += 1
+        try:
+            dirMtime = os.stat(path).st_mtime
+        except OSError:
+            self.dirs.pop(path, None)
+            return None
+
+        cached = self.dirs.get(path)
+        if (
+            cached is not None
+            and cached["mtime"] == dirMtime
+            and cached["scanTime"] - dirMtime > self.racyTime
+        ):
+            return {"entries": cached["entries"], "added": [], "removed": []}
+
+        scanTime = time.time()
+        self.counters["scans"] += 1
+        try:
+            entries = self.listEntries(path)
+        except OSError:
+            self.dirs.pop(path, None)
+            return None
+
+        if cached is None:
+            prevEntries = {}
+        else:
+            prevEntries = cached["entries"]
+
+        self.dirs[path] = {"mtime": dirMtime, "scanTime": scanTime, "entries": entries}
+        return {
+            "entries": entries,
+            "added": sorted(x for x in entries if x not in prevEntries),
+            "removed": sorted(x for x in prevEntries if x not in entries),
+        }
+
+    def listEntries(self, path):
+        if scandir is None:
+            return dict(
+                (x, os.path.isdir(os.path.join(path, x))) for x in os.listdir(path)
+            )
+
+        entries = {}
+        for entry in scandir(path):
+            try:
+                entries[entry.name] = entry.is_dir()
+            except OSError:
+                entries[entry.name] = False
+
+        return entries
+
+    # returns the stat result of a file or None and wether it changed since the last call
+    def statFile(self, path):
+        self.counters["stats"] += 1
+        try:
+            fileStat = os.stat(path)
+        except OSError:
+            changed = self.files.pop(path, None) is not None
+            return None, changed
+
+        fileKey = (fileStat.st_mtime, fileStat.st_size)
+        changed = self.files.get(path) != fileKey
+        self.files[path] = fileKey
+        return fileStat, changed
+
+    # forces the directory to be read again on the next scan. Used after the coordinator
+    # changed the directory itself or to verify the whole snapshot from time to time.
+    def invalidate(self, path=None):
+        if path is None:
+            self.dirs = {}
+            self.files = {}
+        else:
+            self.dirs.pop(path, None)
+            self.files.pop(path, None)
+
+    def getCounters(self, reset=False):
+        counters = dict(self.counters)
+        if reset:
+            self.counters = {"stats": 0, "scans": 0}
+
+        return counters
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, sys, json, time, errno, shutil, threading
+
+if sys.version[0] == "3":
+    import queue
+else:
+    import Queue as queue
+
+import PandoraManifest
+
+
+# Job files are distributed to the slave folders with the cheapest method, which is
+# available for the source and target volume:
+#   "reflink"  - copy-on-write clone (btrfs, xfs, apfs). Safe for files, which get modified
+#   "hardlink" - second directory entry for the same file. Only used for files, which are
+#                never written after the submission
+#   "copy"     - regular copy as fallback, e.g. for network shares or different volumes
+
+FICLONE = 0x40049409  # linux ioctl to clone a file
+
+reflinkSupport = {}  # device id: False, if cloning failed on this device
+
+
+def getDevice(path):
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+
+        path = parent
+
+    return os.stat(path).st_dev
+
+
+def sameVolume(src, dst):
+    srcDevice = getDevice(src)
+    return srcDevice is not None and srcDevice == getDevice(dst)
+
+
+def cloneFile(src, dst):
+    if sys.platform.startswith("linux"):
+        import fcntl
+
+        with open(src, "rb") as srcFile:
+            with open(dst, "wb") as dstFile:
+                fcntl.ioctl(dstFile.fileno(), FICLONE, srcFile.fileno())
+
+    elif sys.platform == "darwin":
+        import ctypes, ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if libc.clonefile(
+            os.fsencode(src) if hasattr(os, "fsencode") else src,
+            os.fsencode(dst) if hasattr(os, "fsencode") else dst,
+            0,
+        ) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    else:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+
+    shutil.copystat(src, dst)
+
+
+def removeFile(path):
+    if os.path.lexists(path):
+        os.remove(path)
+
+
+# links or copies a single file and returns the used method
+def linkFile(src, dst, hardlink=True):
+    removeFile(dst)
+    dstDir = os.path.dirname(dst)
+    if dstDir and not os.path.exists(dstDir):
+        os.makedirs(dstDir)
+
+    if sameVolume(src, dst):
+        device = getDevice(dst)
+        if reflinkSupport.get(device, True):
+            try:
+                cloneFile(src, dst)
+                return "reflink"
+            except (OSError, IOError, AttributeError):
+                reflinkSupport[device] = False
+                removeFile(dst)
+
+        if hardlink and hasattr(os, "link"):
+            try:
+                os.link(src, dst)
+                return "hardlink"
+            except (OSError, AttributeError):
+                removeFile(dst)
+
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+# works like shutil.copytree, but links the files if possible. Files in "copyNames" are
+# always copied, because they get modified in the source or the target folder.
+# Returns the number of files per method
+def linkTree(src, dst, hardlink=True, copyNames=None):
+    copyNames = copyNames or []
+    result = {"reflink": 0, "hardlink": 0, "copy": 0}
+
+    for root, dirs, files in os.walk(src):
+        targetRoot = os.path.join(dst, os.path.relpath(root, src))
+        if not os.path.exists(targetRoot):
+            os.makedirs(targetRoot)
+
+        for fileName in files:
+            srcPath = os.path.join(root, fileName)
+            dstPath = os.path.join(targetRoot, fileName)
+            if fileName in copyNames:
+                shutil.copy2(srcPath, dstPath)
+                method = "copy"
+            else:
+                method = linkFile(srcPath, dstPath, hardlink=hardlink)
+
+            result[method] += 1
+
+    return result
+
+
+# Keeps track of the folders, into which the files of a job were distributed:
+#   {"<jobCode>": {"Slaves/S_name/AssignedJobs/<jobCode>": "hardlink"}}
+# The paths are stored relative to the Pandora root, because the root can be mounted at
+# different locations.
+class JobReferences(object):
+    def __init__(self, path, basePath):
+        self.path = path
+        self.basePath = basePath
+        self.references = None
+
+    def load(self):
+        if self.references is not None:
+            return
+
+        self.references = {}
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as rFile:
+                data = json.load(rFile)
+        except ValueError:
+            return
+
+        if isinstance(data, dict):
+            self.references = data
+
+    def save(self):
+        tmpPath = os.path.join(
+            os.path.dirname(self.path),
+            "~%s.%s.tmp" % (os.path.basename(self.path), os.getpid()),
+        )
+        with open(tmpPath, "w") as rFile:
+            json.dump(self.references, rFile, indent=4, sort_keys=True)
+
+        if hasattr(os, "replace"):
+            os.replace(tmpPath, self.path)
+        else:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(tmpPath, self.path)
+
+    def relPath(self, path):
+        return os.path.relpath(path, self.basePath).replace("\\", "/")
+
+    def addReference(self, jobCode, target, method):
+        self.load()
+        self.references.setdefault(jobCode, {})[self.relPath(target)] = method
+        self.save()
+
+    # returns the number of references, which remain for the job
+    def removeReference(self, jobCode, target):
+        self.load()
+        jobRefs = self.references.get(jobCode, {})
+        jobRefs.pop(self.relPath(target), None)
+        if not jobRefs:
+            self.references.pop(jobCode, None)
+
+        self.save()
+        return len(jobRefs)
+
+    def getReferences(self, jobCode):
+        self.load()
+        return [
+            os.path.normpath(os.path.join(self.basePath, x))
+            for x in sorted(self.references.get(jobCode, {}))
+        ]
+
+    def getCount(self, jobCode):
+        self.load()
+        return len(self.references.get(jobCode, {}))
+
+
+# Copies many files with a pool of threads. Used for the render output, which is copied
+# between the slaves, the coordinator and the workstations:
+#   engine = TransferEngine(threads=4)
+#   result = engine.copyTree(source, target)
+# Files are copied to a temporary name first, so a reader never sees a partial file. The
+# result is a dict with the counters "files", "copied", "skipped", "failed", "bytes",
+# "time", "throughput" (bytes per second), "errors" (list of [path, message]) and
+# "lastTarget". The errors are not logged by the engine, because the log functions of the
+# callers are not thread safe.
+class TransferEngine(object):
+    tmpSuffix = ".pandoratransfer"
+
+    def __init__(self, threads=4, verify=False, retries=2, retryDelay=1.0):
+        self.threads = max(1, int(threads))
+        self.verify = verify  # compare the checksums of the source and the copy
+        self.retries = retries
+        self.retryDelay = retryDelay  # seconds, doubled after every failed attempt
+
+    # copies all files of a folder. "mode" defines which existing target files are skipped:
+    #   "newer"   - the target has the same size and is not older than the source
+    #   "missing" - the target exists
+    # "ignore" is a function, which gets the relative path of a file and returns True to
+    # exclude the file. "progress" is called in the calling thread about 5 times per second.
+    def copyTree(self, source, target, mode="newer", ignore=None, progress=None):
+        files = []
+        for root, dirs, fileNames in os.walk(source):
+            for fileName in fileNames:
+                if fileName.endswith(self.tmpSuffix):
+                    continue
+
+                filePath = os.path.join(root, fileName)
+                relPath = os.path.relpath(filePath, source)
+                if ignore is not None and ignore(relPath):
+                    continue
+
+                files.append([filePath, os.path.join(target, relPath)])
+
+        return self.copyFiles(files, mode=mode, progress=progress)
+
+    # copies a list of [source, target] pairs
+    def copyFiles(self, files, mode="newer", progress=None):
+        result = {
+            "files": len(files),
+            "copied": 0,
+            "skipped": 0,
+            "failed": 0,
+            "bytes": 0,
+            "time": 0.0,
+            "throughput": 0.0,
+            "errors": [],
+            "lastTarget": None,
+        }
+        if not files:
+            return result
+
+        startTime = time.time()
+        lock = threading.Lock()
+        jobs = queue.Queue()
+        for fileData in files:
+            jobs.put(fileData)
+
+        workers = []
+        for idx in range(min(self.threads, len(files))):
+            worker = threading.Thread(target=self.work, args=(jobs, mode, result, lock))
+            worker.daemon = True
+            worker.start()
+            workers.append(worker)
+
+        for worker in workers:
+            while worker.is_alive():
+                worker.join(0.2)
+                if progress is not None:
+                    with lock:
+                        result["time"] = time.time() - startTime
+                        progress(dict(result))
+
+        result["time"] = time.time() - startTime
+        if result["time"] > 0:
+            result["throughput"] = result["bytes"] / result["time"]
+
+        return result
+
+    def work(self, jobs, mode, result, lock):
+        while True:
+            try:
+                source, target = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            try:
+                copied = self.transferFile(source, target, mode)
+            except Exception as e:
+                with lock:
+                    result["failed"] += 1
+                    result["errors"].append([source, str(e)])
+                continue
+
+            with lock:
+                result["lastTarget"] = target
+                if copied is None:
+                    result["skipped"] += 1
+                else:
+                    result["copied"] += 1
+                    result["bytes"] += copied
+
+    # returns the number of copied bytes or None if the file was skipped
+    def transferFile(self, source, target, mode):
+        if os.path.exists(target):
+            if mode == "missing":
+                return None
+
+            srcStat = os.stat(source)
+            targetStat = os.stat(target)
+            if srcStat.st_size == targetStat.st_size and int(srcStat.st_mtime) <= int(
+                targetStat.st_mtime
+            ):
+                return None
+
+        targetDir = os.path.dirname(target)
+        tmpPath = target + self.tmpSuffix
+        delay = self.retryDelay
+        attempt = 0
+        while True:
+            try:
+                if not os.path.exists(targetDir):
+                    try:
+                        os.makedirs(targetDir)
+                    except OSError:
+                        # another thread might have created the folder
+                        if not os.path.isdir(targetDir):
+                            raise
+
+                shutil.copy2(source, tmpPath)
+                if self.verify:
+                    if PandoraManifest.hashFile(source) != PandoraManifest.hashFile(tmpPath):
+                        raise IOError("checksum mismatch")
+
+                PandoraManifest.replaceFile(tmpPath, target)
+                return os.path.getsize(target)
+            except (IOError, OSError):
+                if os.path.exists(tmpPath):
+                    try:
+                        os.remove(tmpPath)
+                    except OSError:
+                        pass
+
+                if attempt >= self.retries:
+                    raise
+
+                attempt += 1
+                time.sleep(delay)
+                delay *= 2
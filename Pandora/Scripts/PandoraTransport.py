@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, json, time, threading, itertools, collections, random, string
+import asyncio
+
+import PandoraManifest
+
+
+# Optional direct connection between the coordinator and the slaves. The coordinator
+# runs a TCP server and publishes its address in the Slaves folder. Messages are json
+# lines:
+#   {"type": "hello", "name": "Slave01", "token": "..."}  first message of a slave
+#   {"type": "welcome"}                                    answer of the coordinator
+#   {"type": "cmd", "id": "...", "command": [...]}         acknowledged with
+#   {"type": "ack", "id": "..."}
+#   {"type": "ping"} / {"type": "pong"}                    heartbeats of the slave
+# Commands, which are not acknowledged in time or were sent while the connection was
+# down, are returned by getExpired, so that they can be sent through the Communication
+# folder instead. The message ids are included in these envelopes, so that commands,
+# which were already delivered through the connection, are not handled twice.
+
+transportName = "CoordinatorTransport.json"
+heartbeatInterval = 5  # seconds between two heartbeats of a slave
+ackTimeout = 30  # seconds until an unacknowledged command is sent as a file
+reconnectInterval = 10  # seconds between two connection attempts of a slave
+deliveredLimit = 5000  # number of message ids, which are remembered to skip duplicates
+
+
+def encodeMessage(msg):
+    return (json.dumps(msg) + "\n").encode("utf-8")
+
+
+def readTransportInfo(path):
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with io.open(path, "r", encoding="utf-8") as tFile:
+            info = json.load(tFile)
+    except Exception:
+        return None
+
+    if type(info) != dict or not info.get("host") or not info.get("port"):
+        return None
+
+    return info
+
+
+def writeTransportInfo(path, info):
+    tmpPath = os.path.join(
+        os.path.dirname(path), "~%s.%s.tmp" % (os.path.basename(path), os.getpid())
+    )
+    with open(tmpPath, "w") as tFile:
+        json.dump(info, tFile, indent=4, sort_keys=True)
+
+    PandoraManifest.replaceFile(tmpPath, path)
+
+
+def createToken():
+    chars = string.ascii_letters + string.digits
+    return "".join(random.SystemRandom().choice(chars) for x in range(32))
+
+
+class TransportEndpoint(object):
+    def __init__(self, name):
+        self.name = name
+        self.loop = None
+        self.thread = None
+        self.stopEvent = None
+        self.started = threading.Event()
+        self.startError = None
+        self.lock = threading.Lock()
+        self.writers = {}  # open connections by peer name
+        self.lastContact = {}
+        self.incoming = []
+        self.incomingEvent = threading.Event()
+        self.pending = {}  # unacknowledged commands: {id: [peer, command, sendTime]}
+        self.delivered = collections.deque()
+        self.deliveredIds = set()
+        self.session = "%s-%x" % (name, int(time.time() * 1000))
+        self.counter = itertools.count(1)
+
+    def start(self, timeout=10):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.runLoop)
+        self.thread.daemon = True
+        self.thread.start()
+        self.started.wait(timeout)
+        if self.startError is not None:
+            raise self.startError
+
+    def runLoop(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.main())
+        except Exception as e:
+            self.startError = e
+        finally:
+            self.started.set()
+            self.loop.close()
+
+    def stop(self, timeout=5):
+        if self.loop is None or self.thread is None:
+            return
+
+        if self.stopEvent is not None:
+            try:
+                self.loop.call_soon_threadsafe(self.shutdown)
+            except RuntimeError:
+                pass
+
+        self.thread.join(timeout)
+        self.thread = None
+
+    def isConnected(self, peer):
+        return peer in self.writers
+
+    # queues a command for a connected peer and returns its message id
+    def send(self, peer, command):
+        if self.loop is None or peer not in self.writers:
+            return None
+
+        msgId = "%s-%s" % (self.session, next(self.counter))
+        with self.lock:
+            self.pending[msgId] = [peer, list(command), time.time()]
+
+        msg = {"type": "cmd", "id": msgId, "command": list(command)}
+        try:
+            self.loop.call_soon_threadsafe(self.write, peer, msg)
+        except RuntimeError:
+            pass
+
+        return msgId
+
+    # returns the received commands as [peer, id, command]
+    def getIncoming(self):
+        with self.lock:
+            incoming = self.incoming
+            self.incoming = []
+            self.incomingEvent.clear()
+
+        return incoming
+
+    def waitIncoming(self, timeout):
+        return self.incomingEvent.wait(timeout)
+
+    # returns the commands as [peer, id, command], which should be sent as files
+    def getExpired(self):
+        now = time.time()
+        expired = []
+        with self.lock:
+            for msgId in sorted(self.pending):
+                peer, command, sendTime = self.pending[msgId]
+                if now - sendTime > ackTimeout or peer not in self.writers:
+                    expired.append([peer, msgId, command])
+
+            for peer, msgId, command in expired:
+                del self.pending[msgId]
+
+        return expired
+
+    def getLastContact(self, peer):
+        return self.lastContact.get(peer)
+
+    def wasDelivered(self, msgId):
+        return msgId in self.deliveredIds
+
+    # remembers a message id and returns False, if it was received before
+    def addDelivered(self, msgId):
+        with self.lock:
+            if msgId in self.deliveredIds:
+                return False
+
+            self.deliveredIds.add(msgId)
+            self.delivered.append(msgId)
+            while len(self.delivered) > deliveredLimit:
+                self.deliveredIds.discard(self.delivered.popleft())
+
+        return True
+
+    def shutdown(self):
+        self.stopEvent.set()
+        for writer in list(self.writers.values()):
+            writer.close()
+
+    def write(self, peer, msg):
+        writer = self.writers.get(peer)
+        if writer is not None:
+            writer.write(encodeMessage(msg))
+
+    def receive(self, peer, msg, writer):
+        self.lastContact[peer] = time.time()
+        msgType = msg.get("type")
+        if msgType == "cmd":
+            writer.write(encodeMessage({"type": "ack", "id": msg.get("id")}))
+            if type(msg.get("command")) != list or not msg["command"]:
+                return
+
+            if self.addDelivered(msg.get("id")):
+                with self.lock:
+                    self.incoming.append([peer, msg["id"], msg["command"]])
+                    self.incomingEvent.set()
+
+        elif msgType == "ack":
+            with self.lock:
+                self.pending.pop(msg.get("id"), None)
+
+        elif msgType == "ping":
+            writer.write(encodeMessage({"type": "pong"}))
+
+    async def readMessages(self, peer, reader, writer):
+        while not self.stopEvent.is_set():
+            line = await asyncio.wait_for(reader.readline(), heartbeatInterval * 3)
+            if not line:
+                break
+
+            self.receive(peer, json.loads(line.decode("utf-8")), writer)
+
+    def closeConnection(self, peer, writer):
+        if peer is not None and self.writers.get(peer) is writer:
+            del self.writers[peer]
+
+        writer.close()
+
+    async def sleep(self, duration):
+        try:
+            await asyncio.wait_for(self.stopEvent.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+
+
+# runs in the coordinator, the slaves connect to it
+class TransportServer(TransportEndpoint):
+    def __init__(self, host="", port=0, token=None):
+        super(TransportServer, self).__init__("Coordinator")
+        self.host = host
+        self.port = port
+        self.token = token or createToken()
+        self.handlers = set()
+
+    def getInfo(self, host):
+        return {"host": host, "port": self.port, "token": self.token, "started": time.time()}
+
+    async def main(self):
+        self.stopEvent = asyncio.Event()
+        # with an empty host asyncio would bind IPv4 and IPv6 sockets, which get different
+        # ports, when the port is chosen by the system
+        server = await asyncio.start_server(
+            self.handleConnection, self.host or "0.0.0.0", self.port
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self.started.set()
+
+        await self.stopEvent.wait()
+        server.close()
+        await server.wait_closed()
+        if self.handlers:
+            await asyncio.wait(list(self.handlers), timeout=heartbeatInterval)
+
+    async def handleConnection(self, reader, writer):
+        peer = None
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        try:
+            line = await asyncio.wait_for(reader.readline(), heartbeatInterval * 3)
+            hello = json.loads(line.decode("utf-8"))
+            if hello.get("type") != "hello" or hello.get("token") != self.token:
+                return
+
+            peer = hello.get("name")
+            if not peer:
+                return
+
+            if peer in self.writers:
+                self.writers[peer].close()
+
+            self.writers[peer] = writer
+            self.lastContact[peer] = time.time()
+            writer.write(encodeMessage({"type": "welcome"}))
+            await self.readMessages(peer, reader, writer)
+        except (asyncio.TimeoutError, ValueError, AttributeError, OSError):
+            pass
+        finally:
+            self.closeConnection(peer, writer)
+            self.handlers.discard(handler)
+
+
+# runs in a slave and keeps the connection to the coordinator open
+class TransportClient(TransportEndpoint):
+    def __init__(self, name, host, port, token):
+        super(TransportClient, self).__init__(name)
+        self.host = host
+        self.port = port
+        self.token = token
+
+    def isConnected(self, peer="Coordinator"):
+        return peer in self.writers
+
+    def send(self, command, peer="Coordinator"):
+        return super(TransportClient, self).send(peer, command)
+
+    async def main(self):
+        self.stopEvent = asyncio.Event()
+        self.started.set()
+
+        while not self.stopEvent.is_set():
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), reconnectInterval
+                )
+                hello = {"type": "hello", "name": self.name, "token": self.token}
+                writer.write(encodeMessage(hello))
+                line = await asyncio.wait_for(reader.readline(), heartbeatInterval * 3)
+                if json.loads(line.decode("utf-8")).get("type") == "welcome":
+                    self.writers["Coordinator"] = writer
+                    self.lastContact["Coordinator"] = time.time()
+                    heartbeat = self.loop.create_task(self.sendHeartbeats(writer))
+                    try:
+                        await self.readMessages("Coordinator", reader, writer)
+                    finally:
+                        heartbeat.cancel()
+            except (asyncio.TimeoutError, ValueError, AttributeError, OSError):
+                pass
+            finally:
+                if writer is not None:
+                    self.closeConnection("Coordinator", writer)
+
+            await self.sleep(reconnectInterval)
+
+    async def sendHeartbeats(self, writer):
+        while not self.stopEvent.is_set():
+            writer.write(encodeMessage({"type": "ping"}))
+            await self.sleep(heartbeatInterval)
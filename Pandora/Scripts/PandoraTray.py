@@ -50,6 +50,8 @@ if scriptPath not in sys.path:
 
 import psutil
 
+import PandoraTransfer
+
 from PySide2.QtCore import *
 from PySide2.QtGui import *
 from PySide2.QtWidgets import *
@@ -364,50 +366,33 @@ class PandoraTray:
                             waitmsg.show()
                             QCoreApplication.processEvents()
 
-                            copiedNum = 0
-                            errors = 0
-
-                            for o in os.walk(jobDir):
-                                for m in o[2]:
-                                    if m == "PandoraJob.json":
-                                        continue
-
-                                    filePath = os.path.join(o[0], m)
-                                    relFilePath = filePath.replace(jobDir, "")
-                                    while relFilePath.startswith(
-                                        "\\"
-                                    ) or relFilePath.startswith("/"):
-                                        relFilePath = relFilePath[1:]
-                                    targetPath = os.path.join(targetBase, relFilePath)
-
-                                    copyFile = True
-
-                                    if os.path.exists(targetPath):
-                                        curFileDate = int(
-                                            os.path.getmtime(os.path.abspath(filePath))
-                                        )
-                                        targetFileDate = int(os.path.getmtime(targetPath))
-
-                                        if curFileDate <= targetFileDate:
-                                            copyFile = False
-
-                                    if copyFile:
-                                        folderExists = True
-                                        if not os.path.exists(os.path.dirname(targetPath)):
-                                            try:
-                                                os.makedirs(os.path.dirname(targetPath))
-                                            except:
-                                                errors += 1
-                                                folderExists = False
-
-                                        if folderExists:
-                                            try:
-                                                shutil.copy2(filePath, targetPath)
-                                                copiedNum += 1
-                                            except:
-                                                errors += 1
-
-                            result["%s - %s" % (prj, job)] = [copiedNum, errors]
+                            def updateProgress(progress, job=job):
+                                waitmsg.setText(
+                                    "Collecting renderings - %s - please wait..\n\n%s of %s files (%.1f MB/s)"
+                                    % (
+                                        job,
+                                        progress["copied"] + progress["skipped"],
+                                        progress["files"],
+                                        progress["bytes"]
+                                        / max(progress["time"], 0.001)
+                                        / 1024.0
+                                        / 1024.0,
+                                    )
+                                )
+                                QCoreApplication.processEvents()
+
+                            engine = PandoraTransfer.TransferEngine(threads=4)
+                            copyResult = engine.copyTree(
+                                jobDir,
+                                targetBase,
+                                ignore=lambda x: os.path.basename(x) == "PandoraJob.json",
+                                progress=updateProgress,
+                            )
+
+                            result["%s - %s" % (prj, job)] = [
+                                copyResult["copied"],
+                                copyResult["failed"],
+                            ]
 
                             completeCount = self.core.getConfig(
                                 "information", "outputFileCount", configPath=confPath
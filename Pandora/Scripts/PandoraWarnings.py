@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, io, time, json
+
+
+# A warnings journal is a text file with one json record per line:
+#   ["add", text, time, level]
+#   ["delete", text, time]
+#   ["clear", time]
+# Records are only appended. The current warnings are the result of replaying
+# the journal, which is done from the end of the file, so that the newest
+# warnings can be read without parsing the whole journal.
+
+
+def readLinesReversed(path, blockSize=65536):
+    with open(path, "rb") as journal:
+        journal.seek(0, os.SEEK_END)
+        pos = journal.tell()
+        rest = b""
+        while pos > 0:
+            readSize = min(blockSize, pos)
+            pos -= readSize
+            journal.seek(pos)
+            lines = (journal.read(readSize) + rest).split(b"\n")
+            rest = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+
+        if rest.strip():
+            yield rest
+
+
+def parseRecord(line):
+    try:
+        record = json.loads(line.decode("utf-8"))
+    except Exception:
+        # partially written or corrupt line
+        return None
+
+    if type(record) != list or len(record) < 2:
+        return None
+
+    return record
+
+
+# reads the warnings of the old format {"warnings": {"warning0": [text, time, level]}}
+def readLegacyWarnings(path):
+    with io.open(path, "r", encoding="utf-8-sig") as config:
+        data = config.read()
+
+    if not data.strip():
+        return []
+
+    warnConfig = json.loads(data)
+    warnings = list(warnConfig.get("warnings", {}).values())
+    return sorted(warnings, key=lambda x: x[1], reverse=True)
+
+
+class WarningsJournal(object):
+    def __init__(self, path, limit=500, legacyPath=None):
+        self.path = path
+        self.limit = limit  # maximum number of warnings, which are kept on compaction
+        self.numRecords = None  # counted on the first write
+
+        if legacyPath and os.path.exists(legacyPath) and not os.path.exists(self.path):
+            self.importLegacy(legacyPath)
+
+    # returns a list of [text, time, level], newest first
+    def getWarnings(self, limit=None):
+        if not os.path.exists(self.path):
+            return []
+
+        warnings = []
+        seenTexts = set()
+        deleted = set()
+        for line in readLinesReversed(self.path):
+            record = parseRecord(line)
+            if record is None:
+                continue
+
+            if record[0] == "clear":
+                break
+
+            elif record[0] == "delete" and len(record) >= 3:
+                deleted.add((record[1], record[2]))
+
+            elif record[0] == "add" and len(record) >= 4:
+                text = record[1]
+                if text in seenTexts:
+                    continue
+
+                # only the newest entry of a text is valid, older ones stay hidden
+                seenTexts.add(text)
+                if (text, record[2]) in deleted:
+                    continue
+
+                warnings.append([text, record[2], record[3]])
+                if limit is not None and len(warnings) >= limit:
+                    break
+
+        return warnings
+
+    def getWarningCount(self):
+        return len(self.getWarnings())
+
+    def add(self, text, level=1, warnTime=None):
+        if warnTime is None:
+            warnTime = time.time()
+
+        self.appendRecords([["add", text, warnTime, level]])
+
+    def delete(self, text, warnTime):
+        self.appendRecords([["delete", text, warnTime]])
+
+    def clear(self):
+        self.appendRecords([["clear", time.time()]])
+
+    def appendRecords(self, records):
+        if self.numRecords is None:
+            self.numRecords = self.countRecords()
+
+        if not os.path.exists(os.path.dirname(self.path)):
+            os.makedirs(os.path.dirname(self.path))
+
+        data = "".join(json.dumps(x) + "\n" for x in records).encode("utf-8")
+        with open(self.path, "ab+") as journal:
+            # a previous write might have been interrupted
+            journal.seek(0, os.SEEK_END)
+            if journal.tell() > 0:
+                journal.seek(-1, os.SEEK_END)
+                if journal.read(1) != b"\n":
+                    data = b"\n" + data
+
+            journal.write(data)
+
+        self.numRecords += len(records)
+        if self.numRecords > self.limit * 2:
+            self.compact()
+
+    def countRecords(self):
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "rb") as journal:
+            return sum(1 for line in journal if line.strip())
+
+    # rewrites the journal with only the current warnings
+    def compact(self):
+        warnings = self.getWarnings(limit=self.limit)
+        records = [["add", x[0], x[1], x[2]] for x in reversed(warnings)]
+        data = "".join(json.dumps(x) + "\n" for x in records).encode("utf-8")
+
+        tmpPath = os.path.join(
+            os.path.dirname(self.path),
+            "~%s.%s.tmp" % (os.path.basename(self.path), os.getpid()),
+        )
+        with open(tmpPath, "wb") as journal:
+            journal.write(data)
+
+        if hasattr(os, "replace"):
+            os.replace(tmpPath, self.path)
+        else:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            os.rename(tmpPath, self.path)
+
+        self.numRecords = len(records)
+
+    def importLegacy(self, legacyPath):
+        try:
+            warnings = readLegacyWarnings(legacyPath)
+        except Exception:
+            warnings = []
+
+        warnings = warnings[: self.limit]
+        self.appendRecords([["add", x[0], x[1], x[2]] for x in reversed(warnings)])
+        os.remove(legacyPath)
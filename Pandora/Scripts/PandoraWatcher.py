@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+#
+####################################################
+#
+# Pandora - Renderfarm Manager
+#
+# https://prism-pipeline.com/pandora/
+#
+# contact: contact@prism-pipeline.com
+#
+####################################################
+#
+#
+# Copyright (C) 2016-2020 Richard Frangenberg
+#
+# Licensed under GNU GPL-3.0-or-later
+#
+# This file is part of Pandora.
+#
+# Pandora is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Pandora is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Pandora.  If not, see <https://www.gnu.org/licenses/>.
+
+
+
+import os, sys, time, struct, select
+
+
+# inotify event flags from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+
+# watches directories with inotify. Only available on linux.
+class InotifyBackend(object):
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.watches = {}  # watch descriptor: path
+        self.paths = {}  # path: watch descriptor
+
+    def setDirs(self, dirs):
+        newDirs = []
+        for path in dirs:
+            if path in self.paths:
+                continue
+
+            if isinstance(path, bytes):
+                encPath = path
+            else:
+                encPath = path.encode(sys.getfilesystemencoding())
+
+            wd = self.libc.inotify_add_watch(
+                self.fd, encPath, IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE
+            )
+            if wd < 0:
+                continue
+
+            self.watches[wd] = path
+            self.paths[path] = wd
+            newDirs.append(path)
+
+        for path in [x for x in self.paths if x not in dirs]:
+            self.libc.inotify_rm_watch(self.fd, self.paths[path])
+            del self.watches[self.paths[path]]
+            del self.paths[path]
+
+        return newDirs
+
+    # returns a list of (folder, filename) of files, which were created in the watched folders
+    def read(self, timeout):
+        readable = select.select([self.fd], [], [], max(timeout, 0))[0]
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 65536)
+        except OSError:
+            return []
+
+        events = []
+        pos = 0
+        while pos + 16 <= len(data):
+            wd, mask, cookie, nameLen = struct.unpack_from("iIII", data, pos)
+            name = data[pos + 16 : pos + 16 + nameLen].rstrip(b"\0")
+            pos += 16 + nameLen
+
+            if mask & IN_IGNORED:
+                # the folder was removed
+                path = self.watches.pop(wd, None)
+                if path is not None:
+                    del self.paths[path]
+                continue
+
+            if wd in self.watches and name:
+                events.append(
+                    (self.watches[wd], name.decode(sys.getfilesystemencoding()))
+                )
+
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+# compares the modification time of the watched folders and lists a folder only if it
+# has changed. Works on all platforms and network drives.
+class PollBackend(object):
+    def __init__(self, interval=1.0):
+        self.interval = interval  # seconds between two checks
+        self.dirs = {}  # path: [mtime, filenames]
+
+    def setDirs(self, dirs):
+        newDirs = []
+        for path in dirs:
+            if path in self.dirs:
+                continue
+
+            try:
+                self.dirs[path] = [os.stat(path).st_mtime, set(os.listdir(path))]
+            except OSError:
+                continue
+
+            newDirs.append(path)
+
+        for path in [x for x in self.dirs if x not in dirs]:
+            del self.dirs[path]
+
+        return newDirs
+
+    def read(self, timeout):
+        deadline = time.time() + max(timeout, 0)
+        while True:
+            events = self.poll()
+            remaining = deadline - time.time()
+            if events or remaining <= 0:
+                return events
+
+            time.sleep(min(self.interval, remaining))
+
+    def poll(self):
+        events = []
+        for path in list(self.dirs):
+            try:
+                mtime = os.stat(path).st_mtime
+                if mtime == self.dirs[path][0]:
+                    continue
+
+                files = set(os.listdir(path))
+            except OSError:
+                del self.dirs[path]
+                continue
+
+            events += [(path, x) for x in files - self.dirs[path][1]]
+            self.dirs[path] = [mtime, files]
+
+        return events
+
+    def close(self):
+        pass
+
+
+# waits for new slave commands, workstation commands and job submissions in the sync folder
+class CoordinatorWatcher(object):
+    def __init__(self, slPath, coordBasePath, backend=None, pollInterval=1.0):
+        self.slPath = slPath
+        self.coordBasePath = coordBasePath
+
+        if backend is None:
+            try:
+                backend = InotifyBackend()
+            except Exception:
+                backend = PollBackend(interval=pollInterval)
+
+        self.backend = backend
+        self.wakeInterval = 0.5  # seconds between two checks of the wake event
+
+    def getBackendName(self):
+        return type(self.backend).__name__
+
+    def getWatchDirs(self):
+        slaveDir = os.path.join(self.slPath, "Slaves")
+        wsDir = os.path.join(self.slPath, "Workstations")
+        dirs = [self.coordBasePath, slaveDir, wsDir]
+
+        if os.path.isdir(slaveDir):
+            for i in os.listdir(slaveDir):
+                if i.startswith("S_"):
+                    dirs.append(os.path.join(slaveDir, i, "Communication"))
+
+        if os.path.isdir(wsDir):
+            for i in os.listdir(wsDir):
+                if i.startswith("WS_"):
+                    dirs.append(os.path.join(wsDir, i, "Commands"))
+                    dirs.append(os.path.join(wsDir, i, "JobSubmissions"))
+
+        return [x for x in dirs if os.path.isdir(x)]
+
+    def isRelevant(self, path, filename):
+        folder = os.path.basename(path)
+        if folder == "Communication":
+            return filename.startswith("slaveOut_")
+        elif folder == "Commands":
+            return filename.startswith("handlerOut_") or filename == "Pandora_update.zip"
+        elif folder == "JobSubmissions":
+            return filename != "ProjectAssets"
+        elif path == self.coordBasePath:
+            return filename in ["command.txt", "EXIT.txt"]
+
+        return False
+
+    def updateWatches(self):
+        newDirs = self.backend.setDirs(self.getWatchDirs())
+
+        # files, which were created before a folder was watched, would be missed otherwise
+        for path in newDirs:
+            if path == self.coordBasePath:
+                continue
+
+            try:
+                if any(self.isRelevant(path, x) for x in os.listdir(path)):
+                    return True
+            except OSError:
+                continue
+
+        return False
+
+    # blocks until a relevant file was created or maxIdle seconds passed. Bursts of files
+    # are collected until no new file was created for "debounce" seconds, but not longer
+    # than five times the debounce time. The optional "wake" event ends the waiting too.
+    def wait(self, maxIdle, debounce=1.0, wake=None):
+        deadline = time.time() + maxIdle
+        if self.updateWatches():
+            return "pending"
+
+        while True:
+            if wake is not None and wake.is_set():
+                return "wake"
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return "timeout"
+
+            if wake is not None:
+                remaining = min(remaining, self.wakeInterval)
+
+            events = self.backend.read(remaining)
+            if any(self.isStructureEvent(x[0]) for x in events):
+                # a slave or workstation was added
+                if self.updateWatches():
+                    return "pending"
+
+            if any(self.isRelevant(x[0], x[1]) for x in events):
+                break
+
+        burstEnd = time.time() + debounce * 5
+        while time.time() < burstEnd:
+            if not self.backend.read(min(debounce, burstEnd - time.time())):
+                break
+
+        return "event"
+
+    def isStructureEvent(self, path):
+        return path in [
+            os.path.join(self.slPath, "Slaves"),
+            os.path.join(self.slPath, "Workstations"),
+        ]
+
+    def close(self):
+        self.backend.close()